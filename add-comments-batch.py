@@ -5,64 +5,118 @@
 为所有文章添加 showComments: true 参数
 """
 
+import io
 import os
-import re
 import glob
 import sys
+import time
+import functools
+import contextlib
 from pathlib import Path
 
-def add_comments_to_file(file_path):
+import front_matter
+from note_io import file_size, iter_ordered_results, parse_jobs, write_text
+from run_stats import new_file_record, phase, build_report, write_report
+
+# 已有 showComments 字段的文件不再修改；新字段放在 draft 之后（没有 draft 时放在末尾）
+COMMENTS_FILTER = ('showComments', 'missing', None)
+COMMENTS_EDIT = ('set', 'showComments', True, 'draft')
+
+def add_comments_to_content(content):
+    """
+    为笔记内容添加评论系统配置
+    返回 (状态, 新内容)，状态为 exists 已包含 / no_front_matter 未找到front matter / added 已添加
+    只检查 Front Matter 中的字段（正文中出现的 showComments: 不算），只重新生成 Front Matter 部分
+    """
+    status, new_content = front_matter.edit_front_matter(content, [COMMENTS_EDIT], [COMMENTS_FILTER])
+    if status == 'no_front_matter':
+        return status, content
+    if status == 'edited':
+        return 'added', new_content
+    return 'exists', content
+
+def add_comments_to_file(file_path, record=None):
     """
     为单个文件添加评论系统配置
+    record 为 run_stats.new_file_record 创建的记录，记录状态、读取/处理/写入的耗时和读写字节数
     """
+    status = _add_comments_to_file(file_path, record)
+    if record is not None:
+        record['status'] = status
+    return status == 'added'
+
+def _add_comments_to_file(file_path, record):
+    """返回状态: added 已添加 / exists 已包含 / no_front_matter 未找到front matter / unchanged 内容未变化 / error 出错"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with phase(record, 'read'):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        if record is not None:
+            record['bytes_read'] = os.path.getsize(file_path)
         
-        # 检查是否已经有showComments参数
-        if 'showComments:' in content:
+        with phase(record, 'process'):
+            status, new_content = add_comments_to_content(content)
+        if status == 'exists':
             print(f"已包含评论配置: {file_path}")
-            return False
-        
-        # 匹配front matter部分
-        front_matter_pattern = r'^---\n(.*?)\n---'
-        match = re.search(front_matter_pattern, content, re.DOTALL)
-        
-        if not match:
+            return status
+        if status == 'no_front_matter':
             print(f"未找到front matter: {file_path}")
-            return False
-        
-        front_matter_content = match.group(1)
-        
-        # 在draft参数后添加showComments
-        if 'draft:' in front_matter_content:
-            # 在draft行后添加showComments
-            new_front_matter = re.sub(
-                r'(draft:\s*(?:true|false))',
-                r'\1\nshowComments: true',
-                front_matter_content
-            )
-        else:
-            # 如果没有draft参数，在最后添加
-            new_front_matter = front_matter_content.rstrip() + '\nshowComments: true'
+            return status
         
-        # 替换原内容
-        new_content = content.replace(match.group(0), f"---\n{new_front_matter}\n---")
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        with phase(record, 'write'):
+            written = write_text(file_path, new_content)
+        if not written:
+            print(f"内容未变化: {file_path}")
+            return 'unchanged'
         
+        if record is not None:
+            record['bytes_written'] = os.path.getsize(file_path)
         print(f"已添加评论配置: {file_path}")
-        return True
+        return 'added'
         
     except Exception as e:
         print(f"处理文件 {file_path} 时出错: {e}")
-        return False
+        return 'error'
+
+def _add_comments_worker(file_path, report=False):
+    """
+    进程池中执行的任务，输出先缓存下来由主进程按文件顺序打印
+    """
+    record = new_file_record(file_path) if report else None
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        updated = add_comments_to_file(file_path, record)
+    return updated, buffer.getvalue(), record
 
-def batch_add_comments(directory_path, pattern="*.md", recursive=False):
+def iter_add_comments_results(files, jobs=1, records=None, quiet=False):
+    """
+    依次产出每个文件是否被更新，顺序与 files 一致
+    jobs > 1 时使用进程池并行处理，较大的文件优先提交
+    records 为列表时追加每个文件的统计记录；quiet 时只输出出错文件的信息
+    """
+    report = records is not None
+
+    def add_serial(file_path):
+        # 不使用进程池时直接输出
+        record = new_file_record(file_path) if report else None
+        return add_comments_to_file(file_path, record), '', record
+
+    worker = functools.partial(_add_comments_worker, report=report or quiet)
+    for updated, output, record in iter_ordered_results(files, worker, jobs, size=file_size,
+                                                        serial=None if quiet else add_serial):
+        if not quiet or record['status'] == 'error':
+            sys.stdout.write(output)
+        if report:
+            records.append(record)
+        yield updated
+
+def batch_add_comments(directory_path, pattern="*.md", recursive=False, jobs=1, stats_path=None, quiet=False):
     """
     批量添加评论系统配置
+    jobs > 1 时使用多进程并行处理
+    stats_path 指定时写出 JSON 统计报告；quiet 时不输出每个文件的处理结果（出错的文件除外）
     """
+    started = time.perf_counter()
     if not os.path.exists(directory_path):
         print(f"目录不存在: {directory_path}")
         return
@@ -79,16 +133,20 @@ def batch_add_comments(directory_path, pattern="*.md", recursive=False):
         print(f"在目录 {directory_path} 中没有找到匹配 {pattern} 的文件")
         return
     
+    files.sort()
     print(f"找到 {len(files)} 个文件，开始添加评论配置...")
     print("-" * 50)
     
+    records = [] if stats_path else None
     updated_count = 0
-    for file_path in files:
-        if add_comments_to_file(file_path):
+    for updated in iter_add_comments_results(files, jobs, records, quiet):
+        if updated:
             updated_count += 1
     
     print("-" * 50)
     print(f"处理完成！共处理 {len(files)} 个文件，成功更新 {updated_count} 个文件")
+    if stats_path:
+        write_report(stats_path, build_report('add-comments-batch.py', records, started, jobs=jobs))
 
 def preview_changes(directory_path, pattern="*.md", recursive=False):
     """
@@ -118,7 +176,8 @@ def preview_changes(directory_path, pattern="*.md", recursive=False):
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            if 'showComments:' not in content:
+            _, fields = front_matter.parse_front_matter(content)
+            if 'showComments' not in fields:
                 print(f"需要添加评论配置: {file_path}")
                 need_update_count += 1
             else:
@@ -139,11 +198,15 @@ def main():
         print("  --recursive, -r     递归搜索子目录")
         print("  --preview, -p       仅预览，不实际修改文件")
         print("  --pattern <模式>     文件匹配模式 (默认: *.md)")
+        print("  --jobs, -j <数量>    并行处理的进程数 (0 表示使用全部CPU核心)")
+        print("  --stats <文件>       写出 JSON 统计报告：每个文件各阶段耗时、读写字节数和最慢的文件")
+        print("  --quiet, -q         不输出每个文件的处理结果（出错的文件除外）")
         print("")
         print("示例:")
         print("  python add-comments-batch.py content/posts")
         print("  python add-comments-batch.py content/posts --recursive")
         print("  python add-comments-batch.py . --preview")
+        print("  python add-comments-batch.py content --recursive --jobs 8")
         print("")
         print("功能:")
         print("  为所有文章的front matter添加 showComments: true 参数")
@@ -153,24 +216,39 @@ def main():
     pattern = "*.md"
     recursive = False
     preview_only = False
+    jobs = 1
+    stats_path = None
+    quiet = False
     
     # 解析命令行参数
     i = 2
-    while i < len(sys.argv):
-        arg = sys.argv[i]
-        if arg in ["--recursive", "-r"]:
-            recursive = True
-        elif arg in ["--preview", "-p"]:
-            preview_only = True
-        elif arg == "--pattern" and i + 1 < len(sys.argv):
-            pattern = sys.argv[i + 1]
+    try:
+        while i < len(sys.argv):
+            arg = sys.argv[i]
+            if arg in ["--recursive", "-r"]:
+                recursive = True
+            elif arg in ["--preview", "-p"]:
+                preview_only = True
+            elif arg == "--pattern" and i + 1 < len(sys.argv):
+                pattern = sys.argv[i + 1]
+                i += 1
+            elif arg in ["--jobs", "-j"] and i + 1 < len(sys.argv):
+                jobs = parse_jobs(sys.argv[i + 1])
+                i += 1
+            elif arg == "--stats" and i + 1 < len(sys.argv):
+                stats_path = sys.argv[i + 1]
+                i += 1
+            elif arg in ["--quiet", "-q"]:
+                quiet = True
             i += 1
-        i += 1
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
     
     if preview_only:
         preview_changes(directory_path, pattern, recursive)
     else:
-        batch_add_comments(directory_path, pattern, recursive)
+        batch_add_comments(directory_path, pattern, recursive, jobs, stats_path, quiet)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,136 @@
+/*
+ * 站内搜索（分片索引）
+ * 读取 build-search-index.py 生成的 search/meta.json，只下载查询词所在的分片，
+ * 所有词条都命中的文档按得分排序后显示；分词规则与 build-search-index.py 的 tokenize 保持一致
+ * 页面中带 data-search-shards 属性的容器内需要一个 input 和一个 [data-search-results] 列表
+ */
+(function () {
+  "use strict";
+
+  var TOKEN_RE = /[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+/g;
+  var LIMIT = 10;
+
+  // 查询分词：英文和数字按单词（忽略单个字母），中日韩文字按相邻两字切分，单字保留单字
+  function tokenize(text) {
+    var terms = [];
+    var tokens = text.toLowerCase().match(TOKEN_RE) || [];
+    tokens.forEach(function (token) {
+      if (token.charCodeAt(0) < 0x80) {
+        if (token.length > 1 || /^[0-9]$/.test(token)) terms.push(token);
+      } else if (token.length === 1) {
+        terms.push(token);
+      } else {
+        for (var i = 0; i < token.length - 1; i++) terms.push(token.slice(i, i + 2));
+      }
+    });
+    return terms.filter(function (term, index) { return terms.indexOf(term) === index; });
+  }
+
+  function shardKey(term, block) {
+    var code = term.charCodeAt(0);
+    return code < 0x80 ? term[0] : "u" + Math.floor(code / block).toString(16);
+  }
+
+  function createIndex(root) {
+    var cache = {};
+
+    function load(name) {
+      if (!cache[name]) {
+        cache[name] = fetch(root + name).then(function (response) {
+          if (!response.ok) throw new Error(response.status + " " + name);
+          return response.json();
+        });
+      }
+      return cache[name];
+    }
+
+    function search(query) {
+      var terms = tokenize(query);
+      if (!terms.length) return Promise.resolve([]);
+      return load("meta.json").then(function (meta) {
+        var keys = terms.map(function (term) { return shardKey(term, meta.cjk_block); });
+        // 索引中不存在的分片说明没有以该前缀开头的词条，结果必然为空
+        if (keys.some(function (key) { return meta.shards.indexOf(key) < 0; })) return [];
+        var unique = keys.filter(function (key, index) { return keys.indexOf(key) === index; });
+        return Promise.all(unique.map(function (key) { return load("shard-" + key + ".json"); }))
+          .then(function (shards) {
+            var totals = null;
+            terms.forEach(function (term, index) {
+              var flat = shards[unique.indexOf(keys[index])][term] || [];
+              var scores = {};
+              for (var i = 0; i < flat.length; i += 2) scores[flat[i]] = flat[i + 1];
+              if (totals === null) {
+                totals = scores;
+              } else {
+                var next = {};
+                Object.keys(scores).forEach(function (id) {
+                  if (id in totals) next[id] = totals[id] + scores[id];
+                });
+                totals = next;
+              }
+            });
+            var ranked = Object.keys(totals).map(Number).sort(function (a, b) {
+              return totals[b] - totals[a] || a - b;
+            }).slice(0, LIMIT);
+            if (!ranked.length) return [];
+            return load("docs.json").then(function (docs) {
+              return ranked.filter(function (id) { return docs[id]; }).map(function (id) {
+                return { url: docs[id][0], title: docs[id][1], summary: docs[id][2], score: totals[id] };
+              });
+            });
+          });
+      });
+    }
+
+    return { search: search };
+  }
+
+  function render(list, results, query) {
+    list.textContent = "";
+    if (!results.length) {
+      var empty = document.createElement("li");
+      empty.textContent = "没有找到: " + query;
+      list.appendChild(empty);
+      return;
+    }
+    results.forEach(function (result) {
+      var item = document.createElement("li");
+      var link = document.createElement("a");
+      link.href = result.url;
+      link.textContent = result.title;
+      var summary = document.createElement("p");
+      summary.textContent = result.summary;
+      item.appendChild(link);
+      item.appendChild(summary);
+      list.appendChild(item);
+    });
+  }
+
+  function bind(container) {
+    var index = createIndex(container.getAttribute("data-search-shards"));
+    var input = container.querySelector("input");
+    var list = container.querySelector("[data-search-results]");
+    var timer = null;
+    var latest = 0;
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var query = input.value.trim();
+        var ticket = ++latest;
+        if (!query) {
+          list.textContent = "";
+          return;
+        }
+        index.search(query).then(function (results) {
+          // 输入过快时丢弃过期的结果
+          if (ticket === latest) render(list, results, query);
+        }).catch(function (error) {
+          console.error("搜索失败", error);
+        });
+      }, 150);
+    });
+  }
+
+  window.searchShards = { tokenize: tokenize, createIndex: createIndex };
+  document.querySelectorAll("[data-search-shards]").forEach(bind);
+})();
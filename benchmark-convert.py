@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换脚本基准测试
+生成可复现的合成 Obsidian 笔记库，测量各转换函数和 batch_convert 的耗时，
+结果保存为 JSON，可与之前保存的基准结果对比，发现性能回退
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import contextlib
+import importlib
+
+
+DEFAULT_OPTIONS = {
+    'files': 200,        # 笔记数量
+    'size_kb': 8,        # 平均笔记大小 (KB)
+    'math': 0.3,         # 每个段落包含公式的概率
+    'callouts': 0.1,     # 每个段落为 Callout 的概率
+    'mermaid': 0.05,     # 每个段落为 Mermaid 图的概率
+    'code': 0.2,         # 每个段落为代码块的概率
+    'seed': 42,
+    'repeat': 3,         # 每项测量重复次数，取最小值
+    'jobs': [1],         # batch_convert 测量的并行进程数
+    'math_files': 50,    # 公式密集笔记的数量（单独测量，0 为不测量）
+}
+
+WORDS = [
+    "Android", "布局", "控件", "Activity", "生命周期", "数据结构", "算法", "复杂度",
+    "列表", "适配器", "视图", "事件", "线程", "内存", "缓存", "接口", "实现", "示例",
+    "the", "view", "layout", "adapter", "state", "value", "index", "node", "tree",
+]
+CALLOUT_TYPES = ["note", "tip", "warning", "info", "example", "danger", "quote"]
+CODE_LANGS = ["kotlin", "java", "bash", "xml", "python"]
+
+
+def load_converter():
+    """加载转换模块 obsidian_converter"""
+    return importlib.import_module("obsidian_converter")
+
+
+def load_reference():
+    """加载逐步转换函数所在的模块 legacy_converter，作为对比基准"""
+    return importlib.import_module("legacy_converter")
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "。"
+
+
+def _paragraph(rng, options):
+    """按配置的密度随机生成一个段落"""
+    roll = rng.random()
+    if roll < options['mermaid']:
+        nodes = [f"N{i}" for i in range(rng.randint(2, 6))]
+        edges = "\n".join(f"    {a} --> {b}" for a, b in zip(nodes, nodes[1:]))
+        return f"```mermaid\ngraph TD\n{edges}\n```\n"
+    roll -= options['mermaid']
+    if roll < options['callouts']:
+        kind = rng.choice(CALLOUT_TYPES)
+        fold = rng.choice(["", "+", "-"])
+        lines = [f"> [!{kind}]{fold} {_sentence(rng, 3)}"]
+        lines += [f"> {_sentence(rng)}" for _ in range(rng.randint(1, 4))]
+        return "\n".join(lines) + "\n"
+    roll -= options['callouts']
+    if roll < options['code']:
+        lang = rng.choice(CODE_LANGS)
+        lines = [f'val text{i} = "$value{i} ${{items[{i}]}}"' for i in range(rng.randint(3, 12))]
+        return f"```{lang}\n" + "\n".join(lines) + "\n```\n"
+
+    text = _sentence(rng, rng.randint(10, 40))
+    if rng.random() < options['math']:
+        if rng.random() < 0.3:
+            text += f"\n\n$$\nT(n) = {rng.randint(2, 9)}T(n/2) + O(n)\n$$"
+        else:
+            text += f" 时间复杂度为 $O(n^{rng.randint(1, 3)})$，空间复杂度为 $O(\\log n)$。"
+    if rng.random() < 0.1:
+        text += " 使用 `$HOME` 或 ``a`b`` 表示代码。"
+    return text + "\n"
+
+
+def generate_note(rng, index, options):
+    """生成一篇合成笔记"""
+    target = max(256, int(options['size_kb'] * 1024 * rng.uniform(0.5, 1.5)))
+    parts = ["---", f"title: 合成笔记 {index}", f"date: 2025-01-{index % 28 + 1:02d}"]
+    if rng.random() < 0.5:
+        parts += ["categories:", "  - Android", "tags:", "  - 布局", "  - 控件"]
+    else:
+        parts += ['categories: ["Android"]', 'tags: ["布局"]']
+    parts += ["---", "", f"# 合成笔记 {index}", ""]
+
+    body = "\n".join(parts) + "\n"
+    size = len(body.encode("utf-8"))
+    chunks = [body]
+    while size < target:
+        paragraph = _paragraph(rng, options) + "\n"
+        chunks.append(paragraph)
+        size += len(paragraph.encode("utf-8"))
+    return "".join(chunks)
+
+
+def generate_math_note(rng, index, options):
+    """生成一篇公式密集的笔记：几乎每句都有行内公式，夹杂块级公式、转义的 \\$ 和行内代码"""
+    target = max(256, int(options['size_kb'] * 1024 * rng.uniform(0.5, 1.5)))
+    chunks = [f"---\ntitle: 公式笔记 {index}\n---\n\n# 公式笔记 {index}\n\n"]
+    size = len(chunks[0].encode("utf-8"))
+    while size < target:
+        roll = rng.random()
+        if roll < 0.15:
+            paragraph = f"$$\n\\sum_{{i=1}}^{{n}} a_i = {rng.randint(2, 9)}n^2 + O(n)\n$$\n\n"
+        elif roll < 0.25:
+            paragraph = f"价格为 \\$5，变量 `$x` 与 $a_{{{rng.randint(1, 9)}}}$ 无关。\n\n"
+        else:
+            terms = [f"$x_{{{i}}}^{{{rng.randint(2, 4)}}}$" for i in range(rng.randint(3, 8))]
+            paragraph = _sentence(rng, 4) + " " + "，".join(terms) + "，且 $O(n \\log n)$。\n\n"
+        chunks.append(paragraph)
+        size += len(paragraph.encode("utf-8"))
+    return "".join(chunks)
+
+
+def generate_vault(directory, options):
+    """在 directory 中生成合成笔记库，返回 [(相对路径, 内容)]"""
+    rng = random.Random(options['seed'])
+    notes = []
+    for index in range(options['files']):
+        relative = os.path.join(f"section-{index % 5}", f"note-{index:05d}.md")
+        content = generate_note(rng, index, options)
+        path = os.path.join(directory, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        notes.append((relative, content))
+    return notes
+
+
+def _best_of(repeat, func):
+    """重复执行 func，返回最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def legacy_chain(reference, texts):
+    """依次执行全部逐步转换函数（单遍引擎之前的转换方式）"""
+    for text in texts:
+        text = reference.convert_mermaid_syntax(text)
+        text = reference.convert_callouts(text)
+        text = reference.convert_latex_to_katex(text)
+        reference.convert_yaml_lists_to_json(text)
+
+
+def benchmark_converters(converter, reference, texts, repeat):
+    """测量每个逐步转换函数、单遍引擎及其各步骤在全部笔记上的耗时"""
+    results = {}
+    for name in ["convert_mermaid_syntax", "convert_callouts", "convert_latex_to_katex",
+                 "convert_yaml_lists_to_json"]:
+        func = getattr(reference, name)
+        results[name] = _best_of(repeat, lambda: [func(text) for text in texts])
+
+    results["legacy_chain"] = _best_of(repeat, lambda: legacy_chain(reference, texts))
+    results["convert_content"] = _best_of(repeat, lambda: [converter.convert_content(text) for text in texts])
+    for stage in converter.stage_names():
+        results[f"stage.{stage}"] = _best_of(
+            repeat, lambda: [converter.convert_content(text, {stage}) for text in texts]
+        )
+
+    raws = [text.encode("utf-8") for text in texts]
+    results["detect_stages"] = _best_of(repeat, lambda: [converter.detect_stages(raw) for raw in raws])
+    return results
+
+
+def benchmark_math(converter, reference, options):
+    """在公式密集的笔记上对比逐步转换链和单遍引擎（行内公式切分是单遍引擎最耗时的部分）"""
+    rng = random.Random(options['seed'])
+    texts = [generate_math_note(rng, index, options) for index in range(options['math_files'])]
+    if not texts:
+        return {}
+    repeat = options['repeat']
+    return {
+        "math_dense.legacy_chain": _best_of(repeat, lambda: legacy_chain(reference, texts)),
+        "math_dense.convert_latex_to_katex": _best_of(
+            repeat, lambda: [reference.convert_latex_to_katex(text) for text in texts]),
+        "math_dense.convert_content": _best_of(
+            repeat, lambda: [converter.convert_content(text) for text in texts]),
+        "math_dense.stage.latex": _best_of(
+            repeat, lambda: [converter.convert_content(text, {'latex'}) for text in texts]),
+    }
+
+
+def benchmark_batch(converter, source, repeat, jobs_list):
+    """在笔记库副本上测量完整 batch_convert 的耗时（每次都从未转换的副本开始）"""
+    results = {}
+    for jobs in jobs_list:
+        best = None
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory(prefix="bench-batch-") as work:
+                target = os.path.join(work, "vault")
+                shutil.copytree(source, target)
+                with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+                    started = time.perf_counter()
+                    converter.batch_convert(target, recursive=True, jobs=jobs)
+                    elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[f"batch_convert.jobs{jobs}"] = best
+    return results
+
+
+def run_benchmark(options, keep_dir=None):
+    """生成笔记库并执行全部测量，返回结果字典"""
+    converter = load_converter()
+    reference = load_reference()
+    with tempfile.TemporaryDirectory(prefix="bench-vault-") as work:
+        vault = keep_dir or os.path.join(work, "vault")
+        notes = generate_vault(vault, options)
+        texts = [content for _, content in notes]
+        print(f"已生成 {len(notes)} 篇笔记，共 {sum(len(t.encode('utf-8')) for t in texts) / 1024:.1f} KB: {vault}")
+
+        results = benchmark_converters(converter, reference, texts, options['repeat'])
+        results.update(benchmark_math(converter, reference, options))
+        results.update(benchmark_batch(converter, vault, options['repeat'], options['jobs']))
+
+    return {
+        'format': 1,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'converter_version': converter.CONVERTER_VERSION,
+        'options': options,
+        'vault': {'files': len(texts), 'bytes': sum(len(t.encode("utf-8")) for t in texts)},
+        'results': results,
+    }
+
+
+def print_results(report):
+    print("-" * 50)
+    print(f"{'测量项':<36}{'耗时(ms)':>12}")
+    for name, seconds in report['results'].items():
+        print(f"{name:<36}{seconds * 1000:>12.2f}")
+
+
+def compare_with_baseline(report, baseline, threshold):
+    """
+    与基准结果对比，打印每项的变化比例
+    返回超过阈值（百分比）的回退项列表
+    """
+    if baseline.get('options') != report['options']:
+        print("警告: 基准结果的笔记库配置与本次不同，对比结果仅供参考")
+
+    regressions = []
+    print("-" * 50)
+    print(f"{'测量项':<36}{'基准(ms)':>12}{'本次(ms)':>12}{'变化':>10}")
+    for name, seconds in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            print(f"{name:<36}{'-':>12}{seconds * 1000:>12.2f}{'新增':>10}")
+            continue
+        change = (seconds - base) / base * 100
+        flag = ""
+        if change > threshold:
+            flag = "  <- 回退"
+            regressions.append((name, change))
+        print(f"{name:<36}{base * 1000:>12.2f}{seconds * 1000:>12.2f}{change:>+9.1f}%{flag}")
+    return regressions
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h"]:
+        print("转换脚本基准测试")
+        print("使用方法:")
+        print("  python benchmark-convert.py [选项]")
+        print("")
+        print("选项:")
+        print(f"  --files <数量>       合成笔记数量 (默认: {DEFAULT_OPTIONS['files']})")
+        print(f"  --size <KB>         平均笔记大小 (默认: {DEFAULT_OPTIONS['size_kb']})")
+        print(f"  --math <概率>        段落包含公式的概率 (默认: {DEFAULT_OPTIONS['math']})")
+        print(f"  --callouts <概率>    段落为 Callout 的概率 (默认: {DEFAULT_OPTIONS['callouts']})")
+        print(f"  --mermaid <概率>     段落为 Mermaid 图的概率 (默认: {DEFAULT_OPTIONS['mermaid']})")
+        print(f"  --code <概率>        段落为代码块的概率 (默认: {DEFAULT_OPTIONS['code']})")
+        print(f"  --seed <数字>        随机种子 (默认: {DEFAULT_OPTIONS['seed']})")
+        print(f"  --repeat <次数>      每项测量重复次数，取最小值 (默认: {DEFAULT_OPTIONS['repeat']})")
+        print(f"  --math-files <数量>  公式密集笔记的数量，单独测量 (默认: {DEFAULT_OPTIONS['math_files']}，0 为不测量)")
+        print("  --jobs <列表>        batch_convert 的并行进程数，逗号分隔 (默认: 1)")
+        print("  --output <文件>      将结果保存为 JSON")
+        print("  --baseline <文件>    与之前保存的结果对比")
+        print("  --threshold <百分比>  超过该比例的变慢视为回退 (默认: 10)")
+        print("  --keep <目录>        将合成笔记库保存到指定目录")
+        print("")
+        print("示例:")
+        print("  python benchmark-convert.py --output bench_output.json")
+        print("  python benchmark-convert.py --files 1000 --math 0.8 --baseline bench_output.json")
+        return 0
+
+    options = dict(DEFAULT_OPTIONS)
+    output_path = None
+    baseline_path = None
+    threshold = 10.0
+    keep_dir = None
+
+    # 解析命令行参数
+    numeric = {
+        "--files": ('files', int),
+        "--size": ('size_kb', float),
+        "--math": ('math', float),
+        "--callouts": ('callouts', float),
+        "--mermaid": ('mermaid', float),
+        "--code": ('code', float),
+        "--seed": ('seed', int),
+        "--repeat": ('repeat', int),
+        "--math-files": ('math_files', int),
+    }
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        value = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+        if arg in numeric and value is not None:
+            key, cast = numeric[arg]
+            options[key] = cast(value)
+            i += 1
+        elif arg == "--jobs" and value is not None:
+            options['jobs'] = [int(item) for item in value.split(",") if item]
+            i += 1
+        elif arg == "--output" and value is not None:
+            output_path = value
+            i += 1
+        elif arg == "--baseline" and value is not None:
+            baseline_path = value
+            i += 1
+        elif arg == "--threshold" and value is not None:
+            threshold = float(value)
+            i += 1
+        elif arg == "--keep" and value is not None:
+            keep_dir = value
+            i += 1
+        i += 1
+
+    report = run_benchmark(options, keep_dir)
+    print_results(report)
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {output_path}")
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, threshold)
+        if regressions:
+            print(f"发现 {len(regressions)} 项性能回退 (阈值 {threshold}%)")
+            return 1
+        print("未发现性能回退")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站内搜索索引构建脚本
+读取 content 中的笔记，中日韩文字按单字和相邻两字分词（英文和数字按单词）建立倒排索引，
+按词条前缀拆分为多个分片，浏览器只需下载查询词所在的分片；
+只重新分词变化的笔记，只重写受影响的分片
+浏览器端的查询脚本在 assets/js/search-shards.js，分词规则须与 tokenize 保持一致
+
+输出目录（默认 static/search，由 Hugo 复制到站点中）:
+  meta.json          版本、baseURL 路径和分片列表
+  docs.json          文档列表 [[链接, 标题, 摘要], ...]，下标即文档编号
+  shard-<前缀>.json   {词条: [文档编号, 得分, 文档编号, 得分, ...]}
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+
+from note_io import atomic_write, load_json, site_base_path, write_text
+
+INDEX_VERSION = 2
+DEFAULT_CONTENT_DIR = "content"
+DEFAULT_OUTPUT_DIR = "static/search"
+DEFAULT_STATE_PATH = ".search-index-state.json"
+# 中日韩文字按码位每 256 个字分为一个分片
+CJK_SHARD_BLOCK = 256
+# 标题、标签和正文中词条的权重
+FIELD_WEIGHTS = {'title': 5, 'tags': 3, 'body': 1}
+SUMMARY_LENGTH = 120
+
+FRONT_MATTER_RE = re.compile(r'\A\ufeff?---[ \t]*\n(.*?)\n---[ \t]*(?:\n|\Z)', re.DOTALL)
+FIELD_RE = re.compile(r'(?m)^(title|summary|slug|url|draft|tags|categories):[ \t]*(.*?)[ \t]*$')
+LIST_ITEM_RE = re.compile(r'^[ \t]*-[ \t]+(.+?)[ \t]*$')
+
+FENCE_RE = re.compile(r'(?ms)^[ \t]*(```|~~~).*?^[ \t]*\1[^\n]*$')
+SHORTCODE_RE = re.compile(r'\{\{[<%].*?[%>]\}\}', re.DOTALL)
+IMAGE_RE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+MARKUP_RE = re.compile(r'[#*_>`|~\[\]]+')
+SPACE_RE = re.compile(r'\s+')
+
+# 英文单词和数字，以及连续的中日韩文字
+TOKEN_RE = re.compile(r'[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+')
+URL_STRIP_RE = re.compile(r'[^\w\-./]')
+
+
+def tokenize(text, unigrams=False):
+    """
+    分词：英文和数字按单词（忽略单个字母），中日韩文字按相邻两字切分（单字词保留单字）
+    建立索引时 unigrams 为真，另外索引每个单字，单字查询（如「布」）才能命中「布局」；
+    查询时不加单字，多字查询仍按两字词条匹配
+    """
+    for token in TOKEN_RE.findall(text.lower()):
+        if token[0] < '\u0080':
+            if len(token) > 1 or token.isdigit():
+                yield token
+        elif len(token) == 1:
+            yield token
+        else:
+            for i in range(len(token) - 1):
+                yield token[i:i + 2]
+            if unigrams:
+                yield from token
+
+
+def shard_key(term):
+    """词条所在分片：英文和数字按首字符，中日韩文字按首字码位所在的块"""
+    first = term[0]
+    if first < '\u0080':
+        return first
+    return f"u{ord(first) // CJK_SHARD_BLOCK:x}"
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+def _parse_list(value, following):
+    """解析 JSON 数组或 YAML 列表形式的标签"""
+    if value.startswith('['):
+        try:
+            return [str(item) for item in json.loads(value)]
+        except ValueError:
+            return [_unquote(item) for item in value.strip('[]').split(',') if item.strip()]
+    if value:
+        return [_unquote(value)]
+    items = []
+    for line in following:
+        match = LIST_ITEM_RE.match(line)
+        if not match:
+            break
+        items.append(_unquote(match.group(1)))
+    return items
+
+
+def parse_note(content):
+    """拆分笔记，返回 (front matter 字段字典, 正文)"""
+    fields = {}
+    match = FRONT_MATTER_RE.match(content)
+    if not match:
+        return fields, content
+    front_matter = match.group(1)
+    lines = front_matter.split('\n')
+    for index, line in enumerate(lines):
+        field = FIELD_RE.match(line)
+        if not field:
+            continue
+        name, value = field.group(1), field.group(2)
+        if name in ('tags', 'categories'):
+            fields[name] = _parse_list(value, lines[index + 1:])
+        else:
+            fields[name] = _unquote(value)
+    return fields, content[match.end():]
+
+
+def plain_text(body):
+    """去掉代码块、短代码、链接地址和 Markdown 标记，得到用于分词和摘要的纯文本"""
+    text = FENCE_RE.sub(' ', body)
+    text = SHORTCODE_RE.sub(' ', text)
+    text = IMAGE_RE.sub(r'\1', text)
+    text = LINK_RE.sub(r'\1', text)
+    text = HTML_TAG_RE.sub(' ', text)
+    text = MARKUP_RE.sub(' ', text)
+    return SPACE_RE.sub(' ', text).strip()
+
+
+def _urlize(part):
+    """按 Hugo 的规则生成路径片段：小写，空格改为连字符，去掉其他符号"""
+    return URL_STRIP_RE.sub('', part.strip().lower().replace(' ', '-'))
+
+
+def page_url(relative, fields):
+    """笔记在站点中的路径（不含 baseURL），优先使用 front matter 中的 url 和 slug"""
+    if fields.get('url'):
+        return '/' + fields['url'].strip('/') + '/'
+    parts = relative[:-3].split('/')
+    if parts[-1] == '_index':
+        parts.pop()
+    elif fields.get('slug'):
+        parts[-1] = fields['slug']
+    path = '/'.join(_urlize(part) for part in parts)
+    return '/' + path + '/' if path else '/'
+
+
+def index_note(content, relative):
+    """为单篇笔记计算文档信息和词条得分，草稿返回 None"""
+    fields, body = parse_note(content)
+    if fields.get('draft', '').lower() == 'true':
+        return None
+    text = plain_text(body)
+    title = fields.get('title') or os.path.splitext(os.path.basename(relative))[0]
+    summary = fields.get('summary') or text[:SUMMARY_LENGTH]
+
+    scores = {}
+    tags = ' '.join(fields.get('tags', []) + fields.get('categories', []))
+    for field, value in (('title', title), ('tags', tags), ('body', text + ' ' + summary)):
+        weight = FIELD_WEIGHTS[field]
+        for term in tokenize(value, unigrams=True):
+            scores[term] = scores.get(term, 0) + weight
+    return {'url': page_url(relative, fields), 'title': title, 'summary': summary, 'terms': scores}
+
+
+def load_state(state_path):
+    """读取上次构建的状态，不存在、无法解析或版本不一致时返回空状态"""
+    state = load_json(state_path, {})
+    if state.get('version') == INDEX_VERSION:
+        return state
+    return {'version': INDEX_VERSION, 'next_id': 0, 'docs': {}}
+
+
+def build_search_index(content_dir=DEFAULT_CONTENT_DIR, output_dir=DEFAULT_OUTPUT_DIR,
+                       state_path=DEFAULT_STATE_PATH, base_path=None):
+    """
+    构建（或增量更新）搜索索引
+    只有大小或修改时间变化、且内容哈希也变化的笔记才重新分词；
+    只有包含变化词条的分片才重新生成
+    """
+    if not os.path.exists(content_dir):
+        print(f"目录不存在: {content_dir}")
+        return
+
+    if base_path is None:
+        base_path = site_base_path(os.path.dirname(os.path.abspath(content_dir)))
+
+    state = load_state(state_path)
+    docs = state['docs']
+    seen = set()
+    affected = set()
+    changed_count = 0
+
+    for root, dirs, files in os.walk(content_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if not name.endswith('.md') or name.startswith('.'):
+                continue
+            file_path = os.path.join(root, name)
+            relative = os.path.relpath(file_path, content_dir).replace(os.sep, '/')
+            seen.add(relative)
+            stat = os.stat(file_path)
+            old = docs.get(relative)
+            if old and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+                continue
+
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if old and old['sha256'] == digest:
+                old['size'], old['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+                continue
+
+            entry = index_note(raw.decode('utf-8').replace('\r\n', '\n'), relative)
+            if old:
+                affected.update(shard_key(term) for term in old['terms'])
+            if entry is None:
+                docs.pop(relative, None)
+            else:
+                entry.update({
+                    'id': old['id'] if old else state['next_id'],
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'sha256': digest,
+                })
+                if not old:
+                    state['next_id'] += 1
+                docs[relative] = entry
+                affected.update(shard_key(term) for term in entry['terms'])
+            changed_count += 1
+            print(f"已索引: {relative}")
+
+    for relative in [key for key in docs if key not in seen]:
+        affected.update(shard_key(term) for term in docs.pop(relative)['terms'])
+        changed_count += 1
+        print(f"已移除: {relative}")
+
+    # 汇总受影响分片的倒排表
+    shards = {key: {} for key in affected}
+    all_keys = set()
+    for entry in docs.values():
+        for term, score in entry['terms'].items():
+            key = shard_key(term)
+            all_keys.add(key)
+            if key in shards:
+                shards[key].setdefault(term, []).append((entry['id'], score))
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = 0
+    for key, postings in shards.items():
+        shard_path = os.path.join(output_dir, f"shard-{key}.json")
+        if key not in all_keys:
+            if os.path.exists(shard_path):
+                os.remove(shard_path)
+            continue
+        data = {}
+        for term in sorted(postings):
+            flat = []
+            for doc_id, score in sorted(postings[term], key=lambda item: (-item[1], item[0])):
+                flat.extend((doc_id, score))
+            data[term] = flat
+        if write_text(shard_path, json.dumps(data, ensure_ascii=False, separators=(',', ':'))):
+            written += 1
+
+    # 文档编号稳定，删除的文档留空，保证未重写的分片仍然有效
+    table = [None] * state['next_id']
+    for entry in docs.values():
+        table[entry['id']] = [base_path + entry['url'], entry['title'], entry['summary']]
+    write_text(os.path.join(output_dir, "docs.json"), json.dumps(table, ensure_ascii=False, separators=(',', ':')))
+    meta = {'version': INDEX_VERSION, 'base': base_path, 'cjk_block': CJK_SHARD_BLOCK, 'shards': sorted(all_keys)}
+    write_text(os.path.join(output_dir, "meta.json"), json.dumps(meta, ensure_ascii=False, separators=(',', ':')))
+
+    atomic_write(state_path, lambda f: json.dump(state, f, ensure_ascii=False, separators=(',', ':')))
+
+    print("-" * 50)
+    print(f"索引完成！共 {len(docs)} 篇笔记，重新索引 {changed_count} 篇，"
+          f"共 {len(all_keys)} 个分片，重写 {written} 个分片")
+
+
+def search(output_dir, query, limit=10):
+    """按浏览器端相同的方式查询索引：只读取查询词所在的分片，所有词条都命中的文档按得分排序"""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    shards = {}
+    totals = None
+    for term in terms:
+        key = shard_key(term)
+        if key not in shards:
+            try:
+                with open(os.path.join(output_dir, f"shard-{key}.json"), 'r', encoding='utf-8') as f:
+                    shards[key] = json.load(f)
+            except FileNotFoundError:
+                shards[key] = {}
+        flat = shards[key].get(term, [])
+        scores = dict(zip(flat[::2], flat[1::2]))
+        if totals is None:
+            totals = scores
+        else:
+            totals = {doc_id: totals[doc_id] + score for doc_id, score in scores.items() if doc_id in totals}
+    with open(os.path.join(output_dir, "docs.json"), 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(table[doc_id], score) for doc_id, score in ranked]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h"]:
+        print("站内搜索索引构建脚本")
+        print("使用方法:")
+        print("  python build-search-index.py [内容目录] [选项]")
+        print("")
+        print("选项:")
+        print(f"  --output <目录>      索引输出目录 (默认: {DEFAULT_OUTPUT_DIR})")
+        print(f"  --state <文件>       增量构建状态文件 (默认: {DEFAULT_STATE_PATH})")
+        print("  --base <路径>        链接前缀 (默认: 从 Hugo 配置的 baseURL 读取)")
+        print("  --query <文本>       在已构建的索引中查询，用于检查结果")
+        print("")
+        print("示例:")
+        print("  python build-search-index.py content")
+        print("  python build-search-index.py --query 线性布局")
+        return
+
+    content_dir = DEFAULT_CONTENT_DIR
+    output_dir = DEFAULT_OUTPUT_DIR
+    state_path = DEFAULT_STATE_PATH
+    base_path = None
+    query = None
+
+    # 解析命令行参数
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        value = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+        if arg == "--output" and value is not None:
+            output_dir = value
+            i += 1
+        elif arg == "--state" and value is not None:
+            state_path = value
+            i += 1
+        elif arg == "--base" and value is not None:
+            base_path = value.rstrip('/')
+            i += 1
+        elif arg == "--query" and value is not None:
+            query = value
+            i += 1
+        elif not arg.startswith("-"):
+            content_dir = arg
+        i += 1
+
+    if query is not None:
+        results = search(output_dir, query)
+        if not results:
+            print(f"没有找到: {query}")
+        for (url, title, _), score in results:
+            print(f"{score:>6}  {title}  {url}")
+        return
+
+    build_search_index(content_dir, output_dir, state_path, base_path)
+
+if __name__ == "__main__":
+    main()
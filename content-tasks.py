@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容维护统一入口
+一次遍历中对每篇笔记执行选定的任务：Obsidian 格式转换、添加 showComments 评论配置、提取 featureimage，
+每个文件只读取一次，最多写入一次
+"""
+
+import io
+import os
+import sys
+import glob
+import functools
+import contextlib
+
+import obsidian_converter as converter
+from note_io import file_size, iter_ordered_results, load_script, parse_jobs, write_text
+
+comments = load_script("add-comments-batch.py")
+images = load_script("rename-android-images.py")
+
+# 提取 featureimage 的 Android 文章目录
+DEFAULT_FEATUREIMAGE_DIR = "content/android"
+
+# 任务名称 -> 输出中使用的说明
+TASKS = {
+    'convert': "格式转换",
+    'comments': "评论配置",
+    'featureimage': "featureimage",
+}
+
+
+def run_tasks(file_path, tasks, preview=False, featureimage_dir=DEFAULT_FEATUREIMAGE_DIR, options=None):
+    """
+    对单个文件执行选定的任务
+    返回 (状态, 修改了内容的任务列表, featureimage)
+    状态为 updated 已更新 / pending 需要更新（预览）/ unchanged 无需修改 / error 出错
+    featureimage 只在 featureimage_dir 目录中的文章提取；options 为转换选项（链接索引、图片尺寸等），
+    进程池中的任务传入 None，使用子进程初始化时保存的选项
+    """
+    options = converter._task_options(options) or converter.new_options()
+    try:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+
+        original = content = converter.decode_note(raw)
+        changed = []
+
+        # 先添加评论配置再转换：转换规则会处理新加入的行（例如 Front Matter 末尾的空 tags），
+        # 这样一次处理后再次运行不会产生新的修改
+        if 'comments' in tasks:
+            status, content = comments.add_comments_to_content(content)
+            if status == 'added':
+                changed.append('comments')
+
+        if 'convert' in tasks:
+            stages = converter.detect_stages(content.encode('utf-8') if changed else raw, options=options)
+            if stages:
+                converted = converter.convert_content(content, stages, options=options)
+                if converted != content:
+                    changed.insert(0, 'convert')
+                    content = converted
+
+        featureimage = None
+        if 'featureimage' in tasks and _in_directory(file_path, featureimage_dir):
+            featureimage = images.extract_featureimage(file_path, content)
+
+        labels = "、".join(TASKS[task] for task in changed)
+        if not changed:
+            print(f"无需修改: {file_path}")
+            return 'unchanged', changed, featureimage
+        if preview:
+            print(f"需要更新: {file_path} ({labels})")
+            return 'pending', changed, featureimage
+        if not write_text(file_path, content):
+            print(f"无需修改: {file_path}")
+            return 'unchanged', [], featureimage
+        print(f"已更新: {file_path} ({labels})")
+        return 'updated', changed, featureimage
+
+    except Exception as e:
+        print(f"处理文件 {file_path} 时出错: {e}")
+        return 'error', [], None
+
+
+def _in_directory(file_path, directory):
+    """文件是否直接位于 directory 目录中（不含子目录）"""
+    return os.path.abspath(os.path.dirname(file_path)) == os.path.abspath(directory)
+
+
+def _run_tasks_worker(file_path, tasks, preview, featureimage_dir):
+    """
+    进程池中执行的任务，输出先缓存下来由主进程按文件顺序打印
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = run_tasks(file_path, tasks, preview, featureimage_dir)
+    return result, buffer.getvalue()
+
+
+def iter_task_results(files, tasks, jobs=1, preview=False, featureimage_dir=DEFAULT_FEATUREIMAGE_DIR, options=None):
+    """
+    依次产出每个文件的处理结果，顺序与 files 一致
+    jobs > 1 时使用进程池并行处理，较大的文件优先提交，转换选项 options 在创建子进程时传递一次
+    """
+    options = options or converter.new_options()
+
+    def run_serial(file_path):
+        # 不使用进程池时直接输出
+        return run_tasks(file_path, tasks, preview, featureimage_dir, options), ''
+
+    worker = functools.partial(_run_tasks_worker, tasks=tasks, preview=preview, featureimage_dir=featureimage_dir)
+    for result, output in iter_ordered_results(files, worker, jobs, size=file_size, serial=run_serial,
+                                               initializer=converter._init_worker, initargs=(options,)):
+        sys.stdout.write(output)
+        yield result
+
+
+def run_content_tasks(directory_path, tasks, pattern="*.md", recursive=False, jobs=1, preview=False,
+                      rename_images=False, featureimage_dir=DEFAULT_FEATUREIMAGE_DIR, links=False, link_cache=None,
+                      image_sizes=None):
+    """
+    遍历目录一次，对每篇笔记执行选定的任务
+    rename_images 时按提取到的 featureimage 重命名 assets/images/android 中的图片
+    links / link_cache / image_sizes 为格式转换的选项，与 obsidian-to-blowfish.py 的同名参数一致
+    """
+    if not os.path.exists(directory_path):
+        print(f"目录不存在: {directory_path}")
+        return
+
+    # 查找所有Markdown文件
+    if recursive:
+        search_pattern = os.path.join(directory_path, "**", pattern)
+        files = glob.glob(search_pattern, recursive=True)
+    else:
+        search_pattern = os.path.join(directory_path, pattern)
+        files = glob.glob(search_pattern)
+
+    if not files:
+        print(f"在目录 {directory_path} 中没有找到匹配 {pattern} 的文件")
+        return
+
+    files.sort()
+    options = None
+    if 'convert' in tasks:
+        options = converter.Converter.for_directory(directory_path, links, link_cache, None, image_sizes).options
+    names = "、".join(TASKS[task] for task in TASKS if task in tasks)
+    print(f"{'预览模式 - ' if preview else ''}找到 {len(files)} 个文件，执行任务: {names}")
+    print("-" * 50)
+
+    counts = {task: 0 for task in TASKS}
+    updated_count = 0
+    error_count = 0
+    mapping = {}
+    for status, changed, featureimage in iter_task_results(files, tasks, jobs, preview, featureimage_dir, options):
+        if status in ('updated', 'pending'):
+            updated_count += 1
+        elif status == 'error':
+            error_count += 1
+        for task in changed:
+            counts[task] += 1
+        if featureimage:
+            article_num, expected_filename = featureimage
+            mapping[article_num] = expected_filename
+
+    print("-" * 50)
+    action = "需要更新" if preview else "成功更新"
+    print(f"处理完成！共处理 {len(files)} 个文件，{action} {updated_count} 个文件，出错 {error_count} 个文件")
+    for task in ('convert', 'comments'):
+        if task in tasks:
+            print(f"  {TASKS[task]}: {counts[task]} 个文件")
+
+    if 'featureimage' in tasks:
+        print(f"  featureimage: 提取到 {len(mapping)} 个映射关系")
+        for article_num in sorted(mapping, key=int):
+            print(f"    文章 {article_num} -> {mapping[article_num]}")
+        if rename_images and mapping:
+            print("=" * 50)
+            if preview:
+                images.preview_rename(mapping)
+            else:
+                images.rename_images(mapping)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("内容维护统一入口")
+        print("使用方法:")
+        print("  python content-tasks.py <目录路径> [选项]")
+        print("")
+        print("选项:")
+        print("  --recursive, -r     递归搜索子目录")
+        print("  --preview, -p       仅预览，不实际修改文件")
+        print("  --pattern <模式>     文件匹配模式 (默认: *.md)")
+        print("  --tasks <列表>       要执行的任务，逗号分隔 (默认: convert,comments,featureimage)")
+        print("  --rename-images     按提取到的 featureimage 重命名 assets/images/android 中的图片")
+        print(f"  --featureimage-dir <目录>  提取 featureimage 的文章目录 (默认: {DEFAULT_FEATUREIMAGE_DIR})")
+        print("  --links             格式转换时转换 Wiki 链接和嵌入 (同 obsidian-to-blowfish.py --links)")
+        print("  --link-cache <文件>  链接索引缓存文件，指定时同时启用 --links")
+        print("  --image-sizes       格式转换时写入图片宽高 (同 obsidian-to-blowfish.py --image-sizes)")
+        print("  --image-index <文件> 图片尺寸索引文件，指定时同时启用 --image-sizes")
+        print("  --jobs, -j <数量>    并行处理的进程数 (0 表示使用全部CPU核心)")
+        print("")
+        print("任务:")
+        print("  convert             Obsidian 格式转换 (同 obsidian-to-blowfish.py)")
+        print("  comments            添加 showComments: true (同 add-comments-batch.py)")
+        print("  featureimage        提取 Android 文章的 featureimage (同 rename-android-images.py)")
+        print("")
+        print("示例:")
+        print("  python content-tasks.py content -r")
+        print("  python content-tasks.py content -r --tasks convert,comments --jobs 8")
+        print("  python content-tasks.py content -r --rename-images --preview")
+        print("  python content-tasks.py content -r --tasks convert --links --image-sizes")
+        return
+
+    directory_path = sys.argv[1]
+    pattern = "*.md"
+    recursive = False
+    preview_only = False
+    rename_images = False
+    tasks = set(TASKS)
+    jobs = 1
+    featureimage_dir = DEFAULT_FEATUREIMAGE_DIR
+    links = False
+    link_cache = None
+    image_sizes = None
+
+    # 解析命令行参数
+    i = 2
+    try:
+        while i < len(sys.argv):
+            arg = sys.argv[i]
+            if arg in ["--recursive", "-r"]:
+                recursive = True
+            elif arg in ["--preview", "-p"]:
+                preview_only = True
+            elif arg == "--rename-images":
+                rename_images = True
+            elif arg == "--links":
+                links = True
+            elif arg == "--image-sizes":
+                image_sizes = image_sizes or {}
+            elif arg == "--pattern" and i + 1 < len(sys.argv):
+                pattern = sys.argv[i + 1]
+                i += 1
+            elif arg == "--tasks" and i + 1 < len(sys.argv):
+                tasks = {task.strip() for task in sys.argv[i + 1].split(",") if task.strip()}
+                unknown = tasks - set(TASKS)
+                if unknown:
+                    print(f"未知任务: {', '.join(sorted(unknown))}")
+                    return
+                i += 1
+            elif arg == "--featureimage-dir" and i + 1 < len(sys.argv):
+                featureimage_dir = sys.argv[i + 1]
+                i += 1
+            elif arg == "--link-cache" and i + 1 < len(sys.argv):
+                links = True
+                link_cache = sys.argv[i + 1]
+                i += 1
+            elif arg == "--image-index" and i + 1 < len(sys.argv):
+                image_sizes = {'index_path': sys.argv[i + 1]}
+                i += 1
+            elif arg in ["--jobs", "-j"] and i + 1 < len(sys.argv):
+                jobs = parse_jobs(sys.argv[i + 1])
+                i += 1
+            i += 1
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+
+    if rename_images:
+        tasks.add('featureimage')
+    run_content_tasks(directory_path, tasks, pattern, recursive, jobs, preview_only, rename_images,
+                      featureimage_dir, links, link_cache, image_sizes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量转换清单
+记录每个笔记上次转换后的大小、修改时间和内容哈希，批量转换和监视模式据此跳过未变化的文件；
+转换规则或转换选项变化时版本号随之变化，清单中的旧记录全部失效
+"""
+
+import os
+import json
+
+from note_io import atomic_write
+
+
+def load_manifest(manifest_path, version):
+    """
+    读取增量转换清单
+    清单不存在、无法解析或转换规则版本不一致时返回空清单
+    version 为转换器的版本号（Converter.version）；启用 Wiki 链接时附加链接索引摘要，索引变化后所有记录失效
+    """
+    manifest = {
+        'path': manifest_path,
+        'version': version,
+        'root': os.path.dirname(os.path.abspath(manifest_path)),
+        'files': {},
+    }
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return manifest
+    except (OSError, ValueError) as e:
+        print(f"读取清单 {manifest_path} 时出错，将重新转换所有文件: {e}")
+        return manifest
+
+    if data.get('converter_version') != version:
+        print(f"转换规则版本已变化 ({data.get('converter_version')} -> {version})，清单已失效")
+        return manifest
+
+    manifest['files'] = data.get('files', {})
+    return manifest
+
+
+def save_manifest(manifest):
+    """
+    保存增量转换清单，并移除已不存在的文件记录
+    """
+    files = manifest['files']
+    for key in [k for k in files if not os.path.exists(os.path.join(manifest['root'], k))]:
+        del files[key]
+
+    data = {'converter_version': manifest['version'], 'files': files}
+    atomic_write(manifest['path'], lambda f: json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True))
+
+
+def manifest_key(manifest, file_path):
+    """清单中的文件键：相对于清单所在目录的路径"""
+    return os.path.relpath(os.path.abspath(file_path), manifest['root']).replace(os.sep, '/')
+
+
+def manifest_entry(stat, digest):
+    """清单中一个文件的记录：大小、修改时间和内容哈希"""
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
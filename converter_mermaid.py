@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mermaid 预渲染
+转换时调用外部渲染命令（默认 mermaid-cli 的 mmdc）把图表渲染为内嵌 SVG，
+页面不再需要加载 mermaid.js。渲染结果按图表源码和主题的哈希缓存，
+没有渲染命令或渲染失败时转换脚本仍然输出 {{< mermaid >}} 短代码
+"""
+
+import os
+import re
+import shlex
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+from note_io import atomic_write
+
+# {input} {output} {theme} 会被替换；命令中没有 {input} 时源码从标准输入传入，没有 {output} 时从标准输出读取 SVG
+DEFAULT_MERMAID_COMMAND = "mmdc -i {input} -o {output} -t {theme} -b transparent"
+DEFAULT_MERMAID_THEME = "default"
+DEFAULT_MERMAID_CACHE = ".mermaid-cache"
+MERMAID_TIMEOUT = 60
+SVG_START_RE = re.compile(r'<svg[\s>]')
+MERMAID_SHORTCODE_RE = re.compile(r'\{\{<\s*mermaid\s*>\}\}\n(.*?)\n\{\{<\s*/mermaid\s*>\}\}', re.DOTALL)
+
+
+def mermaid_cache_key(source, theme):
+    return hashlib.sha256(f"{theme}\0{source}".encode('utf-8')).hexdigest()
+
+
+def format_mermaid_svg(svg):
+    return '<div class="mermaid-svg">\n' + svg + '\n</div>'
+
+
+def _clean_svg(svg):
+    """去掉 XML 声明等 <svg> 之前的内容和空行；Markdown 中的 HTML 块遇到空行就会结束"""
+    match = SVG_START_RE.search(svg)
+    if match is None:
+        return None
+    lines = svg[match.start():].replace('\r\n', '\n').split('\n')
+    return '\n'.join(line for line in lines if line.strip()).strip()
+
+
+def _run_mermaid_command(source, renderer):
+    """调用渲染命令，返回 SVG 文本；失败时抛出异常"""
+    with tempfile.TemporaryDirectory(prefix='mermaid-') as directory:
+        input_path = os.path.join(directory, 'diagram.mmd')
+        output_path = os.path.join(directory, 'diagram.svg')
+        with open(input_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        template = renderer['command']
+        args = [
+            part.replace('{input}', input_path).replace('{output}', output_path).replace('{theme}', renderer['theme'])
+            for part in shlex.split(template)
+        ]
+        result = subprocess.run(
+            args,
+            input=None if '{input}' in template else source.encode('utf-8'),
+            capture_output=True,
+            timeout=MERMAID_TIMEOUT,
+        )
+        if result.returncode != 0:
+            message = result.stderr.decode('utf-8', 'replace').strip().splitlines()
+            raise RuntimeError(message[-1] if message else f"退出码 {result.returncode}")
+        if '{output}' in template:
+            with open(output_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        return result.stdout.decode('utf-8')
+
+
+def render_mermaid(source, renderer):
+    """
+    按 enable_mermaid_render 建立的渲染配置把 Mermaid 源码渲染为 SVG，返回清理后的 SVG 文本
+    缓存命中时不调用渲染命令；没有可用的渲染命令或渲染失败时返回 None
+    """
+    cache_path = os.path.join(renderer['cache_dir'], mermaid_cache_key(source, renderer['theme']) + '.svg')
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    if not renderer['available']:
+        return None
+    try:
+        svg = _clean_svg(_run_mermaid_command(source, renderer))
+        if svg is None:
+            raise RuntimeError("渲染结果中没有 <svg>")
+    except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+        print(f"Mermaid 渲染失败，保留 mermaid 短代码: {e}")
+        return None
+
+    os.makedirs(renderer['cache_dir'], exist_ok=True)
+    atomic_write(cache_path, lambda f: f.write(svg))
+    return svg
+
+
+def enable_mermaid_render(options, command=None, theme=None, cache_dir=None):
+    """
+    把渲染配置保存到转换选项 options 中以启用 Mermaid 预渲染，返回增量清单版本号中追加的后缀
+    渲染命令不存在时只使用缓存中已有的 SVG，其余图表保留短代码
+    """
+    renderer = {
+        'command': command or DEFAULT_MERMAID_COMMAND,
+        'theme': theme or DEFAULT_MERMAID_THEME,
+        'cache_dir': os.path.abspath(cache_dir or DEFAULT_MERMAID_CACHE),
+    }
+    program = shlex.split(renderer['command'])[0]
+    renderer['available'] = shutil.which(program) is not None
+    if not renderer['available']:
+        print(f"未找到 Mermaid 渲染命令 {program}，只使用缓存中已渲染的图表，其余保留 mermaid 短代码")
+    options['mermaid'] = renderer
+    digest = hashlib.sha256(f"{renderer['command']}\0{renderer['theme']}".encode('utf-8')).hexdigest()
+    return f"+mermaid-{digest[:12]}"
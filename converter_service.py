@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换服务
+编辑器和 Hugo 钩子可以启动常驻服务，通过标准输入输出或 Unix 套接字发送 JSON Lines 请求，
+由同一个 Converter 处理，不必每次保存都启动新的解释器、重新编译正则和建立链接索引
+"""
+
+import io
+import os
+import sys
+import json
+import socket
+import contextlib
+import threading
+import socketserver
+from stat import S_ISSOCK
+
+SERVICE_OPS = ('ping', 'convert_text', 'convert_file')
+# convert_file 的输出通过重定向标准输出捕获（对整个进程生效），同一时间只处理一个请求
+_service_lock = threading.Lock()
+
+
+def handle_request(converter, request):
+    """
+    处理一条服务请求，返回响应字典
+    请求: {"id": 任意值, "op": "ping" | "convert_text" | "convert_file", "text": 文本, "path": 文件路径, "stream": 布尔值}
+    响应: {"id": 请求中的 id, "ok": 是否成功, "text" / "status" / "version": 结果, "error": 错误信息}
+    """
+    response = {'id': request.get('id') if isinstance(request, dict) else None}
+    try:
+        if not isinstance(request, dict):
+            raise ValueError("请求必须是 JSON 对象")
+        op = request.get('op')
+        if op not in SERVICE_OPS:
+            raise ValueError(f"未知操作: {op}")
+        with _service_lock:
+            if op == 'ping':
+                response['version'] = converter.version
+            elif op == 'convert_text':
+                response['text'] = converter.convert_text(request['text'])
+            else:
+                buffer = io.StringIO()
+                with contextlib.redirect_stdout(buffer):
+                    status = converter.convert_file(request['path'], stream=bool(request.get('stream')))
+                response['status'] = status
+                if status == 'error':
+                    raise RuntimeError(buffer.getvalue().strip())
+        response['ok'] = True
+    except Exception as e:
+        response['ok'] = False
+        response['error'] = str(e) if not isinstance(e, KeyError) else f"缺少参数: {e.args[0]}"
+    return response
+
+
+def _serve_lines(converter, lines, write):
+    """逐行读取 JSON 请求，每个请求写回一行 JSON 响应"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {'id': None, 'ok': False, 'error': f"无法解析请求: {e}"}
+        else:
+            response = handle_request(converter, request)
+        write(json.dumps(response, ensure_ascii=False) + '\n')
+
+
+def serve_stdio(converter):
+    """通过标准输入输出提供服务，直到标准输入关闭；其他提示信息输出到标准错误"""
+    out = sys.stdout
+
+    def write(text):
+        out.write(text)
+        out.flush()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        print(f"转换服务已启动 (标准输入输出)，转换器版本 {converter.version}")
+        _serve_lines(converter, sys.stdin, write)
+
+
+class _ServiceHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        lines = (line.decode('utf-8') for line in self.rfile)
+
+        def write(text):
+            self.wfile.write(text.encode('utf-8'))
+            self.wfile.flush()
+
+        _serve_lines(self.server.converter, lines, write)
+
+
+def _is_socket(path):
+    try:
+        return S_ISSOCK(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+def _socket_in_use(socket_path):
+    """是否有其他服务正在该套接字上监听"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def serve_socket(converter, socket_path):
+    """
+    在 Unix 套接字上提供服务，每个连接可以发送多条请求，按 Ctrl+C 退出
+    只删除上次没有正常退出时遗留的套接字文件；路径是普通文件、目录或正在使用的套接字时拒绝启动，返回 False
+    """
+    if os.path.lexists(socket_path):
+        if not _is_socket(socket_path):
+            print(f"{socket_path} 已存在且不是套接字文件，拒绝覆盖")
+            return False
+        if _socket_in_use(socket_path):
+            print(f"{socket_path} 上已有转换服务在运行")
+            return False
+        # 上次没有正常退出时遗留的套接字文件
+        os.remove(socket_path)
+    server = socketserver.ThreadingUnixStreamServer(socket_path, _ServiceHandler)
+    server.daemon_threads = True
+    server.converter = converter
+    print(f"转换服务已启动: {socket_path}，转换器版本 {converter.version}，按 Ctrl+C 退出")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("已停止服务")
+    finally:
+        server.server_close()
+        if _is_socket(socket_path):
+            os.remove(socket_path)
+    return True
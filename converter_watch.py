@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监视模式
+笔记保存后只转换发生变化的文件。Linux 上使用 inotify（通过 ctypes 调用 libc），其他系统退回轮询
+"""
+
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import fnmatch
+
+from converter_manifest import load_manifest, save_manifest
+from obsidian_converter import Converter
+
+# 同一文件在该时间（秒）内的连续写入只转换一次（Obsidian 会连续自动保存）
+WATCH_DEBOUNCE = 0.5
+# 无法使用 inotify 时的轮询间隔（秒）
+WATCH_POLL_INTERVAL = 1.0
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+INOTIFY_EVENT = struct.Struct('iIII')
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+def _watched_file(directory_path, file_path, pattern, recursive):
+    """文件是否在监视范围内（忽略隐藏文件，包括写入时使用的临时文件）"""
+    name = os.path.basename(file_path)
+    if name.startswith('.') or not fnmatch.fnmatch(name, pattern):
+        return False
+    return recursive or os.path.dirname(file_path) == directory_path
+
+
+def _walk_files(directory_path, recursive):
+    for root, dirs, files in os.walk(directory_path):
+        for name in files:
+            yield os.path.join(root, name)
+        if not recursive:
+            break
+
+
+class _InotifyWatcher:
+    """基于 inotify 的目录监视（仅 Linux，通过 ctypes 调用 libc）"""
+
+    def __init__(self, directory_path, recursive):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.recursive = recursive
+        self.dirs = {}
+        try:
+            self._add_tree(directory_path)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_dir(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), INOTIFY_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"无法监视目录: {path}")
+        self.dirs[wd] = path
+
+    def _add_tree(self, path):
+        """监视目录（递归时包括全部子目录），返回其中已有的文件"""
+        found = []
+        for root, dirs, files in os.walk(path):
+            self._add_dir(root)
+            found.extend(os.path.join(root, name) for name in files)
+            if not self.recursive:
+                break
+        return found
+
+    def wait(self, timeout):
+        """等待文件变化，返回变化的文件路径列表"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，无法知道哪些文件变化了，重新检查所有文件
+                for root in list(self.dirs.values()):
+                    changed.extend(_walk_files(root, False))
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    # 新目录在添加监视之前可能已经写入了文件
+                    changed.extend(self._add_tree(path))
+                continue
+            changed.append(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollingWatcher:
+    """定期比较文件大小和修改时间的目录监视，用于不支持 inotify 的系统"""
+
+    def __init__(self, directory_path, recursive, interval=WATCH_POLL_INTERVAL):
+        self.directory_path = directory_path
+        self.recursive = recursive
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in _walk_files(self.directory_path, self.recursive):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = [path for path, state in snapshot.items() if self.snapshot.get(path) != state]
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(directory_path, recursive, poll=False):
+    """优先使用 inotify，不可用时退回轮询"""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return _InotifyWatcher(directory_path, recursive)
+        except (OSError, AttributeError) as e:
+            print(f"无法使用 inotify ({e})，改为每 {WATCH_POLL_INTERVAL} 秒轮询")
+    return _PollingWatcher(directory_path, recursive)
+
+
+def watch_directory(directory_path, pattern="*.md", recursive=False, manifest_path=None, stream=False,
+                    poll=False, debounce=WATCH_DEBOUNCE, links=False, link_cache=None, mermaid=None,
+                    image_sizes=None):
+    """
+    监视目录，笔记保存后只转换发生变化的文件，按 Ctrl+C 退出
+    同一文件的连续保存在 debounce 秒内合并为一次转换；转换脚本自己写回的文件不会再次触发转换
+    links 时在开始监视前建立一次链接索引，mermaid 时启用 Mermaid 预渲染，image_sizes 时写入图片宽高
+    """
+    if not os.path.exists(directory_path):
+        print(f"目录不存在: {directory_path}")
+        return
+
+    directory_path = os.path.normpath(directory_path)
+    conv = Converter.for_directory(directory_path, links, link_cache, mermaid, image_sizes)
+    manifest = load_manifest(manifest_path, conv.version) if manifest_path else None
+    watcher = open_watcher(directory_path, recursive, poll)
+    mode = "inotify" if isinstance(watcher, _InotifyWatcher) else "轮询"
+    print(f"开始监视 {directory_path} ({mode})，按 Ctrl+C 退出")
+    print("-" * 50)
+
+    pending = {}   # 文件 -> 最后一次变化后允许转换的时间
+    written = {}   # 文件 -> 本脚本写回后的 (大小, 修改时间)
+    try:
+        while True:
+            timeout = max(0.0, min(pending.values()) - time.monotonic()) if pending else None
+            for file_path in watcher.wait(timeout):
+                if _watched_file(directory_path, file_path, pattern, recursive):
+                    pending[file_path] = time.monotonic() + debounce
+
+            now = time.monotonic()
+            for file_path in sorted(path for path, due in pending.items() if due <= now):
+                del pending[file_path]
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    written.pop(file_path, None)
+                    continue
+                if written.get(file_path) == (stat.st_size, stat.st_mtime_ns):
+                    # 本脚本写回文件产生的事件
+                    continue
+
+                status = conv.convert_file(file_path, manifest, stream=stream)
+                if status == 'converted':
+                    stat = os.stat(file_path)
+                    written[file_path] = (stat.st_size, stat.st_mtime_ns)
+                else:
+                    written.pop(file_path, None)
+                if manifest is not None and status in ('converted', 'unchanged'):
+                    save_manifest(manifest)
+    except KeyboardInterrupt:
+        print("-" * 50)
+        print("已停止监视")
+    finally:
+        watcher.close()
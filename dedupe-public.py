@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+public 目录去重脚本
+在 Hugo 构建之后运行：对 public/ 中的所有文件按内容哈希分组，把页面中对重复图片的引用改写为同一个规范文件
+并删除重复文件，直接缩小部署产物；其余重复文件（以及仍被相对路径引用的图片）替换为硬链接。
+部署通过 git 推送到 gh-pages 分支，git 不保留硬链接，硬链接只节省本地磁盘；--hardlink 时只做硬链接，不改写页面
+"""
+
+import os
+import re
+import sys
+from urllib.parse import urlsplit
+
+from note_io import file_sha256, site_base_path, write_text
+
+DEFAULT_PUBLIC_DIR = "public"
+# 小于该大小的文件不处理（硬链接省下的空间可以忽略）
+DEFAULT_MIN_SIZE = 1024
+# 改写引用时会被改写的文本文件和可以删除的重复文件
+TEXT_EXTENSIONS = ('.html', '.xml', '.css', '.js', '.json', '.txt', '.webmanifest')
+REWRITE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg')
+# 页面中的引用：src / href / srcset 等属性的值（带引号、不带引号或 RSS 中转义的引号）和 CSS 的 url()
+REFERENCE_RE = re.compile(
+    r'''\b(?:src|href|srcset|data-src|data-srcset|poster|content)\s*=\s*'''
+    r'''(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?:&#34;|&quot;)(?P<eq>.*?)(?:&#34;|&quot;)|(?P<bare>[^\s"'=<>`]+))'''
+    r'''|\burl\(\s*(?:"(?P<udq>[^"]*)"|'(?P<usq>[^']*)'|(?P<ubare>[^)\s"']*))\s*\)''',
+    re.IGNORECASE,
+)
+REFERENCE_GROUPS = ('dq', 'sq', 'eq', 'bare', 'udq', 'usq', 'ubare')
+# 属性值中的单个 URL（srcset 中以空白和逗号分隔）
+URL_TOKEN_RE = re.compile(r'[^\s,]+')
+
+
+def find_duplicates(public_dir, min_size=DEFAULT_MIN_SIZE):
+    """
+    查找内容相同的文件
+    先按大小分组，只有大小相同的文件才计算哈希；已经是同一个 inode 的文件视为一个
+    返回 [[规范文件, 重复文件...], ...]，每组按路径排序，第一个为规范文件
+    """
+    by_size = {}
+    for root, dirs, files in os.walk(public_dir):
+        dirs.sort()
+        for name in files:
+            path = os.path.join(root, name)
+            stat = os.lstat(path)
+            if not os.path.isfile(path) or os.path.islink(path) or stat.st_size < min_size:
+                continue
+            by_size.setdefault(stat.st_size, []).append((path, (stat.st_dev, stat.st_ino)))
+
+    groups = []
+    for size, entries in by_size.items():
+        if len({inode for _, inode in entries}) < 2:
+            continue
+        by_hash = {}
+        hashed_inodes = {}
+        for path, inode in sorted(entries):
+            # 同一个 inode 只计算一次哈希
+            if inode not in hashed_inodes:
+                hashed_inodes[inode] = file_sha256(path)
+            by_hash.setdefault(hashed_inodes[inode], []).append((path, inode))
+        for paths in by_hash.values():
+            if len({inode for _, inode in paths}) > 1:
+                groups.append([path for path, _ in paths])
+    groups.sort()
+    return groups
+
+
+def replace_with_hardlink(canonical, duplicate):
+    """用指向规范文件的硬链接原子替换重复文件"""
+    temp_path = duplicate + '.dedupe-tmp'
+    os.link(canonical, temp_path)
+    try:
+        os.replace(temp_path, duplicate)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def url_path(public_dir, file_path):
+    """文件在站点中的路径，以 / 开头，用于在页面中查找引用"""
+    return '/' + os.path.relpath(file_path, public_dir).replace(os.sep, '/')
+
+
+def _rewrite_url(url, renames, base_path):
+    """
+    URL 的路径恰好是 renames 中的旧路径（或 baseURL 路径加旧路径）时改写路径部分，保留协议、主机、查询和锚点
+    /x/images/a.jpg、/images/a.jpg.webp 这类只是包含旧路径的 URL 不会被改写
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    path = parts.path
+    prefix = ''
+    if base_path and path.startswith(base_path + '/'):
+        prefix, path = base_path, path[len(base_path):]
+    new = renames.get(path)
+    if new is None and prefix:
+        # 不带 baseURL 前缀的根相对路径
+        prefix, path = '', parts.path
+        new = renames.get(path)
+    if new is None:
+        return url
+    return parts._replace(path=prefix + new).geturl()
+
+
+def rewrite_content(content, renames, base_path=''):
+    """改写文本中属性值和 url() 里对 renames 中旧路径的引用，返回新文本"""
+    def replace_value(match):
+        for group in REFERENCE_GROUPS:
+            if match.group(group) is not None:
+                break
+        value = match.group(group)
+        new_value = URL_TOKEN_RE.sub(lambda token: _rewrite_url(token.group(0), renames, base_path), value)
+        if new_value == value:
+            return match.group(0)
+        start = match.start(group) - match.start()
+        return match.group(0)[:start] + new_value + match.group(0)[start + len(value):]
+
+    return REFERENCE_RE.sub(replace_value, content)
+
+
+def rewrite_references(public_dir, renames, preview=False, base_path=''):
+    """
+    把文本文件中的引用按 renames {旧路径: 新路径} 改写，返回改写的文件数
+    只改写 src / href / srcset 等属性值和 url() 中路径完全相同的 URL，
+    绝对 URL（含 baseURL 前缀 base_path）和根相对路径都能被替换
+    """
+    rewritten = 0
+    if not renames:
+        return rewritten
+    for root, dirs, files in os.walk(public_dir):
+        for name in files:
+            if not name.lower().endswith(TEXT_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+            new_content = rewrite_content(content, renames, base_path)
+            if new_content != content:
+                rewritten += 1
+                if not preview:
+                    write_text(path, new_content)
+    return rewritten
+
+
+def _referenced_names(public_dir, names):
+    """在文本文件中查找仍然出现的文件名（可能是相对路径引用），返回出现过的集合"""
+    found = set()
+    for root, dirs, files in os.walk(public_dir):
+        for name in files:
+            if not name.lower().endswith(TEXT_EXTENSIONS):
+                continue
+            try:
+                with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+            found.update(n for n in names - found if n in content)
+            if found == names:
+                return found
+    return found
+
+
+def dedupe_public(public_dir=DEFAULT_PUBLIC_DIR, min_size=DEFAULT_MIN_SIZE, rewrite=True, preview=False,
+                  base_path=None):
+    """
+    对 public 目录去重，返回节省的字节数
+    rewrite 时重复的图片改写引用后删除，仍被相对路径引用的和其他重复文件替换为硬链接；
+    rewrite 为 False 时只替换为硬链接（只节省本地磁盘，推送到 git 的部署产物不会变小）
+    base_path 为 baseURL 的路径部分，默认从站点配置读取
+    """
+    if not os.path.exists(public_dir):
+        print(f"目录不存在: {public_dir}")
+        return 0
+
+    groups = find_duplicates(public_dir, min_size)
+    if not groups:
+        print(f"在目录 {public_dir} 中没有找到重复文件")
+        return 0
+
+    duplicate_count = sum(len(group) - 1 for group in groups)
+    print(f"{'预览模式 - ' if preview else ''}找到 {len(groups)} 组共 {duplicate_count} 个重复文件")
+    print("-" * 50)
+
+    renames = {}
+    if rewrite:
+        if base_path is None:
+            base_path = site_base_path(os.path.dirname(os.path.abspath(public_dir)))
+        for group in groups:
+            canonical = group[0]
+            for duplicate in group[1:]:
+                if duplicate.lower().endswith(REWRITE_EXTENSIONS):
+                    renames[url_path(public_dir, duplicate)] = url_path(public_dir, canonical)
+        rewritten = rewrite_references(public_dir, renames, preview, base_path)
+        print(f"{'需要改写' if preview else '已改写'} {rewritten} 个文件中的引用")
+
+    # 改写后仍以文件名出现的重复图片可能被相对路径引用，不能删除
+    still_referenced = set()
+    if rewrite and renames and not preview:
+        names = {path.rsplit('/', 1)[-1] for path in renames}
+        still_referenced = _referenced_names(public_dir, names)
+
+    saved = 0
+    linked = 0
+    removed = 0
+    for group in groups:
+        canonical = group[0]
+        for duplicate in group[1:]:
+            size = os.path.getsize(duplicate)
+            # 已经是硬链接的文件不再占用额外空间
+            if os.path.samefile(canonical, duplicate):
+                continue
+            name = os.path.basename(duplicate)
+            remove = url_path(public_dir, duplicate) in renames and name not in still_referenced
+            action = "删除" if remove else "硬链接"
+            print(f"{action}: {duplicate} -> {canonical}")
+            if not preview:
+                if remove:
+                    os.remove(duplicate)
+                    removed += 1
+                else:
+                    replace_with_hardlink(canonical, duplicate)
+                    linked += 1
+            saved += size
+
+    print("-" * 50)
+    verb = "可节省" if preview else "节省"
+    print(f"去重完成！硬链接 {linked} 个文件，删除 {removed} 个文件，{verb} {saved / 1024 / 1024:.2f} MB ({saved} 字节)")
+    if linked:
+        print("注意: 硬链接只节省本地磁盘，推送到 gh-pages 等 git 分支后仍是独立的文件")
+    return saved
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h"]:
+        print("public 目录去重脚本")
+        print("使用方法:")
+        print("  python dedupe-public.py [目录路径] [选项]")
+        print("")
+        print("选项:")
+        print("  --preview, -p       仅预览，不修改文件")
+        print("  --hardlink          只把重复文件替换为硬链接，不改写页面（只节省本地磁盘，git 部署不会变小）")
+        print("  --base-path <路径>   baseURL 的路径部分，例如 /blog (默认从站点配置读取)")
+        print(f"  --min-size <字节>    忽略小于该大小的文件 (默认: {DEFAULT_MIN_SIZE})")
+        print("")
+        print("示例:")
+        print("  hugo --minify && python dedupe-public.py")
+        print("  python dedupe-public.py public --preview")
+        return
+
+    public_dir = DEFAULT_PUBLIC_DIR
+    min_size = DEFAULT_MIN_SIZE
+    rewrite = True
+    base_path = None
+    preview_only = False
+
+    # 解析命令行参数
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        if arg in ["--preview", "-p"]:
+            preview_only = True
+        elif arg == "--hardlink":
+            rewrite = False
+        elif arg == "--base-path" and i + 1 < len(sys.argv):
+            base_path = sys.argv[i + 1].rstrip('/')
+            i += 1
+        elif arg == "--min-size" and i + 1 < len(sys.argv):
+            min_size = int(sys.argv[i + 1])
+            i += 1
+        elif not arg.startswith("-"):
+            public_dir = arg
+        i += 1
+
+    dedupe_public(public_dir, min_size, rewrite, preview_only, base_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量查询和修改 Front Matter
+每个文件只解析一次 Front Matter，一次应用所有 --set / --unset / --append 修改，只重写 Front Matter 部分，
+正文原样保留；--where 筛选要处理的文件。全站的元数据迁移用一条命令完成，不必每次写新脚本
+"""
+
+import io
+import os
+import sys
+import glob
+import time
+import functools
+import contextlib
+
+import front_matter
+from note_io import file_size, iter_ordered_results, parse_jobs, write_bytes
+from run_stats import new_file_record, phase, build_report, write_report
+
+
+def parse_assignment(text):
+    """解析 键=值，值按 front_matter.parse_value 解析（true/false、数字、JSON 数组，其余为字符串）"""
+    if '=' not in text:
+        raise ValueError(f"需要 键=值 形式: {text}")
+    name, value = text.split('=', 1)
+    name = name.strip()
+    if not name:
+        raise ValueError(f"缺少字段名: {text}")
+    return name, front_matter.parse_value(value)
+
+
+def edit_file(file_path, edits, filters, show=(), preview=False, record=None):
+    """
+    处理单个文件，返回状态:
+    edited 已修改（预览时为需要修改）/ unchanged 无需修改 / filtered 不满足筛选条件 /
+    no_front_matter 没有 Front Matter / error 出错
+    show 中的字段会与文件路径一起输出
+    """
+    try:
+        with phase(record, 'read'):
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        if record is not None:
+            record['bytes_read'] = len(raw)
+
+        with phase(record, 'edit'):
+            status, new_raw = front_matter.edit_front_matter(raw, edits, filters)
+
+        if status in ('filtered', 'no_front_matter'):
+            return status
+
+        details = ''
+        if show:
+            _, fields = front_matter.parse_front_matter(new_raw.decode('utf-8'))
+            details = '  ' + '  '.join(
+                f"{name}={front_matter.format_value(front_matter.get_field(fields, name, ''))}" for name in show
+            )
+
+        if status == 'unchanged':
+            print(f"{'匹配' if not edits else '无需修改'}: {file_path}{details}")
+            return status
+        if preview:
+            print(f"需要修改: {file_path}{details}")
+            return status
+
+        with phase(record, 'write'):
+            written = write_bytes(file_path, new_raw)
+        if not written:
+            print(f"无需修改: {file_path}{details}")
+            return 'unchanged'
+        if record is not None:
+            record['bytes_written'] = len(new_raw)
+        print(f"已修改: {file_path}{details}")
+        return status
+
+    except Exception as e:
+        print(f"处理文件 {file_path} 时出错: {e}")
+        return 'error'
+
+
+def _edit_file_worker(file_path, edits, filters, show, preview, report):
+    """
+    进程池中执行的任务，输出先缓存下来由主进程按文件顺序打印
+    """
+    record = new_file_record(file_path) if report else None
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        status = edit_file(file_path, edits, filters, show, preview, record)
+    if record is not None:
+        record['status'] = status
+    return status, buffer.getvalue(), record
+
+
+def iter_edit_results(files, edits, filters, show=(), preview=False, jobs=1, records=None, quiet=False):
+    """
+    依次产出每个文件的状态，顺序与 files 一致
+    jobs > 1 时使用进程池并行处理，较大的文件优先提交
+    records 为列表时追加每个文件的统计记录；quiet 时只输出出错文件的信息
+    """
+    report = records is not None
+    worker = functools.partial(_edit_file_worker, edits=edits, filters=filters, show=show, preview=preview,
+                               report=report)
+    for status, output, record in iter_ordered_results(files, worker, jobs, size=file_size):
+        if not quiet or status == 'error':
+            sys.stdout.write(output)
+        if report:
+            records.append(record)
+        yield status
+
+
+def batch_edit(directory_path, edits, filters, pattern="*.md", recursive=False, show=(), preview=False, jobs=1,
+               stats_path=None, quiet=False):
+    """
+    批量查询或修改目录中笔记的 Front Matter
+    没有修改操作时只列出满足筛选条件的文件
+    """
+    started = time.perf_counter()
+    if not os.path.exists(directory_path):
+        print(f"目录不存在: {directory_path}")
+        return 0
+
+    # 查找所有Markdown文件
+    if recursive:
+        search_pattern = os.path.join(directory_path, "**", pattern)
+        files = glob.glob(search_pattern, recursive=True)
+    else:
+        search_pattern = os.path.join(directory_path, pattern)
+        files = glob.glob(search_pattern)
+
+    if not files:
+        print(f"在目录 {directory_path} 中没有找到匹配 {pattern} 的文件")
+        return 0
+
+    files.sort()
+    print(f"{'预览模式 - ' if preview and edits else ''}找到 {len(files)} 个文件")
+    print("-" * 50)
+
+    counts = {}
+    records = [] if stats_path else None
+    for status in iter_edit_results(files, edits, filters, show, preview, jobs, records, quiet):
+        counts[status] = counts.get(status, 0) + 1
+
+    matched = counts.get('edited', 0) + counts.get('unchanged', 0)
+    print("-" * 50)
+    if edits:
+        action = "需要修改" if preview else "已修改"
+        print(f"处理完成！共 {len(files)} 个文件，满足条件 {matched} 个，{action} {counts.get('edited', 0)} 个，"
+              f"没有 Front Matter {counts.get('no_front_matter', 0)} 个，出错 {counts.get('error', 0)} 个")
+    else:
+        print(f"查询完成！共 {len(files)} 个文件，满足条件 {matched} 个")
+    if stats_path:
+        write_report(stats_path, build_report('edit-front-matter.py', records, started, jobs=jobs))
+    return counts.get('error', 0)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("批量查询和修改 Front Matter")
+        print("使用方法:")
+        print("  python edit-front-matter.py <目录路径> [选项]")
+        print("")
+        print("选项:")
+        print("  --recursive, -r     递归搜索子目录")
+        print("  --preview, -p       仅预览，不实际修改文件")
+        print("  --pattern <模式>     文件匹配模式 (默认: *.md)")
+        print("  --where <条件>       只处理满足条件的文件，可以多次使用（同时满足）")
+        print("  --set <键=值>        设置字段，可以多次使用")
+        print("  --unset <键>         删除字段，可以多次使用")
+        print("  --append <键=值>     向数组字段追加值（已包含时不追加），可以多次使用")
+        print("  --after <键>         新增字段插入到该字段之后 (默认: 末尾)")
+        print("  --show <键,键>       输出文件时一并输出这些字段的值")
+        print("  --jobs, -j <数量>    并行处理的进程数 (0 表示使用全部CPU核心)")
+        print("  --stats <文件>       写出 JSON 统计报告")
+        print("  --quiet, -q         不输出每个文件的处理结果（出错的文件除外）")
+        print("")
+        print("条件:")
+        print("  字段 contains 值     数组包含该值，或字符串包含该文本 (!contains 为不包含)")
+        print("  字段 == 值           等于 (!= 为不等于)")
+        print("  字段 < 值            小于，还有 <=、>、>=；数字按数值比较，日期等按字符串比较")
+        print("  字段 exists          存在该字段 (missing 为不存在)")
+        print("  params.x            使用 . 读取嵌套字段")
+        print("")
+        print("示例:")
+        print("  python edit-front-matter.py content -r --where \"showComments missing\" --set showComments=true --after draft")
+        print("  python edit-front-matter.py content -r --where \"categories contains Android\" --append tags=Android")
+        print("  python edit-front-matter.py content -r --where \"date < 2025-01-01\" --show title,date")
+        return
+
+    directory_path = sys.argv[1]
+    pattern = "*.md"
+    recursive = False
+    preview_only = False
+    filters = []
+    edits = []
+    after = None
+    show = ()
+    jobs = 1
+    stats_path = None
+    quiet = False
+
+    # 解析命令行参数
+    i = 2
+    try:
+        while i < len(sys.argv):
+            arg = sys.argv[i]
+            value = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+            if arg in ["--recursive", "-r"]:
+                recursive = True
+            elif arg in ["--preview", "-p"]:
+                preview_only = True
+            elif arg in ["--quiet", "-q"]:
+                quiet = True
+            elif value is None:
+                pass
+            elif arg == "--pattern":
+                pattern = value
+                i += 1
+            elif arg == "--where":
+                filters.append(front_matter.parse_filter(value))
+                i += 1
+            elif arg in ["--set", "--append"]:
+                name, parsed = parse_assignment(value)
+                edits.append([arg[2:], name, parsed, None])
+                i += 1
+            elif arg == "--unset":
+                edits.append(['unset', value.strip(), None, None])
+                i += 1
+            elif arg == "--after":
+                after = value.strip()
+                i += 1
+            elif arg == "--show":
+                show = tuple(name.strip() for name in value.split(",") if name.strip())
+                i += 1
+            elif arg in ["--jobs", "-j"]:
+                jobs = parse_jobs(value)
+                i += 1
+            elif arg == "--stats":
+                stats_path = value
+                i += 1
+            i += 1
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+
+    edits = [(op, name, parsed, after) for op, name, parsed, _ in edits]
+    errors = batch_edit(directory_path, edits, filters, pattern, recursive, show, preview_only, jobs, stats_path, quiet)
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
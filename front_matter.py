@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Front Matter 查询与编辑
+按行解析 YAML（---）和 TOML（+++）格式的 Front Matter 的顶层字段，一次应用多个 set / unset / append 修改，
+只重新生成被修改字段所在的行，其余行和正文的字节保持不变；
+提供 "categories contains Android"、"date < 2025-01-01" 形式的筛选条件
+"""
+
+import re
+import json
+
+# Front Matter 分隔符 -> 格式
+DELIMITERS = {'---': 'yaml', '+++': 'toml'}
+
+YAML_FIELD_RE = re.compile(r'^([A-Za-z_][\w\-]*)[ \t]*:(?:[ \t]+(.*?))?[ \t]*$')
+TOML_FIELD_RE = re.compile(r'^([A-Za-z_][\w\-]*)[ \t]*=[ \t]*(.*?)[ \t]*$')
+YAML_ITEM_RE = re.compile(r'^[ \t]*-[ \t]+(.*?)[ \t]*$')
+NESTED_FIELD_RE = re.compile(r'^[ \t]+([A-Za-z_][\w\-]*)[ \t]*[:=][ \t]*(.*?)[ \t]*$')
+NUMBER_RE = re.compile(r'^-?\d+(?:\.\d+)?$')
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}(?:[T ][\d:.]+(?:Z|[+\-]\d{2}:?\d{2})?)?$')
+# 不加引号就会被 YAML 解释成其他含义的字符
+YAML_SPECIAL_RE = re.compile(r'^[\s\-?:,\[\]{}#&*!|>\'"%@`]|[:#]\s|\s$|:$')
+
+FILTER_RE = re.compile(r'^\s*([\w\-.]+)\s+(contains|!contains|==|!=|<=|>=|<|>)\s+(.+?)\s*$')
+FILTER_EXISTS_RE = re.compile(r'^\s*([\w\-.]+)\s+(exists|missing)\s*$')
+_MISSING = object()
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        if value[0] == '"':
+            try:
+                return json.loads(value)
+            except ValueError:
+                pass
+        return value[1:-1]
+    return value
+
+
+def parse_value(text):
+    """解析单行的值：布尔、数字、JSON/YAML 行内数组，其余作为字符串（去掉引号）"""
+    text = text.strip()
+    if text in ('true', 'false'):
+        return text == 'true'
+    if NUMBER_RE.match(text):
+        return float(text) if '.' in text else int(text)
+    if text.startswith('[') and text.endswith(']'):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return [_unquote(item) for item in text[1:-1].split(',') if item.strip()]
+    return _unquote(text)
+
+
+def format_value(value, fmt='yaml'):
+    """把值格式化为单行文本；数组统一写成 JSON 数组（与转换脚本的输出一致）"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return json.dumps(list(value), ensure_ascii=False)
+    value = str(value)
+    if fmt == 'toml':
+        return json.dumps(value, ensure_ascii=False)
+    if DATE_RE.match(value):
+        return value
+    if not value or YAML_SPECIAL_RE.search(value) or value in ('true', 'false', 'null', '~') or NUMBER_RE.match(value):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def split_front_matter(content):
+    """
+    拆分文本（或字节），返回 (格式, Front Matter 内容的起始位置, 结束位置, 正文起始位置)
+    没有 Front Matter 时返回 None；Front Matter 内容不含分隔行
+    """
+    newline = '\n' if isinstance(content, str) else b'\n'
+    start = 0
+    bom = '\ufeff' if isinstance(content, str) else b'\xef\xbb\xbf'
+    if content.startswith(bom):
+        start = len(bom)
+    first_end = content.find(newline, start)
+    if first_end == -1:
+        return None
+    opening = content[start:first_end]
+    if not isinstance(opening, str):
+        opening = opening.decode('utf-8', 'replace')
+    fmt = DELIMITERS.get(opening.strip())
+    if fmt is None:
+        return None
+    delimiter = opening.strip()
+    if not isinstance(content, str):
+        delimiter = delimiter.encode('ascii')
+
+    inner_start = first_end + 1
+    pos = inner_start
+    while pos <= len(content):
+        line_end = content.find(newline, pos)
+        if line_end == -1:
+            line_end = len(content)
+        if content[pos:line_end].strip() == delimiter:
+            body_start = min(line_end + 1, len(content))
+            return fmt, inner_start, pos, body_start
+        pos = line_end + 1
+    return None
+
+
+def parse_fields(lines, fmt='yaml'):
+    """
+    解析 Front Matter 的行（不含分隔行和换行符），返回 {字段名: 字段信息}
+    字段信息: start / end 字段占用的行范围, value 解析后的值（YAML 列表和嵌套字段包括其后缩进的行）
+    """
+    field_re = YAML_FIELD_RE if fmt == 'yaml' else TOML_FIELD_RE
+    fields = {}
+    current = None
+    for index, line in enumerate(lines):
+        match = field_re.match(line) if line[:1] not in (' ', '\t') else None
+        if match:
+            name, text = match.group(1), match.group(2) or ''
+            current = {'start': index, 'end': index + 1, 'value': parse_value(text) if text else None}
+            fields.setdefault(name, current)
+            continue
+        if current is None or not line.strip() or line.lstrip().startswith('#'):
+            continue
+        if line[:1] in (' ', '\t', '-') and current['end'] == index:
+            # 顶层字段之后的缩进行：YAML 列表项或嵌套字段
+            current['end'] = index + 1
+            item = YAML_ITEM_RE.match(line)
+            nested = NESTED_FIELD_RE.match(line)
+            if item and not isinstance(current['value'], dict):
+                if not isinstance(current['value'], list):
+                    current['value'] = []
+                current['value'].append(parse_value(item.group(1)))
+            elif nested:
+                if not isinstance(current['value'], dict):
+                    current['value'] = {}
+                current['value'][nested.group(1)] = parse_value(nested.group(2))
+    return fields
+
+
+def parse_front_matter(content):
+    """解析文本的 Front Matter，返回 (格式, {字段名: 值})，没有 Front Matter 时返回 (None, {})"""
+    found = split_front_matter(content)
+    if found is None:
+        return None, {}
+    fmt, start, end, _ = found
+    lines = content[start:end].replace('\r', '').split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+    return fmt, {name: info['value'] for name, info in parse_fields(lines, fmt).items()}
+
+
+def get_field(fields, name, default=None):
+    """读取字段值，a.b 形式读取嵌套字段；字段不存在时返回 default"""
+    value = fields
+    for part in name.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
+
+
+def parse_filter(text):
+    """
+    解析筛选条件，返回 (字段, 运算符, 值)
+    支持: 字段 contains 值 / 字段 !contains 值 / 字段 ==、!=、<、<=、>、>= 值 / 字段 exists / 字段 missing
+    """
+    match = FILTER_EXISTS_RE.match(text)
+    if match:
+        return match.group(1), match.group(2), None
+    match = FILTER_RE.match(text)
+    if not match:
+        raise ValueError(f"无法解析筛选条件: {text}")
+    return match.group(1), match.group(2), parse_value(match.group(3))
+
+
+def _comparable(left, right):
+    """数字按数值比较，其余（包括日期）按字符串比较；ISO 日期的字符串顺序就是时间顺序"""
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)) \
+            and not isinstance(left, bool) and not isinstance(right, bool):
+        return left, right
+    return str(left), str(right)
+
+
+def match_filter(fields, condition):
+    """字段是否满足筛选条件，condition 为 parse_filter 的结果"""
+    name, op, expected = condition
+    value = get_field(fields, name, _MISSING)
+    if op in ('exists', 'missing'):
+        return (value is not _MISSING) == (op == 'exists')
+    if value is None or value is _MISSING:
+        return op in ('!=', '!contains')
+    if op in ('contains', '!contains'):
+        if isinstance(value, list):
+            found = any(str(item) == str(expected) for item in value)
+        else:
+            found = str(expected) in str(value)
+        return found == (op == 'contains')
+    if op in ('==', '!='):
+        equal = value == expected or str(value) == str(expected)
+        return equal == (op == '==')
+    left, right = _comparable(value, expected)
+    if op == '<':
+        return left < right
+    if op == '<=':
+        return left <= right
+    if op == '>':
+        return left > right
+    return left >= right
+
+
+def _field_lines(name, value, fmt):
+    separator = ' = ' if fmt == 'toml' else ': '
+    return [name + separator + format_value(value, fmt)]
+
+
+def apply_edits(lines, fmt, edits):
+    """
+    对 Front Matter 的行应用修改，返回 (新的行列表, 实际生效的修改数)
+    edits 为 (操作, 字段, 值, 插入位置) 的列表:
+      set     设置字段；字段不存在时插入到"插入位置"字段之后（没有或不存在时放在末尾）
+      unset   删除字段（包括其后的列表项和嵌套字段）
+      append  向数组字段追加值（已包含时不追加），字段不存在时新建数组
+    只有被修改的字段所在的行会重新生成
+    """
+    lines = list(lines)
+    applied = 0
+    for op, name, value, after in edits:
+        fields = parse_fields(lines, fmt)
+        info = fields.get(name)
+        if op == 'unset':
+            if info is None:
+                continue
+            del lines[info['start']:info['end']]
+        elif op in ('set', 'append'):
+            if op == 'append':
+                current = info['value'] if info is not None else None
+                if current is None:
+                    current = []
+                elif not isinstance(current, list):
+                    current = [current]
+                if value in current:
+                    continue
+                value = current + [value]
+            elif info is not None and type(info['value']) is type(value) and info['value'] == value \
+                    and info['end'] - info['start'] == 1:
+                continue
+            new_lines = _field_lines(name, value, fmt)
+            if info is not None:
+                lines[info['start']:info['end']] = new_lines
+            else:
+                anchor = fields.get(after) if after else None
+                position = anchor['end'] if anchor is not None else len(lines)
+                # 末尾的空行保留在新字段之后
+                while anchor is None and position > 0 and not lines[position - 1].strip():
+                    position -= 1
+                lines[position:position] = new_lines
+        else:
+            raise ValueError(f"未知修改操作: {op}")
+        applied += 1
+    return lines, applied
+
+
+def edit_front_matter(content, edits, filters=()):
+    """
+    编辑文本或字节的 Front Matter，正文部分原样保留（字节不会被解码）
+    返回 (状态, 新内容)，状态为 no_front_matter 没有 Front Matter / filtered 不满足筛选条件 /
+    unchanged 无需修改 / edited 已修改
+    """
+    found = split_front_matter(content)
+    if found is None:
+        return 'no_front_matter', content
+    fmt, start, end, _ = found
+    is_text = isinstance(content, str)
+    inner = content[start:end] if is_text else content[start:end].decode('utf-8')
+    newline = '\r\n' if '\r\n' in inner else '\n'
+    lines = inner.replace('\r\n', '\n').split('\n')
+    trailing = lines and lines[-1] == ''
+    if trailing:
+        lines.pop()
+
+    fields = parse_fields(lines, fmt)
+    values = {name: info['value'] for name, info in fields.items()}
+    if not all(match_filter(values, condition) for condition in filters):
+        return 'filtered', content
+
+    new_lines, applied = apply_edits(lines, fmt, edits)
+    if not applied or new_lines == lines:
+        return 'unchanged', content
+    new_inner = newline.join(new_lines) + (newline if trailing or new_lines else '')
+    if not is_text:
+        new_inner = new_inner.encode('utf-8')
+    return 'edited', content[:start] + new_inner + content[end:]
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换函数的黄金语料对比脚本
+语料由 content/ 中的真实笔记和生成的边界用例组成（代码中的 $、转义的 \\$、正文中的 ---、多反引号行内代码等），
+以 legacy_converter 中的逐步转换函数为参考实现，与候选实现（默认为单遍转换引擎）逐个用例对比输出，
+列出所有差异并测量候选实现相对参考实现的加速比；参考输出可以保存为黄金文件，之后替换了参考实现也能继续对比
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import difflib
+import hashlib
+import functools
+import importlib
+import importlib.util
+
+from note_io import atomic_write
+
+DEFAULT_CONTENT_DIR = "content"
+GOLDEN_FORMAT = 1
+# 每个差异最多输出的 diff 行数
+DEFAULT_MAX_DIFF_LINES = 20
+
+# 参考函数 -> 单遍引擎中对应的转换步骤；chain 为依次执行全部参考函数
+REFERENCE_FUNCTIONS = {
+    'convert_mermaid_syntax': ('mermaid',),
+    'convert_callouts': ('callouts',),
+    'convert_latex_to_katex': ('latex',),
+    'convert_yaml_lists_to_json': ('yaml_lists',),
+    'chain': ('mermaid', 'callouts', 'latex', 'yaml_lists'),
+}
+
+FRONT_MATTER = "---\ntitle: 边界用例\ncategories:\n  - Android\ntags:\n  - 布局\n---\n"
+
+# 边界用例: (名称, 内容)；generate_edge_cases 会把每个用例放到不同的上下文中
+EDGE_CASES = [
+    ('dollar-in-inline-code', "使用 `echo $HOME` 和 `$PATH`，公式 $x^2$\n"),
+    ('dollar-in-fence', "```bash\necho $HOME $PATH\nprice=$5\n```\n"),
+    ('dollar-in-tilde-fence', "~~~\n$a$ 与 $$b$$\n~~~\n"),
+    ('escaped-dollar', "costs \\$5 and \\$6, 公式 $y$\n"),
+    ('double-dollar-inline', "行内 $$a+b$$ 和 $c$\n"),
+    ('block-math', "$$\nT(n) = 2T(n/2) + O(n)\n$$\n"),
+    ('unclosed-block-math', "开始 $$ 没有闭合\n`code`\n"),
+    ('unclosed-inline-math', "只有一个 $ 符号\n"),
+    ('converted-math', "已转换 $\\(x\\)$ 的公式\n"),
+    ('hr-in-body', "正文\n\n---\n\ntags:\n- a\n---\n"),
+    ('hr-only', "---\n"),
+    ('multi-backtick-code', "代码 ``a ` $b$ `` 与 $c$\n"),
+    ('triple-backtick-inline', "代码 ```x $y$``` 结束\n"),
+    ('unclosed-backtick', "半个 `反引号 $z$\n"),
+    ('mermaid', "```mermaid\ngraph TD\n  A --> B\n```\n"),
+    ('mermaid-unclosed', "```mermaid\ngraph TD\n  A --> B\n"),
+    ('mermaid-tilde', "~~~mermaid\ngraph TD\n~~~\n"),
+    ('callout', "> [!tip] 提示 $a$\n> 内容 `code $x$`\n>\n"),
+    ('callout-no-title', "> [!warning]\n> 内容\n"),
+    ('callout-fold', "> [!faq]- 问题\n> 答案\n"),
+    ('callout-nested', "> [!note] 外层\n> > [!tip] 内层\n> > 内容\n> 外层内容\n"),
+    ('callout-in-code', "```\n> [!note] 代码中\n```\n"),
+    ('quote-then-callout', "> 引用\n> [!note] x\n"),
+    ('katex-present', "{{< katex >}}\n公式 $a$\n"),
+    ('crlf', "第一行 $a$\r\n第二行\r\n"),
+    ('no-trailing-newline', "公式 $a$"),
+    ('empty', ""),
+]
+
+
+def generate_edge_cases():
+    """
+    生成边界用例语料，返回 [(名称, 内容)]
+    每个用例分别作为完整正文、放在 Front Matter 之后、放在 Callout 中各生成一次
+    """
+    cases = []
+    for name, text in EDGE_CASES:
+        cases.append((f"edge/{name}", text))
+        cases.append((f"edge/{name}+front-matter", FRONT_MATTER + "\n" + text))
+        quoted = "".join("> " + line if line.strip() else ">" + line for line in text.splitlines(True))
+        cases.append((f"edge/{name}+in-callout", "> [!note] 用例\n" + quoted))
+    cases.append(('edge/front-matter-empty-tags', "---\ntitle: t\ntags:\ncategories:\n  - A\n---\n正文\n"))
+    cases.append(('edge/front-matter-inline-lists', "---\ntags: [\"a\"]\ncategories: [\"b\"]\n---\n正文\n"))
+    cases.append(('edge/front-matter-unclosed', "---\ntitle: t\n正文 $a$\n"))
+    return cases
+
+
+def load_content_cases(content_dir):
+    """读取 content 目录中的全部笔记，返回 [(名称, 内容)]，名称为相对路径"""
+    cases = []
+    for file_path in sorted(glob.glob(os.path.join(content_dir, "**", "*.md"), recursive=True)):
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            content = f.read()
+        cases.append((os.path.relpath(file_path, content_dir).replace(os.sep, '/'), content))
+    return cases
+
+
+def load_converter():
+    """加载转换模块 obsidian_converter"""
+    return importlib.import_module("obsidian_converter")
+
+
+def load_reference():
+    """加载参考实现所在的模块 legacy_converter（逐步转换函数）"""
+    return importlib.import_module("legacy_converter")
+
+
+def load_candidate(spec):
+    """加载候选实现模块，spec 为模块名或 .py 文件路径"""
+    if spec.endswith(".py"):
+        name = os.path.splitext(os.path.basename(spec))[0].replace("-", "_")
+        module_spec = importlib.util.spec_from_file_location(name, spec)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+        return module
+    return importlib.import_module(spec)
+
+
+def reference_functions(reference):
+    """参考实现: {名称: 函数}；参考模块中已经没有的函数不包括在内（这时只能使用黄金文件对比）"""
+    functions = {name: getattr(reference, name) for name in REFERENCE_FUNCTIONS if hasattr(reference, name)}
+    steps = [functions[name] for name in REFERENCE_FUNCTIONS if name != 'chain' and name in functions]
+    if len(steps) == len(REFERENCE_FUNCTIONS) - 1:
+        def chain(text):
+            for step in steps:
+                text = step(text)
+            return text
+        functions['chain'] = chain
+    return functions
+
+
+def engine_functions(converter):
+    """默认的候选实现: 只启用对应转换步骤的单遍转换引擎"""
+    return {
+        name: functools.partial(converter.convert_content, stages=frozenset(stages))
+        for name, stages in REFERENCE_FUNCTIONS.items()
+    }
+
+
+def candidate_functions(module):
+    """候选模块中与参考函数同名的函数；chain 对应 convert_content（存在时）"""
+    functions = {name: getattr(module, name) for name in REFERENCE_FUNCTIONS if hasattr(module, name)}
+    if 'chain' not in functions and hasattr(module, 'convert_content'):
+        functions['chain'] = module.convert_content
+    return functions
+
+
+def _best_of(repeat, func):
+    """重复执行 func，返回最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def run_reference(functions, cases):
+    """执行参考实现，返回 {函数名: {用例名: 输出}}"""
+    return {name: {case: func(text) for case, text in cases} for name, func in functions.items()}
+
+
+def save_golden(golden_path, cases, outputs, converter):
+    """保存黄金文件：每个用例的输入哈希和各参考函数的输出"""
+    golden = {
+        'format': GOLDEN_FORMAT,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'converter_version': converter.CONVERTER_VERSION,
+        'inputs': {case: _sha256(text) for case, text in cases},
+        'outputs': outputs,
+    }
+    atomic_write(golden_path, lambda f: json.dump(golden, f, ensure_ascii=False, indent=1))
+    print(f"黄金文件已保存: {golden_path} ({len(cases)} 个用例)")
+
+
+def load_golden(golden_path, cases):
+    """
+    读取黄金文件作为参考输出，返回 {函数名: {用例名: 输出}}
+    输入已变化或黄金文件中没有的用例不参与对比
+    """
+    with open(golden_path, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+    if golden.get('format') != GOLDEN_FORMAT:
+        raise ValueError(f"不支持的黄金文件格式: {golden.get('format')}")
+    valid = {case for case, text in cases if golden['inputs'].get(case) == _sha256(text)}
+    skipped = len(cases) - len(valid)
+    if skipped:
+        print(f"警告: {skipped} 个用例的输入与黄金文件不一致或不在黄金文件中，不参与对比")
+    return {
+        name: {case: output for case, output in outputs.items() if case in valid}
+        for name, outputs in golden['outputs'].items()
+    }
+
+
+def _format_diff(expected, actual, max_lines):
+    """返回参考输出与候选输出的 unified diff 行，最多 max_lines 行"""
+    lines = list(difflib.unified_diff(
+        expected.splitlines(True), actual.splitlines(True), '参考', '候选', n=1,
+    ))
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"... 省略 {len(lines) - max_lines} 行\n"]
+    return [line if line.endswith('\n') else line + '\n' for line in lines]
+
+
+def compare(cases, expected, candidates, references, repeat=3, max_lines=DEFAULT_MAX_DIFF_LINES, quiet=False):
+    """
+    逐个用例对比候选实现与参考输出，打印差异并测量耗时
+    references 中有同名的参考函数时同时测量其耗时，计算加速比
+    返回报告字典: {函数名: {cases, diffs, reference_ms, candidate_ms, speedup, different}}
+    """
+    texts = dict(cases)
+    report = {}
+    for name, func in candidates.items():
+        outputs = expected.get(name)
+        if outputs is None:
+            print(f"参考输出中没有 {name}，跳过")
+            continue
+
+        different = []
+        for case, reference_output in outputs.items():
+            try:
+                actual = func(texts[case])
+            except Exception as e:
+                actual = f"<出错: {type(e).__name__}: {e}>"
+            if actual == reference_output:
+                continue
+            different.append(case)
+            if not quiet:
+                print(f"差异: {name} {case}")
+                sys.stdout.writelines(_format_diff(reference_output, actual, max_lines))
+
+        inputs = [texts[case] for case in outputs]
+        candidate_time = _best_of(repeat, lambda: [func(text) for text in inputs])
+        reference_time = None
+        if name in references:
+            reference = references[name]
+            reference_time = _best_of(repeat, lambda: [reference(text) for text in inputs])
+        report[name] = {
+            'cases': len(outputs),
+            'diffs': len(different),
+            'reference_ms': round(reference_time * 1000, 3) if reference_time is not None else None,
+            'candidate_ms': round(candidate_time * 1000, 3),
+            'speedup': round(reference_time / candidate_time, 2) if reference_time and candidate_time else None,
+            'different': different,
+        }
+    return report
+
+
+def print_report(report):
+    print("-" * 70)
+    print(f"{'函数':<30}{'用例':>6}{'差异':>6}{'参考(ms)':>10}{'候选(ms)':>10}{'加速比':>8}")
+    for name, entry in report.items():
+        reference_ms = f"{entry['reference_ms']:.2f}" if entry['reference_ms'] is not None else '-'
+        speedup = f"{entry['speedup']:.2f}x" if entry['speedup'] is not None else '-'
+        print(f"{name:<30}{entry['cases']:>6}{entry['diffs']:>6}{reference_ms:>10}"
+              f"{entry['candidate_ms']:>10.2f}{speedup:>8}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h"]:
+        print("转换函数的黄金语料对比脚本")
+        print("使用方法:")
+        print("  python golden-corpus.py [选项]")
+        print("")
+        print("选项:")
+        print(f"  --content <目录>     真实笔记所在目录 (默认: {DEFAULT_CONTENT_DIR})")
+        print("  --candidate <模块>   候选实现的模块名或 .py 文件，使用与参考函数同名的函数 (默认: 单遍转换引擎)")
+        print("  --save-golden <文件> 将参考实现的输出保存为黄金文件")
+        print("  --golden <文件>      使用黄金文件中的输出作为参考，不再执行参考实现")
+        print("  --only <函数,函数>   只对比这些函数 (chain 为依次执行全部转换)")
+        print("  --repeat <次数>      每项测量重复次数，取最小值 (默认: 3)")
+        print(f"  --max-lines <行数>   每个差异最多输出的 diff 行数 (默认: {DEFAULT_MAX_DIFF_LINES})")
+        print("  --output <文件>      将对比结果保存为 JSON")
+        print("  --quiet, -q         不输出差异详情，只输出汇总")
+        print("")
+        print("示例:")
+        print("  python golden-corpus.py --save-golden golden.json")
+        print("  python golden-corpus.py --golden golden.json --candidate fast_converter.py")
+        print("  python golden-corpus.py --only convert_latex_to_katex --repeat 10")
+        return 0
+
+    content_dir = DEFAULT_CONTENT_DIR
+    candidate_spec = None
+    save_path = None
+    golden_path = None
+    only = None
+    repeat = 3
+    max_lines = DEFAULT_MAX_DIFF_LINES
+    output_path = None
+    quiet = False
+
+    # 解析命令行参数
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        value = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+        if arg in ["--quiet", "-q"]:
+            quiet = True
+        elif value is None:
+            pass
+        elif arg == "--content":
+            content_dir = value
+            i += 1
+        elif arg == "--candidate":
+            candidate_spec = value
+            i += 1
+        elif arg == "--save-golden":
+            save_path = value
+            i += 1
+        elif arg == "--golden":
+            golden_path = value
+            i += 1
+        elif arg == "--only":
+            only = [name.strip() for name in value.split(",") if name.strip()]
+            i += 1
+        elif arg == "--repeat":
+            repeat = int(value)
+            i += 1
+        elif arg == "--max-lines":
+            max_lines = int(value)
+            i += 1
+        elif arg == "--output":
+            output_path = value
+            i += 1
+        i += 1
+
+    converter = load_converter()
+    notes = load_content_cases(content_dir)
+    cases = notes + generate_edge_cases()
+    print(f"语料: {len(cases)} 个用例（真实笔记 {len(notes)} 篇）")
+
+    references = reference_functions(load_reference())
+    if only:
+        references = {name: func for name, func in references.items() if name in only}
+    if golden_path:
+        expected = load_golden(golden_path, cases)
+    else:
+        expected = run_reference(references, cases)
+        if save_path:
+            save_golden(save_path, cases, expected, converter)
+
+    if candidate_spec:
+        candidates = candidate_functions(load_candidate(candidate_spec))
+    else:
+        candidates = engine_functions(converter)
+    if only:
+        candidates = {name: func for name, func in candidates.items() if name in only}
+    if not candidates:
+        print("候选实现中没有可对比的函数")
+        return 1
+
+    print("-" * 70)
+    report = compare(cases, expected, candidates, references, repeat, max_lines, quiet)
+    print_report(report)
+
+    if output_path:
+        result = {
+            'format': 1,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'candidate': candidate_spec or 'obsidian_converter.convert_content',
+            'converter_version': converter.CONVERTER_VERSION,
+            'results': report,
+        }
+        atomic_write(output_path, lambda f: json.dump(result, f, ensure_ascii=False, indent=2))
+        print(f"结果已保存: {output_path}")
+
+    total = sum(entry['diffs'] for entry in report.values())
+    if total:
+        print(f"发现 {total} 处输出差异")
+        return 1
+    print("候选实现与参考输出完全一致")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片尺寸索引脚本
+只读取 assets 中 JPEG、PNG、WebP 图片的文件头，建立 {路径: 宽高} 索引（按大小、修改时间和内容哈希缓存），
+保存到 data/image_sizes.json，模板可通过 site.Data 读取；
+转换时写入宽高使用 obsidian-to-blowfish.py --image-sizes
+"""
+
+import os
+import sys
+import time
+
+import image_size
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h"]:
+        print("图片尺寸索引脚本")
+        print("使用方法:")
+        print("  python image-sizes.py [图片目录] [选项]")
+        print("")
+        print("选项:")
+        print(f"  --index <文件>       索引文件，同时作为缓存 (默认: {image_size.DEFAULT_INDEX_PATH})")
+        print("  --list              输出每张图片的宽高")
+        print("")
+        print("示例:")
+        print("  python image-sizes.py")
+        print("  python image-sizes.py assets --index data/image_sizes.json --list")
+        return
+
+    source_dir = image_size.DEFAULT_SOURCE_DIR
+    index_path = image_size.DEFAULT_INDEX_PATH
+    show_list = False
+
+    # 解析命令行参数
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        value = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+        if arg == "--list":
+            show_list = True
+        elif arg == "--index" and value is not None:
+            index_path = value
+            i += 1
+        elif not arg.startswith("-"):
+            source_dir = arg
+        i += 1
+
+    if not os.path.exists(source_dir):
+        print(f"目录不存在: {source_dir}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    counts = {}
+    index = image_size.build_index(source_dir, index_path, counts)
+    elapsed = time.perf_counter() - started
+
+    if show_list:
+        for relative, entry in index['images'].items():
+            print(f"{entry['width']}x{entry['height']}  {relative}")
+        print("-" * 50)
+    total = len(index['images']) + counts['unknown']
+    print(f"索引完成！共 {total} 张图片，未变化 {counts['cached']} 张，重新计算哈希 {counts['hashed']} 张，"
+          f"读取文件头 {counts['read']} 张，无法识别 {counts['unknown']} 张")
+    if total:
+        print(f"耗时 {elapsed * 1000:.1f} ms，平均每张 {elapsed * 1000 / total:.3f} ms")
+    print(f"索引已保存: {index_path}")
+
+if __name__ == "__main__":
+    main()
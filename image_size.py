@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片尺寸索引
+只读取 JPEG、PNG、WebP 的文件头得到宽高（不解码图片，不需要 Pillow），按路径和内容哈希缓存为 JSON 索引；
+提供把宽高写入 Front Matter（featureimage）和 figure 短代码的函数，供转换脚本和 image-sizes.py 使用。
+索引默认保存在 data/image_sizes.json；普通的 ![alt](path) 图片仍由 Blowfish 自带的渲染钩子处理，
+featureimage 的宽高由 layouts/partials/extend-head.html 输出为 Open Graph 图片尺寸
+"""
+
+import os
+import re
+import json
+import struct
+import hashlib
+
+import front_matter
+from note_io import atomic_write, file_sha256, load_json
+
+INDEX_VERSION = 1
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+DEFAULT_SOURCE_DIR = "assets"
+DEFAULT_INDEX_PATH = "data/image_sizes.json"
+# PNG / WebP 的尺寸都在文件开头的这些字节内
+HEADER_SIZE = 32
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# 带尺寸信息的 JPEG 帧开始标记 SOF0-SOF15（不含 DHT C4、JPG C8、DAC CC）
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# 没有长度字段的 JPEG 标记
+JPEG_STANDALONE_MARKERS = frozenset([0x01, 0xD8] + list(range(0xD0, 0xD8)))
+JPEG_SOS = 0xDA
+JPEG_APP1 = 0xE1
+EXIF_ORIENTATION_TAG = 0x0112
+# EXIF 方向 5-8 表示图片需要旋转 90 度显示，宽高互换
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+FEATUREIMAGE_FIELD = 'featureimage'
+FEATUREIMAGE_WIDTH_FIELD = 'featureimageWidth'
+FEATUREIMAGE_HEIGHT_FIELD = 'featureimageHeight'
+FIGURE_SHORTCODE_RE = re.compile(r'\{\{<\s*figure\b(?P<params>[^>]*?)\s*>\}\}')
+SHORTCODE_PARAM_RE = re.compile(r'\b(?P<name>[\w-]+)\s*=\s*(?:"(?P<quoted>[^"]*)"|(?P<bare>[^\s"]+))')
+
+
+def _png_size(head):
+    if head[:8] == PNG_SIGNATURE and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    return None
+
+
+def _webp_size(head):
+    if head[:4] != b'RIFF' or head[8:12] != b'WEBP' or len(head) < 30:
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+        # 有损格式：关键帧头之后是 14 位的宽高
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and head[20] == 0x2F:
+        # 无损格式：签名之后的 28 位中依次是宽 - 1、高 - 1
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        # 扩展格式：画布宽高 - 1，各 24 位
+        return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+
+def _exif_orientation(data):
+    """从 APP1 段的内容中读取 EXIF 方向，没有时返回 None"""
+    if data[:6] != b'Exif\x00\x00' or len(data) < 14:
+        return None
+    tiff = data[6:]
+    endian = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if endian is None:
+        return None
+    offset = struct.unpack(endian + 'I', tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return None
+    count = struct.unpack(endian + 'H', tiff[offset:offset + 2])[0]
+    for index in range(count):
+        entry = offset + 2 + index * 12
+        if entry + 12 > len(tiff):
+            return None
+        tag, _, _ = struct.unpack(endian + 'HHI', tiff[entry:entry + 8])
+        if tag == EXIF_ORIENTATION_TAG:
+            return struct.unpack(endian + 'H', tiff[entry + 8:entry + 10])[0]
+    return None
+
+
+def _jpeg_size(f):
+    """
+    依次跳过 JPEG 的各个段，读到帧开始标记（SOF）时返回其中的宽高，只读取各段的头部；
+    EXIF 方向表示需要旋转 90 度时交换宽高（浏览器按 EXIF 方向显示图片）
+    """
+    f.seek(2)
+    orientation = None
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+        marker = f.read(1)
+        while marker == b'\xff':
+            # 标记前可以有多个填充的 0xFF
+            marker = f.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if length < 2:
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            if orientation in ROTATED_ORIENTATIONS:
+                return height, width
+            return width, height
+        if marker == JPEG_SOS:
+            return None
+        if marker == JPEG_APP1 and orientation is None:
+            orientation = _exif_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_size(file_path):
+    """只读取文件头获取图片的 (宽, 高)，不支持的格式或无法识别时返回 None"""
+    with open(file_path, 'rb') as f:
+        head = f.read(HEADER_SIZE)
+        if head[:2] == b'\xff\xd8':
+            return _jpeg_size(f)
+        return _png_size(head) or _webp_size(head)
+
+
+def find_images(source_dir):
+    """递归查找源目录中的图片，返回排序后的相对路径列表"""
+    images = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in files:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(os.path.relpath(os.path.join(root, name), source_dir).replace(os.sep, '/'))
+    images.sort()
+    return images
+
+
+def load_index(index_path):
+    """读取索引，不存在、无法解析或版本不一致时返回空索引"""
+    data = load_json(index_path, {})
+    if data.get('version') != INDEX_VERSION:
+        return {'version': INDEX_VERSION, 'images': {}}
+    return data
+
+
+def build_index(source_dir=DEFAULT_SOURCE_DIR, index_path=None, stats=None):
+    """
+    建立图片尺寸索引: {'version', 'images': {相对路径: {width, height, sha256, size, mtime_ns}}, 'digest'}
+    相对路径相对于 source_dir（默认 assets，与 featureimage 的写法一致）
+    index_path 指定时读取上次的索引作为缓存并写回：大小和修改时间未变的图片不读取；
+    内容哈希与上次相同（或与其他路径的图片相同，例如移动过的图片）时不再解析文件头
+    stats 为字典时累计 read 读取文件头、hashed 计算哈希、cached 使用缓存的图片数量
+    """
+    previous = load_index(index_path)['images'] if index_path else {}
+    by_hash = {entry['sha256']: entry for entry in previous.values()}
+    counts = stats if stats is not None else {}
+    for key in ('cached', 'hashed', 'read', 'unknown'):
+        counts.setdefault(key, 0)
+
+    images = {}
+    for relative in find_images(source_dir):
+        path = os.path.join(source_dir, relative)
+        stat = os.stat(path)
+        entry = previous.get(relative)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            images[relative] = entry
+            counts['cached'] += 1
+            continue
+
+        digest = file_sha256(path)
+        counts['hashed'] += 1
+        known = by_hash.get(digest)
+        if known is not None:
+            size = (known['width'], known['height'])
+        else:
+            size = read_image_size(path)
+            counts['read'] += 1
+        if size is None:
+            counts['unknown'] += 1
+            continue
+        images[relative] = {
+            'width': size[0],
+            'height': size[1],
+            'sha256': digest,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    sizes = {relative: [entry['width'], entry['height']] for relative, entry in images.items()}
+    index = {
+        'version': INDEX_VERSION,
+        'images': images,
+        'digest': hashlib.sha256(json.dumps(sizes, sort_keys=True).encode('utf-8')).hexdigest(),
+    }
+    if index_path:
+        directory = os.path.dirname(index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        atomic_write(index_path, lambda f: json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True))
+    return index
+
+
+def lookup_size(index, src):
+    """按图片路径查找 (宽, 高)，找不到时返回 None"""
+    entry = index['images'].get(src.strip())
+    if entry is None:
+        return None
+    return entry['width'], entry['height']
+
+
+def scaled_size(size, width=None):
+    """指定宽度时按比例计算高度"""
+    if width is None or not size[0]:
+        return size
+    return width, round(size[1] * width / size[0])
+
+
+def add_size_to_front_matter(content, index):
+    """
+    在 Front Matter 的 featureimage 之后写入 featureimageWidth / featureimageHeight
+    返回 (状态, 新内容)，状态同 front_matter.edit_front_matter；图片不在索引中时返回 unchanged
+    """
+    _, fields = front_matter.parse_front_matter(content)
+    src = fields.get(FEATUREIMAGE_FIELD)
+    size = lookup_size(index, src) if isinstance(src, str) else None
+    if size is None:
+        return 'unchanged', content
+    return front_matter.edit_front_matter(content, [
+        ('set', FEATUREIMAGE_WIDTH_FIELD, size[0], FEATUREIMAGE_FIELD),
+        ('set', FEATUREIMAGE_HEIGHT_FIELD, size[1], FEATUREIMAGE_WIDTH_FIELD),
+    ])
+
+
+def add_size_to_shortcodes(text, index):
+    """
+    为没有 width 参数的 {{< figure src="..." >}} 短代码补上 width 和 height
+    只有 width 时按比例补上 height
+    """
+    if 'figure' not in text:
+        return text
+
+    def replace(match):
+        params = {param.group('name'): param.group('quoted') if param.group('quoted') is not None
+                  else param.group('bare') for param in SHORTCODE_PARAM_RE.finditer(match.group('params'))}
+        if 'src' not in params or 'height' in params:
+            return match.group(0)
+        size = lookup_size(index, params['src'])
+        if size is None:
+            return match.group(0)
+        if 'width' in params:
+            if not params['width'].isdigit():
+                return match.group(0)
+            added = f' height="{scaled_size(size, int(params["width"]))[1]}"'
+        else:
+            added = f' width="{size[0]}" height="{size[1]}"'
+        whole = match.group(0)
+        cut = match.end('params') - match.start()
+        return whole[:cut] + added + whole[cut:]
+
+    return FIGURE_SHORTCODE_RE.sub(replace, text)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+逐步转换函数
+单遍转换引擎之前的转换方式：每个转换步骤各自用正则扫描全文。转换脚本已不再使用这些函数，
+只作为 golden-corpus.py 的参考实现和 benchmark-convert.py 的对比基准保留
+"""
+
+import re
+
+from obsidian_converter import KATEX_SHORTCODE_RE, MORE_TAG_RE, convert_front_matter_lists, format_alert_opening
+
+# 逐步转换函数使用的预编译正则
+MERMAID_BLOCK_RE = re.compile(r'```mermaid\s*\n(.*?)\n```', re.DOTALL)
+LEGACY_CALLOUT_START_RE = re.compile(
+    r'^\s{0,3}>\s*\[!(?P<type>[^\]\s]+)\]\s*(?P<modifier>[+-])?\s*(?P<title>.*)$',
+    re.IGNORECASE,
+)
+LEGACY_QUOTE_PREFIX_RE = re.compile(r'^\s{0,3}>\s?')
+HAS_INLINE_MATH_RE = re.compile(r'(?<!\$)\$(?!\$)[^$\n]+\$(?!\$)')
+HAS_BLOCK_MATH_RE = re.compile(r'\$\$[\s\S]*?\$\$')
+LEGACY_CODE_RE = re.compile(r'```[\s\S]*?```|`[^`\n]+`')
+LEGACY_INLINE_MATH_RE = re.compile(r'(?<!\$)\$(?!\$)([^$\n]+?)\$(?!\$)')
+LEGACY_FRONT_MATTER_RE = re.compile(r'^---\n[\s\S]*?\n---\n?', re.MULTILINE)
+FRONT_MATTER_BLOCK_RE = re.compile(r'^---\n([\s\S]*?)\n---', re.MULTILINE)
+
+
+def convert_mermaid_syntax(content):
+    """
+    将Obsidian的Mermaid语法转换为Blowfish的Mermaid简码语法
+    Obsidian: ```mermaid ... ```
+    Blowfish: {{< mermaid >}} ... {{< /mermaid >}}
+    """
+    def replace_mermaid(match):
+        mermaid_content = match.group(1)
+        # 转换为Blowfish的mermaid简码
+        return '{{< mermaid >}}\n' + mermaid_content + '\n{{< /mermaid >}}'
+    
+    # 执行替换
+    new_content = MERMAID_BLOCK_RE.sub(replace_mermaid, content)
+    
+    return new_content
+
+
+def convert_callouts(content):
+    """
+    将Obsidian的Callout语法转换为Blowfish的alert短代码
+    """
+    lines = content.splitlines()
+    converted_lines = []
+    total_lines = len(lines)
+    i = 0
+
+    def strip_callout_prefix(text):
+        return LEGACY_QUOTE_PREFIX_RE.sub('', text)
+
+    while i < total_lines:
+        line = lines[i]
+        match = LEGACY_CALLOUT_START_RE.match(line)
+
+        if match:
+            callout_type = match.group("type").strip()
+            title = match.group("title").strip()
+
+            callout_body = []
+            if title:
+                callout_body.append(title)
+
+            i += 1
+            while i < total_lines:
+                next_line = lines[i]
+                if LEGACY_QUOTE_PREFIX_RE.match(next_line):
+                    callout_body.append(strip_callout_prefix(next_line))
+                    i += 1
+                else:
+                    break
+
+            while callout_body and callout_body[-1].strip() == "":
+                callout_body.pop()
+
+            converted_lines.append(format_alert_opening(callout_type, title))
+            converted_lines.extend(callout_body)
+            converted_lines.append("{{< /alert >}}")
+            converted_lines.append("")
+        else:
+            converted_lines.append(line)
+            i += 1
+
+    result = "\n".join(converted_lines)
+    if content.endswith("\n") and not result.endswith("\n"):
+        result += "\n"
+    return result
+
+
+def convert_latex_to_katex(content):
+    """
+    将Obsidian的LaTeX语法转换为Blowfish的KaTeX语法
+    Obsidian行内公式: $...$ -> KaTeX行内公式: \(...\)
+    Obsidian块级公式: $$...$$ -> KaTeX块级公式: $$...$$ (保持不变)
+    如果检测到数学公式，确保文章包含 {{< katex >}} 短代码
+    """
+    # 检测是否包含数学公式
+    # 检查是否有未转换的行内公式 $...$ (不是 $$...$$ 的一部分) 或块级公式 $$...$$
+    has_math = bool(HAS_INLINE_MATH_RE.search(content)) or bool(HAS_BLOCK_MATH_RE.search(content))
+    
+    if not has_math:
+        return content
+    
+    def replace_inline_math(match):
+        math_content = match.group(1)
+        # 跳过已经转换过的公式
+        if math_content.strip().startswith('\\(') or math_content.strip().startswith('\\['):
+            return match.group(0)
+        # 转换为KaTeX行内公式格式
+        return r'\(' + math_content + r'\)'
+
+    # 需要排除代码块中的内容（包括行内代码和代码块），只转换代码块之间的部分
+    parts = []
+    last_end = 0
+    for code_match in LEGACY_CODE_RE.finditer(content):
+        parts.append(LEGACY_INLINE_MATH_RE.sub(replace_inline_math, content[last_end:code_match.start()]))
+        parts.append(code_match.group(0))
+        last_end = code_match.end()
+    parts.append(LEGACY_INLINE_MATH_RE.sub(replace_inline_math, content[last_end:]))
+    new_content = ''.join(parts)
+    
+    # 如果没有 katex 短代码，在 front matter 后添加
+    if not KATEX_SHORTCODE_RE.search(new_content):
+        front_matter_match = LEGACY_FRONT_MATTER_RE.search(new_content)
+        if front_matter_match:
+            insert_pos = front_matter_match.end()
+            # 检查是否已经有 <!--more--> 标记（在接下来的200个字符内查找）
+            more_tag_match = MORE_TAG_RE.search(new_content, insert_pos, insert_pos + 200)
+            if more_tag_match:
+                # 在 <!--more--> 后添加
+                insert_pos = more_tag_match.end()
+                new_content = (new_content[:insert_pos] + 
+                             '\n\n{{< katex >}}\n\n' + 
+                             new_content[insert_pos:])
+            else:
+                # 直接在 front matter 后添加
+                new_content = (new_content[:insert_pos] + 
+                             '\n{{< katex >}}\n\n' + 
+                             new_content[insert_pos:])
+    
+    return new_content
+
+
+def convert_yaml_lists_to_json(content):
+    """
+    将YAML列表格式转换为JSON数组格式
+    处理 Categories 和 tags 字段
+    """
+    # 仅在 Front Matter（--- ... ---）内进行转换，避免将正文中的 "-" 或分隔线误判为列表项
+    front_matter_match = FRONT_MATTER_BLOCK_RE.search(content)
+    if not front_matter_match:
+        return content
+
+    converted = convert_front_matter_lists(front_matter_match.group(1))
+
+    # 将转换后的 Front Matter 写回原文
+    start, end = front_matter_match.span(1)
+    new_content = content[:start] + converted + content[end:]
+
+    return new_content
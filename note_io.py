@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+博客脚本共用的文件工具
+写入前先与磁盘上的字节比较，内容相同则不写，避免修改时间变化触发 hugo server 重新构建；
+需要写入时先写临时文件再用 os.replace 替换，中途崩溃也不会留下被截断的笔记；
+另外提供加载同目录下其他脚本的 load_script、文件哈希、JSON 状态文件读取、
+解析 --jobs 参数的 parse_jobs、按提交顺序产出结果的进程池，以及读取站点 baseURL 路径的 site_base_path
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import importlib.util
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor
+
+COMPARE_CHUNK_SIZE = 1024 * 1024
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_URL_RE = re.compile(r'''(?m)^\s*baseURL\s*=\s*['"]([^'"]*)['"]''')
+# Hugo 站点配置文件，按顺序查找 baseURL
+CONFIG_FILES = ('hugo.toml', 'config.toml', os.path.join('config', '_default', 'hugo.toml'),
+                os.path.join('config', '_default', 'config.toml'))
+
+
+def load_script(file_name):
+    """
+    以模块方式加载同目录下的脚本（文件名含连字符，不能直接 import）
+    模块会注册到 sys.modules，进程池的子进程才能按模块名找到其中的工作函数
+    """
+    module_name = os.path.splitext(file_name)[0].replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def same_bytes(file_path, data):
+    """磁盘上的文件内容是否与 data 完全相同（先比较大小，再分块比较）"""
+    try:
+        if os.path.getsize(file_path) != len(data):
+            return False
+        view = memoryview(data)
+        with open(file_path, 'rb') as f:
+            offset = 0
+            while True:
+                chunk = f.read(COMPARE_CHUNK_SIZE)
+                if not chunk:
+                    return offset == len(data)
+                if view[offset:offset + len(chunk)] != chunk:
+                    return False
+                offset += len(chunk)
+    except FileNotFoundError:
+        return False
+
+
+def same_file(path_a, path_b):
+    """两个文件内容是否完全相同"""
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+        with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+            while True:
+                chunk_a = a.read(COMPARE_CHUNK_SIZE)
+                if chunk_a != b.read(COMPARE_CHUNK_SIZE):
+                    return False
+                if not chunk_a:
+                    return True
+    except FileNotFoundError:
+        return False
+
+
+def file_sha256(file_path):
+    """分块计算文件的 sha256"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COMPARE_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_size(file_path):
+    """文件大小，文件不存在或无法访问时返回 0（用于给进程池的任务排序）"""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def load_json(file_path, default=None):
+    """读取 JSON 文件（索引、状态记录等），不存在或无法解析时返回 default"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def current_umask():
+    """读取当前进程的 umask（os.umask 只能在设置的同时读取，读取后立即恢复）"""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def atomic_write(file_path, write, mode='w', encoding='utf-8', skip_unchanged=True):
+    """
+    以原子方式写入文件：在同一目录创建临时文件，由 write(f) 写入内容，再用 os.replace 替换目标
+    skip_unchanged 为真时，临时文件与现有文件内容相同则丢弃临时文件，保留原文件和修改时间
+    返回是否实际替换了文件
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(file_path) + '.', suffix='.tmp')
+    try:
+        kwargs = {} if 'b' in mode else {'encoding': encoding, 'newline': ''}
+        with os.fdopen(fd, mode, **kwargs) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if skip_unchanged and same_file(temp_path, file_path):
+            os.remove(temp_path)
+            return False
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        else:
+            # mkstemp 创建的临时文件权限为 0600，新文件改为与 open() 创建时相同的默认权限
+            os.chmod(temp_path, 0o666 & ~current_umask())
+        os.replace(temp_path, file_path)
+        return True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_bytes(file_path, data):
+    """字节内容与磁盘一致时跳过，否则原子写入；返回是否写入"""
+    if same_bytes(file_path, data):
+        return False
+    return atomic_write(file_path, lambda f: f.write(data), mode='wb', skip_unchanged=False)
+
+
+def write_text(file_path, text, encoding='utf-8'):
+    """按 encoding 编码后交给 write_bytes；返回是否写入"""
+    return write_bytes(file_path, text.encode(encoding))
+
+
+def rename_all(plan):
+    """
+    按 plan {源路径: 目标路径} 分两阶段重命名，支持互换（05 <-> 06）和环形重命名：
+    先把所有源文件移到同目录下的临时名称，再从临时名称移到目标；
+    目标已存在且不是本次要移走的源文件时拒绝执行（不会覆盖无关文件）
+    出错时把已移动的文件恢复到原位置后抛出异常
+    """
+    sources = {os.path.abspath(source) for source in plan}
+    targets = [os.path.abspath(target) for target in plan.values()]
+    if len(set(targets)) != len(targets):
+        raise ValueError("多个文件重命名到同一个目标")
+    for target in targets:
+        if os.path.exists(target) and target not in sources:
+            raise FileExistsError(f"目标文件已存在: {target}")
+
+    moved = []   # (源路径, 临时路径, 目标路径)
+    try:
+        for index, (source, target) in enumerate(plan.items()):
+            directory = os.path.dirname(os.path.abspath(source))
+            temp_path = os.path.join(directory, f".rename-{os.getpid()}-{index}.tmp")
+            os.rename(source, temp_path)
+            moved.append((source, temp_path, target))
+        done = []
+        try:
+            for source, temp_path, target in moved:
+                directory = os.path.dirname(os.path.abspath(target))
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                os.rename(temp_path, target)
+                done.append((source, temp_path, target))
+        except BaseException:
+            for source, temp_path, target in reversed(done):
+                os.rename(target, temp_path)
+            raise
+    except BaseException:
+        for source, temp_path, _ in reversed(moved):
+            if os.path.exists(temp_path):
+                os.rename(temp_path, source)
+        raise
+
+
+def parse_jobs(value):
+    """解析 --jobs 参数，0 表示使用全部CPU核心；不是整数时抛出 ValueError"""
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise ValueError(f"--jobs 需要整数（0 表示使用全部CPU核心）: {value}") from None
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return jobs
+
+
+def iter_ordered_results(items, worker, jobs=1, size=None, serial=None, initializer=None, initargs=()):
+    """
+    对 items 中的每一项执行 worker(item)，按 items 的顺序产出结果
+    jobs > 1 时使用进程池并行执行，size(item) 较大的项优先提交，避免最大的任务最后才开始；
+    worker 须为模块级函数（或其 functools.partial），才能传给子进程
+    serial 指定时，不使用进程池的情况下改为调用 serial(item)（例如直接输出而不缓存输出内容）
+    initializer / initargs 在每个子进程启动时执行一次
+    """
+    if jobs <= 1 or len(items) <= 1:
+        for item in items:
+            yield (serial or worker)(item)
+        return
+
+    order = range(len(items))
+    if size is not None:
+        order = sorted(order, key=lambda index: size(items[index]), reverse=True)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as executor:
+        futures = {index: executor.submit(worker, items[index]) for index in order}
+        for index in range(len(items)):
+            yield futures.pop(index).result()
+
+
+def site_base_path(site_root):
+    """从 Hugo 站点配置中读取 baseURL 的路径部分（例如 /blog），没有时返回空字符串"""
+    for name in CONFIG_FILES:
+        try:
+            with open(os.path.join(site_root, name), 'r', encoding='utf-8') as f:
+                match = BASE_URL_RE.search(f.read())
+        except OSError:
+            continue
+        if match:
+            return urlsplit(match.group(1)).path.rstrip('/')
+    return ''
@@ -0,0 +1,1930 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Obsidian到Blowfish格式转换模块
+单遍转换引擎、流式转换、批量转换和预览的实现，可以直接 import obsidian_converter 使用；
+增量清单、Mermaid 预渲染、监视模式和常驻服务分别在 converter_manifest、converter_mermaid、
+converter_watch 和 converter_service 模块中，命令行入口为 obsidian-to-blowfish.py
+"""
+
+import re
+import os
+import sys
+import glob
+import functools
+import io
+import json
+import hashlib
+import html
+import contextlib
+import difflib
+import time
+import shutil
+import tempfile
+from collections import namedtuple
+
+import image_size
+from converter_manifest import load_manifest, manifest_entry, manifest_key, save_manifest
+from converter_mermaid import MERMAID_SHORTCODE_RE, enable_mermaid_render, format_mermaid_svg, render_mermaid
+from note_io import atomic_write, file_sha256, file_size, iter_ordered_results, write_text
+from run_stats import new_file_record, phase, build_report, write_report
+
+# 转换规则版本号，修改任何转换逻辑时都需要递增，使增量清单中的旧记录全部失效
+CONVERTER_VERSION = "3"
+
+CALLOUT_TYPE_MAP = {
+    "note": "note",
+    "info": "info",
+    "todo": "note",
+    "tip": "tip",
+    "hint": "tip",
+    "important": "info",
+    "abstract": "note",
+    "summary": "note",
+    "tldr": "note",
+    "success": "success",
+    "check": "success",
+    "done": "success",
+    "question": "info",
+    "help": "info",
+    "faq": "info",
+    "warning": "warning",
+    "caution": "warning",
+    "attention": "warning",
+    "failure": "danger",
+    "fail": "danger",
+    "missing": "danger",
+    "danger": "danger",
+    "error": "danger",
+    "bug": "danger",
+    "example": "note",
+    "quote": "",
+}
+
+# 要求 "- " 后至少有一个空格，防止将 "---" 误判为列表项
+CATEGORIES_LIST_RE = re.compile(r'(?im)^(categories:)\s*\n((?:\s*-\s+[^\n]+\n?)+)')
+TAGS_LIST_RE = re.compile(r'(?im)^(tags:)\s*\n((?:\s*-\s+[^\n]+\n?)+)')
+LIST_ITEM_RE = re.compile(r'-\s+([^\n]+)')
+EMPTY_TAGS_RE = re.compile(r'(?im)^(tags:)\s*(\n(?!(\s*-\s+)))')
+KATEX_SHORTCODE_RE = re.compile(r'\{\{<\s*katex\s*>', re.IGNORECASE)
+MORE_TAG_RE = re.compile(r'<!--more-->')
+
+
+def format_alert_opening(callout_type, title):
+    """
+    根据Callout类型和标题生成 {{< alert >}} 开始标签
+    """
+    style_key = CALLOUT_TYPE_MAP.get(callout_type.lower(), callout_type.lower())
+
+    params = []
+    if style_key:
+        params.append(f'"{style_key}"')
+
+    effective_title = title if title else callout_type.capitalize()
+    if effective_title:
+        params.append(f'title="{effective_title}"')
+
+    opening = "{{< alert"
+    if params:
+        opening += " " + " ".join(params)
+    opening += " >}}"
+    return opening
+
+
+def convert_front_matter_lists(front_matter):
+    """
+    转换 Front Matter 文本（不含 --- 分隔行）中的 categories/tags 列表
+    """
+    def replace_list(match):
+        key = match.group(1)
+        items = LIST_ITEM_RE.findall(match.group(2))
+        json_items = [f'"{item.strip()}"' for item in items]
+        json_str = '[' + ','.join(json_items) + ']'
+        return f'{key} {json_str}\n'
+
+    # 匹配 Categories 和 tags 字段（不区分大小写）
+    converted = CATEGORIES_LIST_RE.sub(replace_list, front_matter)
+    converted = TAGS_LIST_RE.sub(replace_list, converted)
+
+    # 若存在独立的 "tags:" 但其下没有列表，统一为空数组
+    converted = EMPTY_TAGS_RE.sub(r'\1 []\n', converted)
+
+    return converted
+
+
+# ---------------------------------------------------------------------------
+# 单遍分段转换引擎
+# 将笔记一次性切分为 Front Matter、代码块、行内代码、公式、Callout 和普通文本，
+# 再把每个片段交给对应的转换函数，避免各转换步骤重复扫描全文。
+# ---------------------------------------------------------------------------
+
+Segment = namedtuple('Segment', ['kind', 'text', 'info'])
+
+SEGMENT_FRONT_MATTER = 'front_matter'
+SEGMENT_FENCE = 'fence'
+SEGMENT_INLINE_CODE = 'inline_code'
+SEGMENT_MATH_BLOCK = 'math_block'
+SEGMENT_MATH_INLINE = 'math_inline'
+SEGMENT_CALLOUT = 'callout'
+SEGMENT_TEXT = 'text'
+
+FRONT_MATTER_RE = re.compile(r'\ufeff?---[ \t]*\n(?:.*\n)*?---[ \t]*(?:\n|$)')
+# 可能开启块级结构（代码块或引用/Callout）的行，用于在文本中直接跳转
+BLOCK_START_RE = re.compile(r'^[ \t]{0,3}(?:`{3,}|~{3,}|>)', re.MULTILINE)
+FENCE_OPEN_RE = re.compile(r'[ \t]{0,3}(?P<marker>`{3,}|~{3,})(?P<info>[^\n]*)')
+CALLOUT_START_RE = re.compile(
+    r'\s{0,3}>\s*\[!(?P<type>[^\]\s]+)\]\s*(?P<modifier>[+-])?\s*(?P<title>.*)$',
+    re.IGNORECASE,
+)
+QUOTE_PREFIX_RE = re.compile(r'[^\S\n]{0,3}>[^\S\n]?')
+# 行内代码、公式和需要跳过的标记合并为一个正则，由 finditer 一次找出，分组名即片段类型:
+#   行内代码：同一行内长度相同的反引号串闭合，未闭合的反引号串整体跳过
+#   块级公式：$$ 到下一个 $$，可以跨行；找不到时为未闭合的 $$
+#   行内公式：同一行内下一个未转义的 $ 闭合，中间不为空、没有反引号，前后都不紧挨 $
+#   转义的 \$ 整体跳过，不开启公式
+# 开头的前瞻让正则引擎先按字符集跳到 ` \ $，不必在每个位置依次尝试各分支
+INLINE_SEGMENT_RE = re.compile(r'''
+  (?=[`\\$])(?:
+    (?P<inline_code>(`+)(?!`)[^\n]*?(?<!`)\2(?!`))
+  | `+
+  | \\\$
+  | (?P<math_block>\$\$[\s\S]*?\$\$)
+  | (?P<unclosed>\$\$)
+  | (?P<math_inline>\$(?<!\$\$)[^$`\n]+(?:(?<=\\)\$[^$`\n]*)*(?<!\\)\$(?!\$))
+  )
+''', re.VERBOSE)
+
+_fence_close_cache = {}
+
+
+def _fence_close_re(marker):
+    """返回与开启标记匹配的代码块结束行正则（同字符、长度不小于开启标记）"""
+    key = (marker[0], len(marker))
+    pattern = _fence_close_cache.get(key)
+    if pattern is None:
+        pattern = re.compile(
+            r'^[ \t]{0,3}' + re.escape(marker[0]) + '{' + str(len(marker)) + r',}[ \t]*$',
+            re.MULTILINE,
+        )
+        _fence_close_cache[key] = pattern
+    return pattern
+
+
+def _line_end(content, pos, end):
+    """返回 pos 所在行的结束位置（不含换行符），不超过 end"""
+    line_end = content.find('\n', pos, end)
+    return end if line_end == -1 else line_end
+
+
+def _scan_inline(content, start, end, unclosed=None):
+    """
+    扫描普通文本区间，切分出行内代码、行内公式和块级公式
+    unclosed 为列表时记录未闭合的 $$ 位置
+    """
+    text_start = start
+    for match in INLINE_SEGMENT_RE.finditer(content, start, end):
+        kind = match.lastgroup
+        if kind is None:
+            # 转义的 \$ 和未闭合的反引号串按普通文本处理
+            continue
+        token_start, token_end = match.span()
+        if kind == 'unclosed':
+            if unclosed is not None:
+                unclosed.append(token_start)
+            continue
+        if token_start > text_start:
+            yield Segment(SEGMENT_TEXT, content[text_start:token_start], None)
+        yield Segment(kind, content[token_start:token_end], None)
+        text_start = token_end
+
+    if end > text_start:
+        yield Segment(SEGMENT_TEXT, content[text_start:end], None)
+
+
+def _scan_text(content, start, end, math):
+    """普通文本区间：需要识别公式时逐个切分，否则整体作为文本片段（直接返回，不再嵌套一层生成器）"""
+    if math:
+        return _scan_inline(content, start, end)
+    return (Segment(SEGMENT_TEXT, content[start:end], None),)
+
+
+def tokenize(content, front_matter=True, callouts=True, math=True, body=True):
+    """
+    单遍扫描Markdown文本，按顺序产出 Segment(kind, text, info)
+    所有片段的 text 拼接起来与原文完全一致
+    callouts/math 为 False 时不识别对应结构；body 为 False 时正文整体作为文本片段
+    """
+    length = len(content)
+    pos = 0
+
+    if front_matter:
+        match = FRONT_MATTER_RE.match(content)
+        if match:
+            yield Segment(SEGMENT_FRONT_MATTER, match.group(0), None)
+            pos = match.end()
+
+    if not body:
+        if length > pos:
+            yield Segment(SEGMENT_TEXT, content[pos:], None)
+        return
+
+    text_start = pos
+    while pos < length:
+        block = BLOCK_START_RE.search(content, pos)
+        if not block:
+            break
+        line_start = block.start()
+        line_end = _line_end(content, line_start, length)
+        next_line = min(line_end + 1, length)
+        segment = None
+
+        if block.group(0)[-1] == '>':
+            if callouts:
+                match = CALLOUT_START_RE.match(content, line_start, line_end)
+                if match:
+                    # 收集后续所有引用行作为 Callout 内容
+                    segment_end = next_line
+                    while segment_end < length and QUOTE_PREFIX_RE.match(content, segment_end):
+                        segment_end = min(_line_end(content, segment_end, length) + 1, length)
+                    segment = Segment(SEGMENT_CALLOUT, content[line_start:segment_end], match.groupdict())
+        else:
+            fence = FENCE_OPEN_RE.match(content, line_start, line_end)
+            marker = fence.group('marker')
+            info = fence.group('info')
+            # 反引号代码块的信息字符串中不能再出现反引号
+            if marker[0] == '~' or '`' not in info:
+                close = _fence_close_re(marker).search(content, next_line)
+                segment_end = length if close is None else min(close.end() + 1, length)
+                segment = Segment(SEGMENT_FENCE, content[line_start:segment_end], {
+                    'marker': marker,
+                    'info': info.strip(),
+                    'closed': close is not None,
+                })
+
+        if segment is None:
+            pos = next_line
+            continue
+
+        if line_start > text_start:
+            yield from _scan_text(content, text_start, line_start, math)
+        yield segment
+        pos = text_start = line_start + len(segment.text)
+
+    if length > text_start:
+        yield from _scan_text(content, text_start, length, math)
+
+
+def _split_trailing_newline(text):
+    """拆分末尾换行符，返回 (正文, 换行符)"""
+    if text.endswith('\n'):
+        return text[:-1], '\n'
+    return text, ''
+
+
+def convert_front_matter_segment(segment, state):
+    """转换 Front Matter 片段中的 YAML 列表"""
+    text = segment.text
+    header_end = text.index('\n') + 1
+    body, newline = _split_trailing_newline(text)
+    closing_start = body.rfind('\n') + 1
+    if closing_start <= header_end:
+        return text
+    inner = text[header_end:closing_start - 1]
+    converted = convert_front_matter_lists(inner)
+    return text[:header_end] + converted + text[closing_start - 1:]
+
+
+def convert_fence_segment(segment, state):
+    """将 mermaid 代码块转换为 {{< mermaid >}} 简码，其余代码块保持不变"""
+    info = segment.info
+    if info['marker'][0] != '`' or info['info'] != 'mermaid' or not info['closed']:
+        return segment.text
+    body, newline = _split_trailing_newline(segment.text)
+    lines = body.split('\n')
+    mermaid_content = '\n'.join(lines[1:-1])
+    renderer = state['options']['mermaid']
+    if renderer is not None:
+        svg = render_mermaid(mermaid_content, renderer)
+        if svg is not None:
+            return format_mermaid_svg(svg) + newline
+    return '{{< mermaid >}}\n' + mermaid_content + '\n{{< /mermaid >}}' + newline
+
+
+def convert_mermaid_shortcode_segment(segment, state):
+    """启用预渲染时，把以前转换得到的 {{< mermaid >}} 短代码也渲染为 SVG"""
+    renderer = state['options']['mermaid']
+    if renderer is None or 'mermaid' not in segment.text:
+        return segment.text
+
+    def replace(match):
+        svg = render_mermaid(match.group(1), renderer)
+        return match.group(0) if svg is None else format_mermaid_svg(svg)
+
+    return MERMAID_SHORTCODE_RE.sub(replace, segment.text)
+
+
+def convert_math_inline_segment(segment, state):
+    """行内公式: $...$ -> \\(...\\)"""
+    state['has_math'] = True
+    math_content = segment.text[1:-1]
+    # 跳过已经转换过的公式
+    if math_content.lstrip().startswith(('\\(', '\\[')):
+        return segment.text
+    return r'\(' + math_content + r'\)'
+
+
+def convert_math_block_segment(segment, state):
+    """块级公式保持不变，仅记录文章包含数学公式"""
+    state['has_math'] = True
+    return segment.text
+
+
+def convert_text_segment(segment, state):
+    """普通文本保持不变，记录是否已有 katex 短代码"""
+    if not state['has_katex'] and '{{' in segment.text and KATEX_SHORTCODE_RE.search(segment.text):
+        state['has_katex'] = True
+    return segment.text
+
+
+def render_callout_title(title, state):
+    """
+    标题会出现在 alert 的 title 参数中，其中的公式同样需要转换；
+    参数中不能再嵌套短代码，转换时设置 state['in_attribute']，链接只保留显示文本
+    """
+    state['in_attribute'] = True
+    try:
+        return ''.join(render_segments(tokenize(title, front_matter=False, callouts=False, math=state['math']), state))
+    finally:
+        state['in_attribute'] = False
+
+
+def _callout_events(info, lines):
+    """
+    单遍处理 Callout 的内容行（保留引用前缀，以换行符结尾），产出事件:
+    ('open', 信息) 开始一个 Callout / ('line', 文本) 去掉前缀后的内容行 / ('close', 信息) 结束一个 Callout
+    用栈记录当前打开的各层 Callout，每行只剥离一次前缀：引用层数减少时关闭更深的 Callout，
+    比当前层多一层且是 Callout 开始行时打开嵌套的 Callout；代码块中的行不识别为 Callout。
+    每行的处理量与行长成正比，总耗时与内容长度呈线性关系
+    各层 Callout 末尾的空行不输出；标题作为第一行内容（折叠的 Callout 由 <summary> 显示标题）
+    """
+    # 栈中每层: [信息, 代码块结束行正则, 暂缓输出的空行]
+    stack = []
+
+    def open_callout(callout_info):
+        stack.append([callout_info, None, []])
+        title = callout_info['title'].strip()
+        if title and not callout_info['modifier']:
+            return [('open', callout_info), ('line', title + '\n')]
+        return [('open', callout_info)]
+
+    yield from open_callout(info)
+    for line in lines:
+        pos = 0
+        depth = 0
+        while depth < len(stack):
+            prefix = QUOTE_PREFIX_RE.match(line, pos)
+            if not prefix:
+                break
+            pos = prefix.end()
+            depth += 1
+        while len(stack) > max(depth, 1):
+            yield ('close', stack.pop()[0])
+
+        frame = stack[-1]
+        text = line[pos:]
+        if frame[1] is not None:
+            if frame[1].match(text):
+                frame[1] = None
+        else:
+            nested = CALLOUT_START_RE.match(text)
+            if nested:
+                for blank in frame[2]:
+                    yield ('line', blank)
+                frame[2].clear()
+                yield from open_callout(nested.groupdict())
+                continue
+            fence = FENCE_OPEN_RE.match(text)
+            if fence and (fence.group('marker')[0] == '~' or '`' not in fence.group('info')):
+                frame[1] = _fence_close_re(fence.group('marker'))
+
+        if not text.strip():
+            frame[2].append(text)
+            continue
+        for blank in frame[2]:
+            yield ('line', blank)
+        frame[2].clear()
+        yield ('line', text)
+
+    while stack:
+        yield ('close', stack.pop()[0])
+
+
+def format_callout_opening(info, state):
+    """Callout 的开始部分：alert 开始标签；带 +/- 折叠标记时在其中打开 <details>（+ 默认展开）"""
+    callout_type = info['type'].strip()
+    title = render_callout_title(info['title'].strip(), state)
+    opening = format_alert_opening(callout_type, title) + '\n'
+    if info['modifier']:
+        summary = html.escape(title or callout_type.capitalize(), quote=False)
+        opening += (f'<details class="callout-fold"{" open" if info["modifier"] == "+" else ""}>\n'
+                    f'<summary>{summary}</summary>\n\n')
+    return opening
+
+
+def format_callout_closing(info):
+    """Callout 的结束部分，与 format_callout_opening 对应"""
+    if info['modifier']:
+        return '\n</details>\n{{< /alert >}}\n'
+    return '{{< /alert >}}\n'
+
+
+def _render_callout_text(lines, state):
+    """转换 Callout 中连续的内容行，其中的公式和代码按普通正文处理"""
+    inner = ''.join(lines)[:-1]
+    yield from render_segments(tokenize(inner, front_matter=False, callouts=False, math=state['math']), state)
+    yield '\n'
+
+
+def convert_callout_segment(segment, state):
+    """将 Callout 片段（包括其中任意层嵌套的 Callout）转换为 alert 短代码"""
+    body, _ = _split_trailing_newline(segment.text)
+    lines = [line + '\n' for line in body.split('\n')[1:]]
+
+    parts = []
+    run = []
+    for kind, value in _callout_events(segment.info, lines):
+        if kind == 'line':
+            run.append(value)
+            continue
+        if run:
+            parts.extend(_render_callout_text(run, state))
+            run.clear()
+        parts.append(format_callout_opening(value, state) if kind == 'open' else format_callout_closing(value))
+    return ''.join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Wiki 链接索引
+# 每次运行建立一次索引，把笔记文件名、相对路径、标题和别名映射到 Hugo 内容路径，
+# 把图片文件名映射到资源路径，转换时每个链接只需一次字典查找。
+# 笔记链接转换为 relref 短代码，由 Hugo 在构建时生成最终的永久链接。
+# ---------------------------------------------------------------------------
+
+LINK_INDEX_VERSION = 1
+LINK_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.bmp')
+# [[目标#标题|显示文本]] 与 ![[嵌入]]
+WIKILINK_RE = re.compile(r'(!?)\[\[([^\[\]\n|#]*)(?:#([^\[\]\n|]*))?(?:\|([^\[\]\n]*))?\]\]')
+TITLE_RE = re.compile(r'(?m)^title:[ \t]*(.*?)[ \t]*$')
+ALIASES_RE = re.compile(r'(?m)^aliases:[ \t]*(.*?)[ \t]*$')
+ANCHOR_STRIP_RE = re.compile(r'[^\w\- ]')
+
+
+def _link_key(text):
+    """链接查找键：Obsidian 的链接不区分大小写，统一使用 / 分隔"""
+    return text.strip().replace('\\', '/').lower()
+
+
+def heading_anchor(heading):
+    """按 Hugo 默认的 github 风格生成标题锚点"""
+    return ANCHOR_STRIP_RE.sub('', heading.strip().lower()).replace(' ', '-')
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+def read_link_metadata(file_path):
+    """读取笔记 front matter 中的 title 和 aliases"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        head = f.read(16384)
+    match = FRONT_MATTER_RE.match(head)
+    if not match:
+        return None, []
+    front_matter = match.group(0)
+
+    title_match = TITLE_RE.search(front_matter)
+    title = _unquote(title_match.group(1)) if title_match else None
+
+    aliases = []
+    aliases_match = ALIASES_RE.search(front_matter)
+    if aliases_match:
+        value = aliases_match.group(1)
+        if value.startswith('['):
+            aliases = [_unquote(item) for item in value.strip('[]').split(',') if item.strip()]
+        elif value:
+            aliases = [_unquote(value)]
+        else:
+            # YAML 列表形式，读取紧随其后的 "- " 行
+            for line in front_matter[aliases_match.end():].split('\n')[1:]:
+                item = LIST_ITEM_RE.match(line.strip())
+                if not item:
+                    break
+                aliases.append(_unquote(item.group(1)))
+    return title or None, aliases
+
+
+def find_site_root(path):
+    """从 path 向上查找 Hugo 站点根目录（包含 content 目录和 hugo.toml 或 config 目录）"""
+    current = os.path.abspath(path)
+    while True:
+        if os.path.isdir(os.path.join(current, 'content')) and (
+                os.path.exists(os.path.join(current, 'hugo.toml')) or os.path.isdir(os.path.join(current, 'config'))):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _walk_site_files(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if not name.startswith('.'):
+                yield os.path.join(root, name)
+
+
+def site_note_files(site_root):
+    """产出站点 content 目录中的笔记 (文件路径, 相对于 content 的路径)"""
+    content_dir = os.path.join(site_root, 'content')
+    for file_path in _walk_site_files(content_dir):
+        if file_path.endswith('.md'):
+            yield file_path, os.path.relpath(file_path, content_dir).replace(os.sep, '/')
+
+
+def build_link_index(site_root, cache_path=None, note_files=None):
+    """
+    建立链接索引: {'notes': {查找键: 内容路径}, 'assets': {查找键: 资源路径}, 'digest': 索引摘要}
+    笔记可按文件名、相对路径、标题和别名查找（文件名和路径优先于标题和别名）；
+    图片可按文件名或相对路径查找，assets 中的图片使用资源路径，static 中的图片使用站点路径
+    cache_path 指定时缓存每篇笔记的标题和别名，大小和修改时间未变的笔记不再读取
+    note_files 为 (文件路径, 相对于 content 的路径) 的列表，默认为 site_note_files 的结果；
+    笔记尚未写入 content 时（例如从笔记库同步）可以传入源文件和它在 content 中的位置
+    """
+    cache = {}
+    if cache_path:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == LINK_INDEX_VERSION:
+                cache = data.get('notes', {})
+        except (OSError, ValueError):
+            pass
+
+    by_path = {}
+    by_title = {}
+    notes_cache = {}
+    for file_path, relative in (site_note_files(site_root) if note_files is None else note_files):
+        stat = os.stat(file_path)
+        cached = cache.get(relative)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            title, aliases = cached['title'], cached['aliases']
+        else:
+            try:
+                title, aliases = read_link_metadata(file_path)
+            except (OSError, UnicodeDecodeError):
+                title, aliases = None, []
+        notes_cache[relative] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                 'title': title, 'aliases': aliases}
+
+        target = '/' + relative
+        stem = relative[:-3]
+        name = os.path.basename(stem)
+        keys = [stem, name]
+        if name == '_index':
+            # 栏目页也可以按目录名查找
+            keys = [stem, os.path.dirname(stem), os.path.basename(os.path.dirname(stem))]
+        for key in keys:
+            if key:
+                by_path.setdefault(_link_key(key), target)
+        for key in [title] + list(aliases):
+            if key:
+                by_title.setdefault(_link_key(key), target)
+
+    notes = dict(by_title)
+    notes.update(by_path)
+
+    assets = {}
+    for base, prefix in ((os.path.join(site_root, 'assets'), ''), (os.path.join(site_root, 'static'), '/')):
+        for file_path in _walk_site_files(base):
+            if not file_path.lower().endswith(LINK_IMAGE_EXTENSIONS):
+                continue
+            relative = os.path.relpath(file_path, base).replace(os.sep, '/')
+            assets.setdefault(_link_key(relative), prefix + relative)
+            assets.setdefault(_link_key(os.path.basename(relative)), prefix + relative)
+
+    if cache_path:
+        data = {'version': LINK_INDEX_VERSION, 'notes': notes_cache}
+        atomic_write(cache_path, lambda f: json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True))
+
+    digest = hashlib.sha256(json.dumps([notes, assets], sort_keys=True).encode('utf-8')).hexdigest()
+    return {'notes': notes, 'assets': assets, 'digest': digest}
+
+
+def resolve_wikilink(match, options, text_only=False):
+    """转换单个 Wiki 链接，无法解析时返回 None；text_only 时只返回显示文本"""
+    embed, target, heading, label = match.groups()
+    target = target.strip()
+    notes = options['link_index']['notes']
+    assets = options['link_index']['assets']
+    sizes = options['image_sizes']
+    key = _link_key(target)
+    if key.endswith('.md'):
+        key = key[:-3]
+
+    if embed:
+        path = assets.get(key)
+        if path is not None:
+            width = label.strip() if label and label.strip().isdigit() else None
+            alt = label if label and not width else os.path.splitext(os.path.basename(target))[0]
+            if text_only:
+                return alt.strip()
+            size = image_size.lookup_size(sizes, path) if sizes is not None else None
+            if size is not None:
+                # 已知图片尺寸时使用 figure 短代码，![[图片|300]] 中的宽度按比例计算高度
+                width, height = image_size.scaled_size(size, int(width) if width else None)
+                alt = alt.strip().replace('"', "'")
+                return f'{{{{< figure src="{path}" alt="{alt}" width="{width}" height="{height}" >}}}}'
+            # ![[图片|300]] 中的尺寸 Markdown 无法表达，忽略
+            return f'![{alt.strip()}]({path})'
+
+    if target:
+        page = notes.get(key)
+        if page is None:
+            return None
+    else:
+        # [[#标题]] 指向当前笔记
+        page = ''
+    reference = page + ('#' + heading_anchor(heading) if heading else '')
+    if label:
+        text = label.strip()
+    elif heading:
+        text = f"{target} > {heading.strip()}" if target else heading.strip()
+    else:
+        text = target
+    if text_only:
+        return text
+    if not page:
+        return f'[{text}]({reference})'
+    return f'[{text}]({{{{< relref "{reference}" >}}}})'
+
+
+def resolve_link_key(key, link_index):
+    """
+    按 link_dependencies 中的键查找链接目标，找不到时返回 None
+    以 ! 开头的键为嵌入的图片，其余为笔记
+    """
+    if key.startswith('!'):
+        return link_index['assets'].get(key[1:])
+    return link_index['notes'].get(key)
+
+
+def link_dependencies(text, link_index):
+    """
+    返回文本中各 Wiki 链接目标的当前解析结果 {键: 目标路径或 None}，键的含义同 resolve_link_key
+    链接索引变化后，只有解析结果发生变化的笔记需要重新转换
+    """
+    dependencies = {}
+    if '[[' not in text:
+        return dependencies
+    for match in WIKILINK_RE.finditer(text):
+        key = _link_key(match.group(2))
+        if key.endswith('.md'):
+            key = key[:-3]
+        if not key:
+            continue
+        keys = ['!' + key, key] if match.group(1) else [key]
+        for item in keys:
+            dependencies[item] = resolve_link_key(item, link_index)
+    return dependencies
+
+
+def enable_links(options, directory_path, cache_path=None, note_files=None):
+    """
+    为 directory_path 所在的 Hugo 站点建立链接索引，保存到转换选项 options 中以启用 Wiki 链接转换
+    note_files 同 build_link_index
+    返回增量清单使用的版本号（包含索引摘要）；找不到站点根目录时不启用，返回 None
+    """
+    site_root = find_site_root(directory_path)
+    if site_root is None:
+        print(f"未找到 {directory_path} 所在的 Hugo 站点根目录，Wiki 链接不会被转换")
+        return None
+    started = time.perf_counter()
+    index = build_link_index(site_root, cache_path, note_files)
+    options['link_index'] = index
+    print(f"链接索引: {len(index['notes'])} 个笔记键, {len(index['assets'])} 个图片键 "
+          f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+    return f"{CONVERTER_VERSION}+links-{index['digest'][:12]}"
+
+
+def convert_wikilink_segment(segment, state):
+    """把文本中的 [[链接]] 和 ![[嵌入]] 转换为 Markdown 链接和图片；没有索引或无法解析的链接保持不变"""
+    options = state['options']
+    if options['link_index'] is None or '[[' not in segment.text:
+        return segment.text
+
+    text_only = state.get('in_attribute', False)
+
+    def replace(match):
+        converted = resolve_wikilink(match, options, text_only)
+        return match.group(0) if converted is None else converted
+
+    return WIKILINK_RE.sub(replace, segment.text)
+
+
+# ---------------------------------------------------------------------------
+# 图片尺寸
+# 转换时按 assets 中图片的尺寸索引（只读取文件头建立，见 image_size.py），
+# 为 featureimage 写入 featureimageWidth / featureimageHeight，为 figure 短代码补上 width 和 height，
+# 浏览器在图片加载前就能预留位置，避免布局偏移。
+# 普通的 ![alt](path) 图片不改写（content 中都是外部链接），仍由 Blowfish 自带的渲染钩子输出。
+# ---------------------------------------------------------------------------
+
+# 触发标记：Front Matter 中的 featureimage 和 figure 短代码（只在启用时查找）
+IMAGE_SIZE_TRIGGERS = (re.compile(rb'(?m)^featureimage:'), re.compile(rb'\{\{<\s*figure'))
+
+
+def enable_image_sizes(options, directory_path, index_path=None):
+    """
+    为 directory_path 所在 Hugo 站点的 assets 目录建立图片尺寸索引，保存到转换选项 options 中以启用尺寸写入，
+    返回清单版本号中追加的后缀
+    index_path 为索引文件（默认为站点的 data/image_sizes.json），同时作为缓存
+    """
+    site_root = find_site_root(directory_path)
+    if site_root is None:
+        print(f"未找到 {directory_path} 所在的 Hugo 站点根目录，不写入图片尺寸")
+        return ''
+    started = time.perf_counter()
+    counts = {}
+    index = image_size.build_index(
+        os.path.join(site_root, 'assets'),
+        index_path or os.path.join(site_root, image_size.DEFAULT_INDEX_PATH),
+        counts,
+    )
+    options['image_sizes'] = index
+    print(f"图片尺寸索引: {len(index['images'])} 张图片，读取文件头 {counts['read']} 张 "
+          f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+    return f"+sizes-{index['digest'][:12]}"
+
+
+def convert_front_matter_sizes_segment(segment, state):
+    """在 featureimage 之后写入图片宽高"""
+    sizes = state['options']['image_sizes']
+    if sizes is None or image_size.FEATUREIMAGE_FIELD not in segment.text:
+        return segment.text
+    _, content = image_size.add_size_to_front_matter(segment.text, sizes)
+    return content
+
+
+def convert_figure_sizes_segment(segment, state):
+    """为 figure 短代码补上图片宽高"""
+    sizes = state['options']['image_sizes']
+    if sizes is None:
+        return segment.text
+    return image_size.add_size_to_shortcodes(segment.text, sizes)
+
+
+# ---------------------------------------------------------------------------
+# 转换选项
+# 链接索引、Mermaid 渲染配置和图片尺寸索引保存在每个转换器自己的选项字典中，
+# 通过转换状态 state['options'] 传给各转换步骤，同一进程中的多个转换器互不影响。
+# ---------------------------------------------------------------------------
+
+def new_options():
+    """创建转换选项: link_index 链接索引 / mermaid 渲染配置 / image_sizes 图片尺寸索引，None 表示未启用"""
+    return {'link_index': None, 'mermaid': None, 'image_sizes': None}
+
+
+# 进程池子进程使用的转换选项，由 _init_worker 在创建子进程时设置一次，不随每个任务传递
+_worker_options = None
+
+
+def _init_worker(options):
+    """进程池子进程的初始化：保存主进程的转换选项"""
+    global _worker_options
+    _worker_options = options
+
+
+def _task_options(options):
+    """任务的转换选项：进程池中的任务传入 None，使用子进程初始化时保存的选项"""
+    return _worker_options if options is None else options
+
+
+# ---------------------------------------------------------------------------
+# 转换步骤注册表
+# 每个步骤声明处理的片段类型、触发标记和执行顺序，应用模式和预览模式都从这里取得转换步骤。
+# ---------------------------------------------------------------------------
+
+CONVERTER_STAGES = []
+_handler_cache = {}
+
+
+def register_stage(name, order, label, handlers, triggers, patterns=(), scope='body', split_inline=False,
+                   requires=None):
+    """
+    注册一个转换步骤
+    handlers: {片段类型: 转换函数(segment, state)}，同一片段类型由多个步骤处理时按 order 依次执行
+    triggers: 原始字节中的触发正则，任意一个命中才需要执行该步骤
+    patterns: 该步骤使用的预编译正则
+    scope: 触发标记的查找范围，body 为全文，front_matter 仅在 Front Matter 内查找
+    split_inline: 正文是否需要切分出行内代码和公式（文本片段中不再包含行内代码）
+    requires: 转换选项中的键，该选项未启用时不查找触发标记（例如未启用图片尺寸时不因 featureimage 而转换文件）
+    """
+    for stage in CONVERTER_STAGES:
+        if stage['name'] == name:
+            raise ValueError(f"转换步骤已存在: {name}")
+
+    stage = {
+        'name': name,
+        'order': order,
+        'label': label,
+        'handlers': dict(handlers),
+        'triggers': tuple(triggers),
+        'patterns': tuple(patterns),
+        'scope': scope,
+        'split_inline': split_inline,
+        'requires': requires,
+    }
+    CONVERTER_STAGES.append(stage)
+    CONVERTER_STAGES.sort(key=lambda item: item['order'])
+    _handler_cache.clear()
+    return stage
+
+
+register_stage(
+    'mermaid', 10, 'Mermaid语法转换',
+    handlers={SEGMENT_FENCE: convert_fence_segment, SEGMENT_TEXT: convert_mermaid_shortcode_segment},
+    triggers=[re.compile(rb'```[ \t]*mermaid'), re.compile(rb'\{\{<\s*mermaid\s*>\}\}')],
+    patterns=[FENCE_OPEN_RE, MERMAID_SHORTCODE_RE],
+)
+register_stage(
+    'callouts', 20, 'Callout 转换',
+    handlers={SEGMENT_CALLOUT: convert_callout_segment},
+    triggers=[re.compile(rb'\[!')],
+    patterns=[CALLOUT_START_RE, QUOTE_PREFIX_RE],
+)
+register_stage(
+    'latex', 30, 'LaTeX到KaTeX转换',
+    handlers={
+        SEGMENT_MATH_INLINE: convert_math_inline_segment,
+        SEGMENT_MATH_BLOCK: convert_math_block_segment,
+        SEGMENT_TEXT: convert_text_segment,
+    },
+    triggers=[re.compile(rb'\$')],
+    patterns=[INLINE_SEGMENT_RE, KATEX_SHORTCODE_RE, MORE_TAG_RE],
+    split_inline=True,
+)
+register_stage(
+    'yaml_lists', 40, 'YAML列表转换',
+    handlers={SEGMENT_FRONT_MATTER: convert_front_matter_segment},
+    # Front Matter 中值为空的 categories/tags 行（其后是 YAML 列表或需要补成空数组）
+    triggers=[re.compile(rb'(?im)^(?:categories|tags):[ \t]*\r?$')],
+    patterns=[CATEGORIES_LIST_RE, TAGS_LIST_RE, LIST_ITEM_RE, EMPTY_TAGS_RE],
+    scope='front_matter',
+)
+register_stage(
+    'wikilinks', 50, 'Wiki链接转换',
+    handlers={SEGMENT_TEXT: convert_wikilink_segment},
+    triggers=[re.compile(rb'\[\[')],
+    patterns=[WIKILINK_RE],
+    split_inline=True,
+)
+register_stage(
+    'image_sizes', 60, '图片尺寸写入',
+    handlers={SEGMENT_FRONT_MATTER: convert_front_matter_sizes_segment, SEGMENT_TEXT: convert_figure_sizes_segment},
+    triggers=IMAGE_SIZE_TRIGGERS,
+    patterns=[image_size.FIGURE_SHORTCODE_RE, image_size.SHORTCODE_PARAM_RE],
+    requires='image_sizes',
+)
+
+
+def stage_names():
+    """按执行顺序返回所有转换步骤名称"""
+    return [stage['name'] for stage in CONVERTER_STAGES]
+
+
+def _segment_handlers(stages):
+    """返回启用的转换步骤对应的 {片段类型: ((步骤名称, 转换函数), ...)}，按执行顺序排列"""
+    handlers = _handler_cache.get(stages)
+    if handlers is None:
+        handlers = {}
+        for stage in CONVERTER_STAGES:
+            if stage['name'] in stages:
+                for kind, handler in stage['handlers'].items():
+                    handlers[kind] = handlers.get(kind, ()) + ((stage['name'], handler),)
+        _handler_cache[stages] = handlers
+    return handlers
+
+
+def _split_inline(stages):
+    """启用的步骤中是否有需要切分行内代码和公式的步骤"""
+    return any(stage['split_inline'] for stage in CONVERTER_STAGES if stage['name'] in stages)
+
+
+def detect_stages(raw, front_matter=True, options=None):
+    """
+    在未解码的原始字节中查找各转换步骤的触发标记，返回需要执行的步骤集合
+    返回空集合时说明文件无需转换，可以直接跳过解码
+    front_matter 为 False 时不查找 Front Matter 内的触发标记（用于文件的后续分块）
+    options 为转换选项，requires 对应的选项未启用的步骤不查找
+    """
+    front_matter_end = None
+    start = 3 if raw.startswith(b'\xef\xbb\xbf') else 0
+    if front_matter and raw.startswith(b'---', start):
+        end = raw.find(b'\n---', start + 3)
+        if end != -1:
+            front_matter_end = end + 1
+
+    stages = set()
+    for stage in CONVERTER_STAGES:
+        if stage['requires'] and (options is None or options[stage['requires']] is None):
+            continue
+        if stage['scope'] == 'front_matter':
+            if front_matter_end is None:
+                continue
+            found = any(pattern.search(raw, start, front_matter_end) for pattern in stage['triggers'])
+        else:
+            found = any(pattern.search(raw) for pattern in stage['triggers'])
+        if found:
+            stages.add(stage['name'])
+    return stages
+
+
+def new_stage_stats(profile=False, record_changes=False):
+    """
+    创建转换统计：各步骤的调用次数、命中次数，profile 时记录耗时，
+    record_changes 时记录每处改动 (步骤名称, 原文, 新文本)
+    """
+    return {
+        'profile': profile,
+        'files': 0,
+        'calls': dict.fromkeys(stage_names(), 0),
+        'hits': dict.fromkeys(stage_names(), 0),
+        'time': dict.fromkeys(stage_names(), 0.0),
+        'phases': {'prefilter': 0.0, 'convert': 0.0},
+        'changes': [] if record_changes else None,
+    }
+
+
+def merge_stage_stats(total, stats):
+    """将 stats 累加到 total 中"""
+    total['files'] += stats['files']
+    for key in ('calls', 'hits', 'time', 'phases'):
+        for name, value in stats[key].items():
+            total[key][name] = total[key].get(name, 0) + value
+    if total['changes'] is not None and stats['changes'] is not None:
+        total['changes'].extend(stats['changes'])
+
+
+def _run_handler(name, handler, segment, state, stats):
+    """执行单个片段的转换并记录统计；耗时只计该步骤本身，不含嵌套片段"""
+    stats['calls'][name] += 1
+    if stats['profile']:
+        outer_child_time = state['child_time']
+        state['child_time'] = 0.0
+        started = time.perf_counter()
+        converted = handler(segment, state)
+        elapsed = time.perf_counter() - started
+        stats['time'][name] += elapsed - state['child_time']
+        state['child_time'] = outer_child_time + elapsed
+    else:
+        converted = handler(segment, state)
+
+    if converted != segment.text:
+        stats['hits'][name] += 1
+        if stats['changes'] is not None:
+            stats['changes'].append((name, segment.text, converted))
+    return converted
+
+
+def convert_segment(segment, state):
+    """依次交给处理该片段类型的转换步骤；没有启用对应步骤的片段保持不变"""
+    entries = state['handlers'].get(segment.kind)
+    if entries is None:
+        return segment.text
+    stats = state['stats']
+    text = segment.text
+    for name, handler in entries:
+        if stats is None:
+            converted = handler(segment, state)
+        else:
+            converted = _run_handler(name, handler, segment, state, stats)
+        if converted is not text:
+            text = converted
+            segment = Segment(segment.kind, text, segment.info)
+    return text
+
+
+def render_segments(segments, state):
+    """依次转换各片段，产出转换后的文本块"""
+    for segment in segments:
+        yield convert_segment(segment, state)
+
+
+def _insert_katex_shortcode(front_matter, rest):
+    """在 front matter（或其后的 <!--more-->）之后插入 {{< katex >}}"""
+    more_tag_match = MORE_TAG_RE.search(rest, 0, 200)
+    if more_tag_match:
+        insert_pos = more_tag_match.end()
+        return front_matter + rest[:insert_pos] + '\n\n{{< katex >}}\n\n' + rest[insert_pos:]
+    return front_matter + '\n{{< katex >}}\n\n' + rest
+
+
+def convert_content(content, stages=None, stats=None, options=None):
+    """
+    单遍转换整篇笔记，依次执行注册表中启用的转换步骤
+    代码块和行内代码中的内容不会被改写
+    stages 指定需要执行的步骤（默认全部），通常由 detect_stages 预筛选得到
+    stats 为 new_stage_stats 创建的统计，用于记录各步骤的命中次数和耗时
+    options 为转换选项（链接索引等），默认不启用任何选项
+    """
+    stages = frozenset(stage_names() if stages is None else stages)
+    handlers = _segment_handlers(stages)
+    state = {
+        'has_math': False,
+        'has_katex': False,
+        'handlers': handlers,
+        'math': _split_inline(stages),
+        'stats': stats,
+        'child_time': 0.0,
+        'options': options or new_options(),
+    }
+    if stats is not None:
+        stats['files'] += 1
+
+    front_matter = None
+    parts = []
+    last_kind = None
+
+    segments = tokenize(
+        content,
+        callouts=SEGMENT_CALLOUT in handlers,
+        math=state['math'],
+        body=any(kind != SEGMENT_FRONT_MATTER for kind in handlers),
+    )
+    append = parts.append
+    for segment in segments:
+        kind = segment.kind
+        converted = convert_segment(segment, state)
+        if kind == SEGMENT_FRONT_MATTER:
+            front_matter = converted
+            continue
+        append(converted)
+        if kind == SEGMENT_CALLOUT:
+            # Callout 之后保留一个空行，与后续内容分隔
+            append('\n')
+        last_kind = kind
+
+    if last_kind == SEGMENT_CALLOUT:
+        parts.pop()
+
+    rest = ''.join(parts)
+    if front_matter is None:
+        return rest
+    if state['has_math'] and not state['has_katex']:
+        if stats is not None:
+            stats['hits']['latex'] += 1
+            if stats['changes'] is not None:
+                stats['changes'].append(('latex', '', '{{< katex >}}'))
+        return _insert_katex_shortcode(front_matter, rest)
+    return front_matter + rest
+
+
+# ---------------------------------------------------------------------------
+# 流式转换
+# 超大笔记按行读取，只保留当前 Callout、代码块和公式的状态，转换结果边读边写，
+# 内存占用与文件大小无关。输出与 convert_content 一致。
+# ---------------------------------------------------------------------------
+
+# 达到该大小的文件自动使用流式转换
+STREAM_THRESHOLD = 4 * 1024 * 1024
+# 流式预筛选每次读取的字节数
+STREAM_CHUNK_SIZE = 1024 * 1024
+# 普通文本每累计这么多行转换一次
+STREAM_TEXT_BATCH = 256
+# 等待 $$ 闭合时最多缓存的行数，超过后按未闭合处理
+STREAM_MATH_LOOKAHEAD = 1024
+# Front Matter 最多缓存的行数，超过后按正文处理
+STREAM_FRONT_MATTER_MAX_LINES = 1000
+
+FRONT_MATTER_OPEN_RE = re.compile(r'\ufeff?---[ \t]*\n')
+FRONT_MATTER_CLOSE_RE = re.compile(r'---[ \t]*\n?')
+
+
+class _LineReader:
+    """支持预读和回退的行迭代器"""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._pending = []
+
+    def peek(self):
+        if not self._pending:
+            line = next(self._lines, None)
+            if line is None:
+                return None
+            self._pending.append(line)
+        return self._pending[-1]
+
+    def next(self):
+        if self._pending:
+            return self._pending.pop()
+        return next(self._lines, None)
+
+    def push_back(self, lines):
+        """按原顺序放回若干行"""
+        self._pending.extend(reversed(lines))
+
+
+def _emit(state, original, converted):
+    """记录片段是否被改写，并在需要时先输出 Callout 之后的空行"""
+    if converted != original:
+        state['changed'] = True
+    if state['separator']:
+        state['separator'] = False
+        return '\n' + converted
+    return converted
+
+
+def _flush_text(lines, state):
+    """转换缓存的普通文本行"""
+    run = ''.join(lines)
+    lines.clear()
+    return ''.join(
+        _emit(state, segment.text, convert_segment(segment, state))
+        for segment in _scan_text(run, 0, len(run), state['math'])
+    )
+
+
+def _has_unclosed_block_math(lines):
+    run = ''.join(lines)
+    unclosed = []
+    for _ in _scan_inline(run, 0, len(run), unclosed):
+        pass
+    return bool(unclosed)
+
+
+def _quoted_lines(reader):
+    """产出连续的引用行（保留前缀），遇到非引用行时停止且不消耗该行"""
+    while True:
+        line = reader.peek()
+        if line is None or not QUOTE_PREFIX_RE.match(line):
+            return
+        reader.next()
+        yield line if line.endswith('\n') else line + '\n'
+
+
+def _take_lines(first, events, following):
+    """从事件中取出连续的内容行，遇到其他事件时放入 following 并停止"""
+    yield first
+    for kind, value in events:
+        if kind != 'line':
+            following.append((kind, value))
+            return
+        yield value
+
+
+def _stream_callout(reader, match, state):
+    """流式转换一个 Callout（包括嵌套的 Callout），输出与 convert_callout_segment 一致"""
+    stats = state['stats']
+    if stats is not None:
+        stats['calls']['callouts'] += 1
+        stats['hits']['callouts'] += 1
+
+    events = _callout_events(match.groupdict(), _quoted_lines(reader))
+    event = next(events, None)
+    while event is not None:
+        kind, value = event
+        if kind == 'line':
+            following = []
+            yield from _stream_body(_LineReader(_take_lines(value, events, following)), state, callouts=False)
+            event = following[0] if following else None
+            continue
+        if kind == 'open':
+            yield _emit(state, None, format_callout_opening(value, state))
+        else:
+            yield format_callout_closing(value)
+        event = next(events, None)
+    # Callout 之后的空行只在后面还有内容时输出
+    state['separator'] = True
+
+
+def _stream_fence(reader, line, fence, state):
+    """流式处理代码块：mermaid 代码块缓存后交给转换步骤，其余代码块逐行原样输出"""
+    marker = fence.group('marker')
+    info = fence.group('info').strip()
+    close_re = _fence_close_re(marker)
+
+    if SEGMENT_FENCE in state['handlers'] and marker[0] == '`' and info == 'mermaid':
+        lines = [line]
+        closed = False
+        while True:
+            next_line = reader.next()
+            if next_line is None:
+                break
+            lines.append(next_line)
+            if close_re.match(next_line):
+                closed = True
+                break
+        text = ''.join(lines)
+        segment = Segment(SEGMENT_FENCE, text, {'marker': marker, 'info': info, 'closed': closed})
+        yield _emit(state, text, convert_segment(segment, state))
+        return
+
+    yield _emit(state, line, line)
+    while True:
+        next_line = reader.next()
+        if next_line is None:
+            return
+        yield next_line
+        if close_re.match(next_line):
+            return
+
+
+def _stream_body(reader, state, callouts=True):
+    """
+    逐行转换正文，产出转换后的文本
+    普通文本每 STREAM_TEXT_BATCH 行转换一次；
+    遇到未闭合的 $$ 时最多缓存 STREAM_MATH_LOOKAHEAD 行等待闭合
+    """
+    callouts = callouts and SEGMENT_CALLOUT in state['handlers']
+    text_lines = []
+    has_block_math = False
+    pending_math = False
+
+    while True:
+        line = reader.next()
+        if line is None:
+            break
+
+        block = BLOCK_START_RE.match(line)
+        if block:
+            if block.group(0)[-1] == '>':
+                match = CALLOUT_START_RE.match(line.rstrip('\n')) if callouts else None
+                if match:
+                    if text_lines:
+                        yield _flush_text(text_lines, state)
+                        has_block_math = pending_math = False
+                    yield from _stream_callout(reader, match, state)
+                    continue
+            else:
+                fence = FENCE_OPEN_RE.match(line)
+                if fence.group('marker')[0] == '~' or '`' not in fence.group('info'):
+                    if text_lines:
+                        yield _flush_text(text_lines, state)
+                        has_block_math = pending_math = False
+                    yield from _stream_fence(reader, line, fence, state)
+                    continue
+
+        text_lines.append(line)
+        recheck = state['math'] and '$$' in line
+        has_block_math = has_block_math or recheck
+        if len(text_lines) < STREAM_TEXT_BATCH:
+            continue
+        # 只有出现新的 $$ 时未闭合状态才可能变化
+        if has_block_math and (recheck or len(text_lines) == STREAM_TEXT_BATCH):
+            pending_math = _has_unclosed_block_math(text_lines)
+        if pending_math and len(text_lines) < STREAM_MATH_LOOKAHEAD:
+            continue
+        yield _flush_text(text_lines, state)
+        has_block_math = pending_math = False
+
+    if text_lines:
+        yield _flush_text(text_lines, state)
+
+
+def _read_front_matter(reader):
+    """读取文件开头的 Front Matter，返回其文本；不存在或过长时放回已读的行并返回 None"""
+    first = reader.peek()
+    if first is None or not FRONT_MATTER_OPEN_RE.fullmatch(first):
+        return None
+
+    lines = [reader.next()]
+    while len(lines) < STREAM_FRONT_MATTER_MAX_LINES:
+        line = reader.next()
+        if line is None:
+            break
+        lines.append(line)
+        if FRONT_MATTER_CLOSE_RE.fullmatch(line):
+            return ''.join(lines)
+
+    reader.push_back(lines)
+    return None
+
+
+def stream_convert(lines, write, stages=None, stats=None, options=None):
+    """
+    流式转换笔记：正文转换结果通过 write 逐块写出，Front Matter 单独返回；options 同 convert_content
+    返回 (转换后的 Front Matter 或 None, 是否需要插入 katex 短代码, 是否有改动)
+    插入 katex 短代码时由调用方放在 Front Matter 与正文之间
+    """
+    stages = frozenset(stage_names() if stages is None else stages)
+    handlers = _segment_handlers(stages)
+    state = {
+        'has_math': False,
+        'has_katex': False,
+        'handlers': handlers,
+        'math': _split_inline(stages),
+        'stats': stats,
+        'child_time': 0.0,
+        'changed': False,
+        'separator': False,
+        'options': options or new_options(),
+    }
+    if stats is not None:
+        stats['files'] += 1
+
+    reader = _LineReader(lines)
+    front_matter = _read_front_matter(reader)
+    if front_matter is not None:
+        segment = Segment(SEGMENT_FRONT_MATTER, front_matter, None)
+        front_matter = _emit(state, front_matter, convert_segment(segment, state))
+
+    if any(kind != SEGMENT_FRONT_MATTER for kind in handlers):
+        for piece in _stream_body(reader, state):
+            write(piece)
+    else:
+        for line in iter(reader.next, None):
+            write(line)
+
+    insert_katex = front_matter is not None and state['has_math'] and not state['has_katex']
+    if insert_katex:
+        state['changed'] = True
+        if stats is not None:
+            stats['hits']['latex'] += 1
+    return front_matter, insert_katex, state['changed']
+
+
+def detect_stages_in_file(file_path, options=None):
+    """分块读取文件进行预筛选，只在第一块中查找 Front Matter 触发标记"""
+    stages = set()
+    body_stages = {stage['name'] for stage in CONVERTER_STAGES if stage['scope'] == 'body'}
+    overlap = b''
+    with open(file_path, 'rb') as f:
+        first = True
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            stages |= detect_stages(overlap + chunk, front_matter=first, options=options)
+            if body_stages <= stages:
+                break
+            first = False
+            # 保留块尾，避免触发标记被切断在两块之间
+            overlap = chunk[-32:]
+    return stages
+
+
+def stream_convert_file(file_path, stages=None, stats=None, options=None):
+    """
+    流式转换单个文件，正文先写入临时文件，转换完成后与 Front Matter 拼接并替换原文件
+    返回是否有改动
+    """
+    started = time.perf_counter()
+    with open(file_path, 'r', encoding='utf-8') as src, \
+            tempfile.TemporaryFile('w+', encoding='utf-8') as body:
+        front_matter, insert_katex, changed = stream_convert(src, body.write, stages, stats, options)
+        if stats is not None:
+            stats['phases']['convert'] += time.perf_counter() - started
+        if not changed:
+            return False
+
+        body.seek(0)
+        return atomic_write(file_path, lambda out: _write_stream_result(out, front_matter, insert_katex, body))
+
+
+def _write_stream_result(out, front_matter, insert_katex, body):
+    """把流式转换的结果写入 out：Front Matter（需要时插入 katex 短代码）后接临时文件中的正文"""
+    if front_matter is not None:
+        if insert_katex:
+            out.write(_insert_katex_shortcode(front_matter, body.read(200)))
+        else:
+            out.write(front_matter)
+    shutil.copyfileobj(body, out, STREAM_CHUNK_SIZE)
+
+
+def decode_note(raw):
+    """
+    解码笔记原始字节
+    换行符与文本模式读取一致，统一为 \\n
+    """
+    text = raw.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def convert_raw(raw, stats=None, options=None):
+    """
+    转换笔记原始字节，返回 (原文, 转换后文本)
+    先在原始字节中预筛选，没有任何触发标记时不解码，直接返回 (None, None)
+    """
+    started = time.perf_counter()
+    stages = detect_stages(raw, options=options)
+    if stats is not None:
+        stats['phases']['prefilter'] += time.perf_counter() - started
+    if not stages:
+        return None, None
+
+    started = time.perf_counter()
+    original_content = decode_note(raw)
+    content = convert_content(original_content, stages, stats, options)
+    if stats is not None:
+        stats['phases']['convert'] += time.perf_counter() - started
+    return original_content, content
+
+
+def _stream_convert_path(file_path, stats=None, options=None):
+    """流式预筛选并转换单个文件，返回是否有改动"""
+    started = time.perf_counter()
+    stages = detect_stages_in_file(file_path, options)
+    if stats is not None:
+        stats['phases']['prefilter'] += time.perf_counter() - started
+    return bool(stages) and stream_convert_file(file_path, stages, stats, options)
+
+
+def convert_file(file_path, manifest=None, stats=None, stream=False, record=None, options=None):
+    """
+    转换单个文件，返回状态:
+    converted 已转换 / unchanged 无需转换 / skipped 清单中未变化而跳过 / error 出错
+    stats 为 new_stage_stats 创建的统计，累计各转换步骤的命中次数和耗时
+    stream 为 True 或文件不小于 STREAM_THRESHOLD 时使用流式转换
+    record 为 run_stats.new_file_record 创建的记录，记录读取、转换、写入的耗时、读写字节数和各步骤命中次数
+    options 为转换选项（链接索引等），通常来自 Converter
+    """
+    if record is None:
+        return _convert_file(file_path, manifest, stats, stream, None, options)
+    hits = dict(stats['hits']) if stats is not None else None
+    record['status'] = _convert_file(file_path, manifest, stats, stream, record, options)
+    if stats is not None:
+        record['hits'] = {name: count - hits.get(name, 0) for name, count in stats['hits'].items()
+                          if count != hits.get(name, 0)}
+    return record['status']
+
+
+def _convert_file(file_path, manifest, stats, stream, record, options):
+    try:
+        key = None
+        entry = None
+        stat = os.stat(file_path)
+        stream = stream or stat.st_size >= STREAM_THRESHOLD
+        if manifest is not None:
+            key = manifest_key(manifest, file_path)
+            entry = manifest['files'].get(key)
+            # 大小和修改时间都未变化时不读取文件
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                print(f"未变化，跳过: {file_path}")
+                return 'skipped'
+
+        raw = None
+        if stream:
+            digest = file_sha256(file_path) if manifest is not None else None
+        else:
+            with phase(record, 'read'):
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest() if manifest is not None else None
+        if record is not None:
+            record['bytes_read'] = stat.st_size
+
+        if entry and entry['sha256'] == digest:
+            # 仅修改时间变化，内容与上次转换结果一致
+            manifest['files'][key] = manifest_entry(stat, digest)
+            print(f"未变化，跳过: {file_path}")
+            return 'skipped'
+
+        if stream:
+            # 流式转换边读边写，读取、转换和写入都计入 convert
+            with phase(record, 'convert'):
+                modified = _stream_convert_path(file_path, stats, options)
+        else:
+            with phase(record, 'convert'):
+                original_content, content = convert_raw(raw, stats, options)
+            with phase(record, 'write'):
+                modified = content != original_content and write_text(file_path, content)
+        if modified and record is not None:
+            record['bytes_written'] = os.path.getsize(file_path)
+
+        if modified:
+            print(f"已转换: {file_path}")
+        else:
+            print(f"无需转换: {file_path}")
+
+        if manifest is not None:
+            if modified:
+                digest = file_sha256(file_path)
+            manifest['files'][key] = manifest_entry(os.stat(file_path), digest)
+
+        return 'converted' if modified else 'unchanged'
+
+    except Exception as e:
+        print(f"处理文件 {file_path} 时出错: {e}")
+        return 'error'
+
+
+def process_file(file_path):
+    """
+    处理单个文件
+    """
+    return convert_file(file_path) == 'converted'
+
+
+def _convert_file_worker(item, manifest_root, profile, stream, report=False):
+    """
+    进程池中执行的转换任务，item 为 (文件路径, 清单记录)，使用 _init_worker 保存的转换选项；
+    profile 为 None 时不统计，否则为统计是否记录各步骤耗时
+    输出先缓存下来，由主进程按文件顺序打印；返回 (状态, 输出, 新的清单记录, 统计, 文件记录)
+    """
+    file_path, entry = item
+    manifest = None
+    key = None
+    if manifest_root is not None:
+        manifest = {'path': None, 'root': manifest_root, 'files': {}}
+        key = manifest_key(manifest, file_path)
+        if entry:
+            manifest['files'][key] = entry
+
+    stats = new_stage_stats(profile=profile) if profile is not None else None
+    record = new_file_record(file_path) if report else None
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        status = convert_file(file_path, manifest, stats, stream, record, _worker_options)
+    return status, buffer.getvalue(), manifest['files'].get(key) if manifest else None, stats, record
+
+
+def iter_convert_results(files, manifest=None, jobs=1, stats=None, stream=False, records=None, quiet=False,
+                         options=None):
+    """
+    依次产出每个文件的转换状态，顺序与 files 一致
+    jobs > 1 时使用进程池并行转换，较大的文件优先提交，转换选项 options 在创建子进程时传递一次
+    records 为列表时追加每个文件的统计记录；quiet 时只输出出错文件的信息
+    """
+    report = records is not None
+
+    def convert_serial(item):
+        # 不使用进程池时直接输出、直接更新清单和统计
+        file_path = item[0]
+        record = new_file_record(file_path) if report else None
+        if quiet:
+            buffer = io.StringIO()
+            with contextlib.redirect_stdout(buffer):
+                status = convert_file(file_path, manifest, stats, stream, record, options)
+            if status == 'error':
+                sys.stdout.write(buffer.getvalue())
+        else:
+            status = convert_file(file_path, manifest, stats, stream, record, options)
+        return status, '', None, None, record
+
+    manifest_root = manifest['root'] if manifest is not None else None
+    profile = stats['profile'] if stats is not None else None
+    items = [
+        (file_path, manifest['files'].get(manifest_key(manifest, file_path)) if manifest is not None else None)
+        for file_path in files
+    ]
+    worker = functools.partial(_convert_file_worker, manifest_root=manifest_root, profile=profile, stream=stream,
+                               report=report)
+    results = iter_ordered_results(items, worker, jobs, size=lambda item: file_size(item[0]), serial=convert_serial,
+                                   initializer=_init_worker, initargs=(options,))
+    for file_path, (status, output, entry, file_stats, record) in zip(files, results):
+        if not quiet or status == 'error':
+            sys.stdout.write(output)
+        if manifest is not None and entry is not None:
+            manifest['files'][manifest_key(manifest, file_path)] = entry
+        if stats is not None and file_stats is not None:
+            merge_stage_stats(stats, file_stats)
+        if report:
+            records.append(record)
+        yield status
+
+
+def print_stage_profile(stats):
+    """打印各转换步骤的累计耗时和命中次数"""
+    stage_time = sum(stats['time'].values())
+    scan_time = max(stats['phases']['convert'] - stage_time, 0.0)
+
+    print("转换步骤统计:")
+    print(f"  {'步骤':<14}{'调用':>10}{'命中':>10}{'耗时(ms)':>12}")
+    print(f"  {'prefilter':<14}{'':>10}{'':>10}{stats['phases']['prefilter'] * 1000:>12.2f}")
+    print(f"  {'tokenize':<14}{stats['files']:>10}{'':>10}{scan_time * 1000:>12.2f}")
+    for stage in CONVERTER_STAGES:
+        name = stage['name']
+        print(f"  {name:<14}{stats['calls'][name]:>10}{stats['hits'][name]:>10}{stats['time'][name] * 1000:>12.2f}")
+
+
+def batch_convert(directory_path, pattern="*.md", recursive=False, manifest_path=None, jobs=1, profile=False,
+                  stream=False, links=False, link_cache=None, mermaid=None, stats_path=None, quiet=False,
+                  image_sizes=None):
+    """
+    批量转换目录中的所有Markdown文件
+    指定 manifest_path 时跳过自上次转换以来未变化的文件
+    jobs > 1 时使用多进程并行转换；profile 时输出各转换步骤的耗时统计
+    stream 时所有文件都使用流式转换（超大文件总是流式转换）
+    links 时建立链接索引并转换 Wiki 链接，link_cache 为索引缓存文件
+    mermaid 为 enable_mermaid_render 的参数字典，指定时把 Mermaid 图表预渲染为 SVG
+    stats_path 指定时写出 JSON 统计报告；quiet 时不输出每个文件的处理结果（出错的文件除外）
+    image_sizes 为 enable_image_sizes 的参数字典（index_path），指定时写入图片宽高
+    """
+    started = time.perf_counter()
+    if not os.path.exists(directory_path):
+        print(f"目录不存在: {directory_path}")
+        return
+    
+    # 查找所有Markdown文件
+    if recursive:
+        search_pattern = os.path.join(directory_path, "**", pattern)
+        files = glob.glob(search_pattern, recursive=True)
+    else:
+        search_pattern = os.path.join(directory_path, pattern)
+        files = glob.glob(search_pattern)
+    
+    if not files:
+        print(f"在目录 {directory_path} 中没有找到匹配 {pattern} 的文件")
+        return
+    
+    files.sort()
+    conv = Converter.for_directory(directory_path, links, link_cache, mermaid, image_sizes)
+    manifest = load_manifest(manifest_path, conv.version) if manifest_path else None
+
+    print(f"找到 {len(files)} 个文件，开始转换...")
+    print("-" * 50)
+    
+    stats = new_stage_stats(profile=profile) if profile or stats_path else None
+    records = [] if stats_path else None
+    converted_count = 0
+    skipped_count = 0
+    try:
+        for status in iter_convert_results(files, manifest, jobs, stats, stream, records, quiet, conv.options):
+            if status == 'converted':
+                converted_count += 1
+            elif status == 'skipped':
+                skipped_count += 1
+    finally:
+        if manifest is not None:
+            save_manifest(manifest)
+    
+    print("-" * 50)
+    print(f"转换完成！共处理 {len(files)} 个文件，成功转换 {converted_count} 个文件")
+    if manifest is not None:
+        print(f"清单中未变化而跳过 {skipped_count} 个文件")
+    if profile:
+        print_stage_profile(stats)
+    if stats_path:
+        stages = {}
+        for name in stage_names():
+            stages[name] = {'calls': stats['calls'][name], 'hits': stats['hits'][name]}
+            if profile:
+                stages[name]['time_ms'] = round(stats['time'][name] * 1000, 3)
+        write_report(stats_path, build_report(
+            'obsidian-to-blowfish.py', records, started, stages=stages, jobs=jobs, stream=stream,
+        ))
+
+
+def _describe_change(before, after, limit=100):
+    """去掉改动前后相同的首尾行，返回截断后的 (原文, 新文本) 便于预览"""
+    before_lines = before.split('\n')
+    after_lines = after.split('\n')
+    while len(before_lines) > 1 and len(after_lines) > 1 and before_lines[0] == after_lines[0]:
+        before_lines.pop(0)
+        after_lines.pop(0)
+    while len(before_lines) > 1 and len(after_lines) > 1 and before_lines[-1] == after_lines[-1]:
+        before_lines.pop()
+        after_lines.pop()
+
+    def shorten(lines):
+        text = '\\n'.join(lines)
+        return text if len(text) <= limit else text[:limit] + '...'
+
+    return shorten(before_lines), shorten(after_lines)
+
+
+def preview_changes(file_path, stats=None, options=None):
+    """
+    预览文件变化
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+
+        file_stats = new_stage_stats(profile=stats is not None and stats['profile'], record_changes=True)
+        original_content, converted_content = convert_raw(raw, file_stats, options)
+        if stats is not None:
+            merge_stage_stats(stats, file_stats)
+
+        if converted_content == original_content:
+            print(f"无需转换: {file_path}")
+            return False
+
+        print(f"\n文件: {file_path}")
+        print("变化预览:")
+        print("-" * 40)
+        for stage in CONVERTER_STAGES:
+            changes = [change for change in file_stats['changes'] if change[0] == stage['name']]
+            if not changes:
+                continue
+            print(f"{stage['label']}: {len(changes)} 处")
+            for i, (_, before, after) in enumerate(changes[:5], start=1):  # 只显示前5处
+                old, new = _describe_change(before, after)
+                print(f"  {i}: 原: {old}")
+                print(f"     新: {new}")
+            if len(changes) > 5:
+                print(f"  ... 还有 {len(changes) - 5} 处")
+            print()
+        print("-" * 40)
+        return True
+            
+    except Exception as e:
+        print(f"预览文件 {file_path} 时出错: {e}")
+        return False
+
+
+def preview_record(file_path, diff=False, options=None):
+    """
+    生成单个文件的机器可读预览记录：
+    file 文件路径 / status pending 需要转换、unchanged 无需转换、error 出错 /
+    stages 产生改动的转换步骤 / changes 各步骤的改动处数 / diff 统一格式差异（仅 diff 为 True 时）
+    """
+    record = {'file': file_path, 'status': 'unchanged', 'stages': [], 'changes': {}}
+    try:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+
+        file_stats = new_stage_stats()
+        original_content, converted_content = convert_raw(raw, file_stats, options)
+        if converted_content == original_content:
+            return record
+
+        record['status'] = 'pending'
+        for name in stage_names():
+            if file_stats['hits'][name]:
+                record['stages'].append(name)
+                record['changes'][name] = file_stats['hits'][name]
+        if diff:
+            record['diff'] = ''.join(difflib.unified_diff(
+                original_content.splitlines(keepends=True),
+                converted_content.splitlines(keepends=True),
+                fromfile=file_path,
+                tofile=file_path,
+            ))
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = str(e)
+    return record
+
+
+def _preview_worker(file_path, as_json, diff, profile, options=None):
+    """
+    预览任务，返回 (是否需要转换, 输出, 统计)
+    options 为 None 时（进程池中的任务）使用 _init_worker 保存的转换选项
+    """
+    options = _task_options(options)
+    if as_json:
+        record = preview_record(file_path, diff, options)
+        return record['status'] == 'pending', json.dumps(record, ensure_ascii=False) + '\n', None
+
+    stats = new_stage_stats(profile=True) if profile else None
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        pending = preview_changes(file_path, stats, options)
+    return pending, buffer.getvalue(), stats
+
+
+def iter_preview_results(files, jobs=1, stats=None, as_json=False, diff=False, options=None):
+    """
+    依次输出每个文件的预览并产出是否需要转换，顺序与 files 一致
+    as_json 时每个文件输出一行 JSON（JSON Lines），否则输出文字预览
+    jobs > 1 时使用进程池并行预览，较大的文件优先提交
+    """
+    profile = stats is not None
+    options = options or new_options()
+    worker = functools.partial(_preview_worker, as_json=as_json, diff=diff, profile=profile)
+    serial = functools.partial(worker, options=options)
+    for pending, output, file_stats in iter_ordered_results(files, worker, jobs, size=file_size, serial=serial,
+                                                            initializer=_init_worker, initargs=(options,)):
+        sys.stdout.write(output)
+        if profile:
+            merge_stage_stats(stats, file_stats)
+        yield pending
+
+
+def preview_directory(directory_path, pattern="*.md", recursive=False, jobs=1, profile=False, as_json=False,
+                      diff=False, links=False, link_cache=None, mermaid=None, image_sizes=None):
+    """
+    预览目录中的文件需要的转换，返回需要转换的文件数
+    as_json 时每个文件输出一行 JSON，准备工作的提示信息输出到标准错误
+    """
+    if not os.path.exists(directory_path):
+        print(f"目录不存在: {directory_path}")
+        return 0
+
+    if recursive:
+        search_pattern = os.path.join(directory_path, "**", pattern)
+        files = glob.glob(search_pattern, recursive=True)
+    else:
+        search_pattern = os.path.join(directory_path, pattern)
+        files = glob.glob(search_pattern)
+
+    if not files:
+        print(f"在目录 {directory_path} 中没有找到匹配 {pattern} 的文件")
+        return 0
+
+    files.sort()
+    with contextlib.redirect_stdout(sys.stderr if as_json else sys.stdout):
+        conv = Converter.for_directory(directory_path, links, link_cache, mermaid, image_sizes)
+    if as_json:
+        return sum(iter_preview_results(files, jobs, as_json=True, diff=diff, options=conv.options))
+
+    print(f"预览模式 - 找到 {len(files)} 个文件")
+    print("-" * 50)
+
+    stats = new_stage_stats(profile=True) if profile else None
+    converted_count = sum(iter_preview_results(files, jobs, stats, options=conv.options))
+
+    print("-" * 50)
+    print(f"预览完成！共 {len(files)} 个文件，需要转换 {converted_count} 个文件")
+    if stats is not None:
+        print_stage_profile(stats)
+    return converted_count
+
+
+# ---------------------------------------------------------------------------
+# 转换器对象
+# 编辑器和 Hugo 钩子可以导入本模块，创建一次 Converter 后反复调用，
+# 常驻服务（converter_service.py）也通过它处理请求。
+# ---------------------------------------------------------------------------
+
+class Converter:
+    """
+    转换器：创建时完成一次性的准备工作（链接索引、Mermaid 渲染配置、各步骤的片段处理表），
+    之后在同一进程中反复转换文本、文件或文本流
+    links 为站点内的目录路径时建立链接索引并转换 Wiki 链接，link_cache 为索引缓存文件
+    mermaid 为 enable_mermaid_render 的参数字典，指定时把 Mermaid 图表预渲染为 SVG
+    image_sizes 为站点内的目录路径时建立图片尺寸索引并写入图片宽高，image_index 为索引文件
+    link_notes 为建立链接索引使用的笔记列表，同 build_link_index 的 note_files
+    这些配置保存在 self.options 中，只影响本转换器
+    version 为增量清单使用的版本号；rules_version 不含链接索引摘要，
+    调用方自己按 link_dependencies 判断链接目标的变化时使用
+    """
+
+    def __init__(self, links=None, link_cache=None, mermaid=None, image_sizes=None, image_index=None,
+                 link_notes=None):
+        self.options = new_options()
+        link_version = links and enable_links(self.options, links, link_cache, link_notes)
+        self.version = link_version or CONVERTER_VERSION
+        self.rules_version = CONVERTER_VERSION + ('+links' if link_version else '')
+        suffix = ''
+        if mermaid is not None:
+            suffix += enable_mermaid_render(self.options, **mermaid)
+        if image_sizes is not None:
+            suffix += enable_image_sizes(self.options, image_sizes, image_index)
+        self.version += suffix
+        self.rules_version += suffix
+        _segment_handlers(frozenset(stage_names()))
+
+    @classmethod
+    def for_directory(cls, directory_path, links=False, link_cache=None, mermaid=None, image_sizes=None):
+        """
+        按批量转换、监视和预览的命令行参数为 directory_path 创建转换器
+        links 为是否转换 Wiki 链接，image_sizes 为 enable_image_sizes 的参数字典（index_path）
+        """
+        return cls(directory_path if links else None, link_cache, mermaid,
+                   directory_path if image_sizes is not None else None, (image_sizes or {}).get('index_path'))
+
+    def convert_text(self, text, stats=None):
+        """转换一篇笔记的文本并返回结果，没有任何触发标记时原样返回"""
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        stages = detect_stages(text.encode('utf-8'), options=self.options)
+        if not stages:
+            return text
+        return convert_content(text, stages, stats, self.options)
+
+    def link_dependencies(self, text):
+        """文本中 Wiki 链接目标的解析结果，未启用链接转换时为空字典"""
+        if self.options['link_index'] is None:
+            return {}
+        return link_dependencies(text, self.options['link_index'])
+
+    def links_changed(self, dependencies):
+        """上次记录的链接解析结果 dependencies 在当前链接索引中是否有变化"""
+        link_index = self.options['link_index']
+        if link_index is None or not dependencies:
+            return False
+        return any(resolve_link_key(key, link_index) != target for key, target in dependencies.items())
+
+    def convert_file(self, file_path, manifest=None, stats=None, stream=False, record=None):
+        """原地转换文件，返回状态 converted / unchanged / skipped / error，参数同 convert_file"""
+        return convert_file(file_path, manifest, stats, stream, record, self.options)
+
+    def convert_stream(self, src, dst, stats=None):
+        """
+        按行流式转换：从 src（文本文件对象或行的可迭代对象）读取，把完整结果写入 dst
+        正文先写入临时文件，Front Matter 和 katex 短代码最后放在正文之前；返回是否有改动
+        """
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as body:
+            front_matter, insert_katex, changed = stream_convert(src, body.write, None, stats, self.options)
+            body.seek(0)
+            _write_stream_result(dst, front_matter, insert_katex, body)
+        return changed
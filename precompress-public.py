@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+public 目录预压缩脚本
+在 Hugo 构建之后运行：为 public/ 中可压缩的文本文件并行生成 .gz 和 .br 文件，
+服务器可以直接发送预压缩文件（例如 nginx 的 gzip_static / brotli_static），不再在请求时压缩；
+按内容哈希记录上次的结果，内容未变化的文件不重复压缩，压缩后不比原文件小的结果不保留
+.br 需要 brotli: pip install brotli，未安装时只生成 .gz
+"""
+
+import os
+import sys
+import gzip
+import json
+import functools
+
+from note_io import atomic_write, file_sha256, file_size, iter_ordered_results, load_json, parse_jobs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_PUBLIC_DIR = "public"
+DEFAULT_STATE_PATH = ".precompress-state.json"
+COMPRESSIBLE_EXTENSIONS = ('.html', '.xml', '.css', '.js', '.json', '.txt', '.svg', '.webmanifest', '.map')
+# 小于该大小的文件压缩收益很小，不处理
+DEFAULT_MIN_SIZE = 256
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# 压缩格式 -> 文件后缀
+FORMATS = {'gzip': '.gz', 'brotli': '.br'}
+
+
+def compress_data(data, fmt):
+    """压缩数据；gzip 头中的时间固定为 0，相同内容总是得到相同的输出"""
+    if fmt == 'gzip':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def find_files(public_dir, min_size=DEFAULT_MIN_SIZE):
+    """查找可压缩的文件，返回排序后的相对路径列表"""
+    files = []
+    for root, dirs, names in os.walk(public_dir):
+        dirs.sort()
+        for name in names:
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            if os.path.islink(path) or os.path.getsize(path) < min_size:
+                continue
+            files.append(os.path.relpath(path, public_dir).replace(os.sep, '/'))
+    files.sort()
+    return files
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def compress_file(public_dir, relative, formats):
+    """
+    为单个文件生成各格式的压缩文件
+    返回 {格式: 压缩后大小}，不比原文件小的格式记为 None 并删除已有的旧压缩文件；
+    本次不生成的格式（例如未安装 brotli 时的 .br）也删除旧压缩文件，避免服务器发送过期的内容
+    """
+    path = os.path.join(public_dir, relative)
+    with open(path, 'rb') as f:
+        data = f.read()
+    for fmt, suffix in FORMATS.items():
+        if fmt not in formats:
+            _remove(path + suffix)
+    sizes = {}
+    for fmt in formats:
+        output_path = path + FORMATS[fmt]
+        compressed = compress_data(data, fmt)
+        if len(compressed) >= len(data):
+            _remove(output_path)
+            sizes[fmt] = None
+            continue
+        atomic_write(output_path, lambda f: f.write(compressed), mode='wb')
+        sizes[fmt] = len(compressed)
+    return sizes
+
+
+def _compress_worker(public_dir, relative, formats):
+    """进程池中执行的任务，返回 (相对路径, 压缩结果, 错误信息)"""
+    try:
+        return relative, compress_file(public_dir, relative, formats), None
+    except Exception as e:
+        return relative, None, str(e)
+
+
+def iter_compress_results(public_dir, todo, formats, jobs=1):
+    """
+    依次产出 (相对路径, 压缩结果, 错误信息)
+    jobs > 1 时使用进程池并行压缩，较大的文件优先提交，结果仍按 todo 的顺序产出
+    """
+    worker = functools.partial(_compress_worker, public_dir, formats=formats)
+    return iter_ordered_results(todo, worker, jobs, size=lambda relative: file_size(os.path.join(public_dir, relative)))
+
+
+def _cached(entry, digest, path, formats):
+    """记录与文件哈希一致，所有格式都已处理过，且保留的压缩文件仍然存在"""
+    if entry is None or entry['sha256'] != digest:
+        return False
+    for fmt in formats:
+        if fmt not in entry['sizes']:
+            return False
+        if entry['sizes'][fmt] is not None and not os.path.exists(path + FORMATS[fmt]):
+            return False
+    return True
+
+
+def precompress_public(public_dir=DEFAULT_PUBLIC_DIR, state_path=DEFAULT_STATE_PATH, min_size=DEFAULT_MIN_SIZE,
+                       jobs=1, preview=False):
+    """
+    预压缩 public 目录，返回出错的文件数量
+    """
+    if not os.path.exists(public_dir):
+        print(f"目录不存在: {public_dir}")
+        return 1
+
+    formats = ['gzip']
+    if brotli is not None:
+        formats.append('brotli')
+    else:
+        print("未安装 brotli，只生成 .gz 文件: pip install brotli")
+
+    files = find_files(public_dir, min_size)
+    if not files:
+        print(f"在目录 {public_dir} 中没有找到可压缩的文件")
+        return 0
+
+    state = load_json(state_path, {})
+    new_state = {}
+    todo = []
+    for relative in files:
+        path = os.path.join(public_dir, relative)
+        stat = os.stat(path)
+        entry = state.get(relative)
+        # 大小和修改时间未变时沿用上次的哈希；Hugo 重新构建会更新修改时间，这时比较哈希
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            digest = entry['sha256']
+        else:
+            digest = file_sha256(path)
+        if _cached(entry, digest, path, formats):
+            new_state[relative] = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        else:
+            todo.append(relative)
+            new_state[relative] = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sizes': {}}
+
+    print(f"{'预览模式 - ' if preview else ''}找到 {len(files)} 个可压缩文件，"
+          f"未变化 {len(files) - len(todo)} 个，需要压缩 {len(todo)} 个 ({', '.join(formats)})")
+    print("-" * 50)
+
+    if preview:
+        for relative in todo:
+            print(f"需要压缩: {relative}")
+        print("-" * 50)
+        print(f"预览完成！需要压缩 {len(todo)} 个文件")
+        return 0
+
+    errors = 0
+    original_bytes = 0
+    compressed_bytes = {fmt: 0 for fmt in formats}
+    for relative, sizes, error in iter_compress_results(public_dir, todo, formats, jobs):
+        if error:
+            errors += 1
+            del new_state[relative]
+            print(f"压缩文件 {relative} 时出错: {error}")
+            continue
+        new_state[relative]['sizes'] = sizes
+        original_bytes += new_state[relative]['size']
+        parts = []
+        for fmt in formats:
+            size = sizes[fmt]
+            compressed_bytes[fmt] += size if size is not None else new_state[relative]['size']
+            parts.append(f"{FORMATS[fmt]} {size}" if size is not None else f"{FORMATS[fmt]} 未保留")
+        print(f"已压缩: {relative} ({new_state[relative]['size']} -> {', '.join(parts)})")
+
+    # 原文件已删除或不再需要压缩时，删除遗留的压缩文件
+    removed = 0
+    for relative in state:
+        if relative not in new_state:
+            for suffix in FORMATS.values():
+                output_path = os.path.join(public_dir, relative) + suffix
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                    removed += 1
+
+    atomic_write(state_path, lambda f: json.dump(new_state, f, ensure_ascii=False, separators=(',', ':')))
+
+    print("-" * 50)
+    print(f"压缩完成！共 {len(files)} 个文件，新压缩 {len(todo) - errors} 个，出错 {errors} 个，删除遗留压缩文件 {removed} 个")
+    if original_bytes:
+        for fmt in formats:
+            print(f"  {FORMATS[fmt]}: {original_bytes} -> {compressed_bytes[fmt]} 字节 "
+                  f"({compressed_bytes[fmt] / original_bytes:.1%})")
+    return errors
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h"]:
+        print("public 目录预压缩脚本")
+        print("使用方法:")
+        print("  python precompress-public.py [目录路径] [选项]")
+        print("")
+        print("选项:")
+        print("  --preview, -p       仅预览需要压缩的文件")
+        print(f"  --state <文件>       记录文件哈希和压缩结果的状态文件 (默认: {DEFAULT_STATE_PATH})")
+        print(f"  --min-size <字节>    忽略小于该大小的文件 (默认: {DEFAULT_MIN_SIZE})")
+        print("  --jobs, -j <数量>    并行处理的进程数 (0 表示使用全部CPU核心)")
+        print("")
+        print("示例:")
+        print("  hugo --minify && python precompress-public.py -j 0")
+        return
+
+    public_dir = DEFAULT_PUBLIC_DIR
+    state_path = DEFAULT_STATE_PATH
+    min_size = DEFAULT_MIN_SIZE
+    jobs = 1
+    preview_only = False
+
+    # 解析命令行参数
+    i = 1
+    try:
+        while i < len(sys.argv):
+            arg = sys.argv[i]
+            value = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+            if arg in ["--preview", "-p"]:
+                preview_only = True
+            elif arg == "--state" and value is not None:
+                state_path = value
+                i += 1
+            elif arg == "--min-size" and value is not None:
+                min_size = int(value)
+                i += 1
+            elif arg in ["--jobs", "-j"] and value is not None:
+                jobs = parse_jobs(value)
+                i += 1
+            elif not arg.startswith("-"):
+                public_dir = arg
+            i += 1
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+
+    errors = precompress_public(public_dir, state_path, min_size, jobs, preview_only)
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
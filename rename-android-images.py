@@ -7,57 +7,91 @@ Android图片文件重命名脚本
 
 import os
 import re
+import sys
 import glob
-import shutil
+import time
 from pathlib import Path
 
-def get_featureimage_mapping():
+from note_io import rename_all
+from run_stats import new_file_record, phase, build_report, write_report
+
+ANDROID_CONTENT_DIR = "content/posts/android"
+ARTICLE_NUM_RE = re.compile(r'^(\d+)')
+FEATUREIMAGE_RE = re.compile(r'featureimage:\s*images/android/(\d+\.jpg)')
+
+def extract_featureimage(file_path, content):
+    """
+    从笔记中提取featureimage
+    返回: (文章编号, featureimage文件名)，文件名不以编号开头或没有featureimage时返回 None
+    """
+    filename = os.path.basename(file_path)
+    # 匹配文件名开头的数字
+    match = ARTICLE_NUM_RE.match(filename)
+    if not match:
+        return None
+    
+    # 提取featureimage字段
+    featureimage_match = FEATUREIMAGE_RE.search(content)
+    if not featureimage_match:
+        return None
+    return match.group(1), featureimage_match.group(1)
+
+def get_featureimage_mapping(records=None, quiet=False):
     """
     获取所有Android文章的featureimage映射
     返回: {文章编号: featureimage文件名}
+    records 为列表时追加每个文件的统计记录；quiet 时不输出每篇文章的映射
     """
-    android_dir = "content/posts/android"
     mapping = {}
     
     # 获取所有markdown文件
-    md_files = glob.glob(os.path.join(android_dir, "*.md"))
+    md_files = glob.glob(os.path.join(ANDROID_CONTENT_DIR, "*.md"))
     
     for file_path in md_files:
+        record = new_file_record(file_path) if records is not None else None
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with phase(record, 'read'):
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
             
             # 提取文章编号和featureimage
-            filename = os.path.basename(file_path)
-            # 匹配文件名开头的数字
-            match = re.match(r'^(\d+)', filename)
-            if match:
-                article_num = match.group(1)
-                
-                # 提取featureimage字段
-                featureimage_match = re.search(r'featureimage:\s*images/android/(\d+\.jpg)', content)
-                if featureimage_match:
-                    expected_filename = featureimage_match.group(1)
-                    mapping[article_num] = expected_filename
-                    print(f"文章 {article_num}: {filename} -> {expected_filename}")
+            with phase(record, 'extract'):
+                found = extract_featureimage(file_path, content)
+            if record is not None:
+                record['bytes_read'] = os.path.getsize(file_path)
+                record['status'] = 'found' if found else 'none'
+            if found:
+                article_num, expected_filename = found
+                mapping[article_num] = expected_filename
+                if not quiet:
+                    print(f"文章 {article_num}: {os.path.basename(file_path)} -> {expected_filename}")
         
         except Exception as e:
+            if record is not None:
+                record['status'] = 'error'
             print(f"处理文件 {file_path} 时出错: {e}")
+        if record is not None:
+            records.append(record)
     
     return mapping
 
-def rename_images():
+def rename_images(mapping=None, stats_path=None, quiet=False):
     """
     重命名图片文件
+    stats_path 指定时写出 JSON 统计报告（扫描每篇文章的耗时和重命名耗时）；
+    quiet 时不输出每篇文章和每个文件的处理结果
     """
+    started = time.perf_counter()
     images_dir = "assets/images/android"
     
     if not os.path.exists(images_dir):
         print(f"图片目录不存在: {images_dir}")
         return
     
-    # 获取featureimage映射
-    mapping = get_featureimage_mapping()
+    # 获取featureimage映射（未传入时扫描文章）
+    records = [] if stats_path else None
+    if mapping is None:
+        mapping = get_featureimage_mapping(records, quiet)
     
     if not mapping:
         print("没有找到featureimage映射")
@@ -82,39 +116,50 @@ def rename_images():
     print(f"当前图片文件: {list(current_images.keys())}")
     print(f"期望的映射: {list(mapping.keys())}")
     
-    # 执行重命名
-    renamed_count = 0
-    
+    # 收集需要重命名的文件
+    plan = {}
     for article_num, expected_filename in mapping.items():
         if article_num in current_images:
             current_filename = current_images[article_num]
             
             if current_filename != expected_filename:
-                old_path = os.path.join(images_dir, current_filename)
-                new_path = os.path.join(images_dir, expected_filename)
-                
-                try:
-                    # 检查目标文件是否已存在
-                    if os.path.exists(new_path):
-                        print(f"警告: 目标文件已存在 {expected_filename}")
-                        continue
-                    
-                    # 重命名文件
-                    shutil.move(old_path, new_path)
-                    print(f"成功重命名: {current_filename} -> {expected_filename}")
-                    renamed_count += 1
-                    
-                except Exception as e:
-                    print(f"重命名失败 {current_filename}: {e}")
-            else:
+                plan[current_filename] = expected_filename
+            elif not quiet:
                 print(f"无需重命名: {current_filename}")
         else:
             print(f"未找到文章 {article_num} 对应的图片文件")
     
+    # 目标文件已存在且不会被移走时跳过；互换（05 <-> 06）的目标会先被移走，可以完成
+    for current_filename, expected_filename in list(plan.items()):
+        if os.path.exists(os.path.join(images_dir, expected_filename)) and expected_filename not in plan:
+            print(f"警告: 目标文件已存在 {expected_filename}")
+            del plan[current_filename]
+    
+    # 经由临时文件名分两阶段重命名
+    renamed_count = 0
+    rename_started = time.perf_counter()
+    try:
+        rename_all({
+            os.path.join(images_dir, current_filename): os.path.join(images_dir, expected_filename)
+            for current_filename, expected_filename in plan.items()
+        })
+        if not quiet:
+            for current_filename, expected_filename in plan.items():
+                print(f"成功重命名: {current_filename} -> {expected_filename}")
+        renamed_count = len(plan)
+    except Exception as e:
+        print(f"重命名失败，已恢复原文件名: {e}")
+    rename_time = time.perf_counter() - rename_started
+    
     print("=" * 50)
     print(f"重命名完成！成功重命名 {renamed_count} 个文件")
+    if stats_path:
+        write_report(stats_path, build_report(
+            'rename-android-images.py', records or [], started,
+            rename={'planned': len(plan), 'renamed': renamed_count, 'time_ms': round(rename_time * 1000, 3)},
+        ))
 
-def preview_rename():
+def preview_rename(mapping=None):
     """
     预览重命名操作
     """
@@ -124,8 +169,9 @@ def preview_rename():
         print(f"图片目录不存在: {images_dir}")
         return
     
-    # 获取featureimage映射
-    mapping = get_featureimage_mapping()
+    # 获取featureimage映射（未传入时扫描文章）
+    if mapping is None:
+        mapping = get_featureimage_mapping()
     
     if not mapping:
         print("没有找到featureimage映射")
@@ -156,20 +202,36 @@ def preview_rename():
             print(f"警告: 文章 {article_num} 缺少对应的图片文件")
 
 def main():
-    import sys
-    
-    if len(sys.argv) > 1 and sys.argv[1] == "--preview":
+    preview_only = False
+    stats_path = None
+    quiet = False
+    
+    # 解析命令行参数
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        if arg == "--preview":
+            preview_only = True
+        elif arg == "--stats" and i + 1 < len(sys.argv):
+            stats_path = sys.argv[i + 1]
+            i += 1
+        elif arg in ["--quiet", "-q"]:
+            quiet = True
+        i += 1
+    
+    if preview_only:
         preview_rename()
     else:
         print("Android图片文件重命名脚本")
         print("使用方法:")
         print("  python rename-android-images.py          # 执行重命名")
         print("  python rename-android-images.py --preview # 预览重命名")
+        print("  python rename-android-images.py --stats stats.json --quiet # 写出统计报告，不输出每个文件的结果")
         print("")
         
         confirm = input("确认执行重命名操作？(y/N): ")
         if confirm.lower() == 'y':
-            rename_images()
+            rename_images(stats_path=stats_path, quiet=quiet)
         else:
             print("操作已取消")
 
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通用图片重命名脚本
+扫描 content 中所有栏目的笔记和 assets/images 中的所有图片，将图片重命名为笔记 front matter 中
+featureimage 字段指定的路径。图片可以按内容哈希（上次运行记录的图片）或文件名开头的编号匹配，
+所有重命名分两阶段经由临时名称完成，互换（05 <-> 06）和环形重命名也能一次完成
+按哈希匹配依赖上次运行写入的索引文件：第一次运行时没有索引，只能按编号匹配。
+在图片与笔记一致时先运行一次 --build-index 建立索引，之后被移动或改名的图片就能按内容找回
+"""
+
+import os
+import re
+import sys
+import json
+
+from note_io import atomic_write, file_sha256, load_json, rename_all
+
+DEFAULT_CONTENT_DIR = "content"
+DEFAULT_ASSETS_DIR = "assets"
+DEFAULT_INDEX_PATH = ".image-index.json"
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg')
+MATCH_MODES = ('hash', 'number')
+
+FRONT_MATTER_RE = re.compile(r'\A\ufeff?---[ \t]*\r?\n(.*?)\r?\n---', re.DOTALL)
+FEATUREIMAGE_RE = re.compile(r'(?m)^featureimage:[ \t]*["\']?([^"\'\r\n]+?)["\']?[ \t]*$')
+NUMBER_RE = re.compile(r'^(\d+)')
+
+
+def _scandir_tree(root):
+    """用 os.scandir 递归遍历目录，产出 (路径, DirEntry)，跳过隐藏文件和目录"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry.path, entry
+
+
+def read_featureimage(file_path):
+    """读取笔记 front matter 中的 featureimage，没有时返回 None"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        # front matter 在文件开头，只读取开头部分
+        head = f.read(8192)
+    match = FRONT_MATTER_RE.match(head)
+    if not match:
+        return None
+    found = FEATUREIMAGE_RE.search(match.group(1))
+    if not found:
+        return None
+    value = found.group(1).strip()
+    if '://' in value:
+        return None
+    return value.lstrip('/')
+
+
+def load_index(index_path):
+    """读取上次运行记录的索引，不存在或无法解析时返回空索引"""
+    data = load_json(index_path, {})
+    return {'notes': data.get('notes', {}), 'hashes': data.get('hashes', {})}
+
+
+def save_index(index_path, index):
+    atomic_write(index_path, lambda f: json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True))
+
+
+def build_indexes(content_dir, assets_dir, previous):
+    """
+    一次遍历建立两个索引：
+    notes  {笔记相对路径: featureimage 相对于 assets 的路径}
+    hashes {图片相对于 assets 的路径: {'size', 'mtime_ns', 'sha256'}}
+    大小和修改时间与上次记录相同的图片沿用上次的哈希，不重新读取
+    """
+    notes = {}
+    for path, entry in _scandir_tree(content_dir):
+        if not entry.name.endswith('.md'):
+            continue
+        try:
+            featureimage = read_featureimage(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"处理文件 {path} 时出错: {e}")
+            continue
+        if featureimage:
+            notes[os.path.relpath(path, content_dir).replace(os.sep, '/')] = featureimage
+
+    hashes = {}
+    for path, entry in _scandir_tree(os.path.join(assets_dir, 'images')):
+        if not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        relative = os.path.relpath(path, assets_dir).replace(os.sep, '/')
+        stat = entry.stat()
+        cached = previous['hashes'].get(relative)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            hashes[relative] = cached
+        else:
+            hashes[relative] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(path)}
+    return notes, hashes
+
+
+def _match_by_hash(note, target, by_hash, previous):
+    """按上次运行时该笔记对应图片的内容哈希查找图片"""
+    record = previous['notes'].get(note)
+    if not record:
+        return None
+    candidates = by_hash.get(record['sha256'], [])
+    if not candidates:
+        return None
+    # 目标位置已经是这张图片时无需移动
+    if target in candidates:
+        return target
+    if record['featureimage'] in candidates:
+        return record['featureimage']
+    return candidates[0]
+
+
+def _number_key(relative):
+    """图片的 (目录, 扩展名, 文件名开头的编号)，文件名不以编号开头时返回 None"""
+    found = NUMBER_RE.match(os.path.basename(relative))
+    if not found:
+        return None
+    return os.path.dirname(relative), os.path.splitext(relative)[1].lower(), found.group(1)
+
+
+def _match_by_number(note, target, by_number):
+    """按笔记文件名开头的编号，在目标所在目录中查找以同一编号开头的图片"""
+    match = NUMBER_RE.match(os.path.basename(note))
+    if not match:
+        return None
+    key = (os.path.dirname(target), os.path.splitext(target)[1].lower(), match.group(1))
+    candidates = by_number.get(key, [])
+    if target in candidates:
+        return target
+    return candidates[0] if candidates else None
+
+
+def plan_renames(notes, hashes, previous, modes=MATCH_MODES):
+    """
+    为每篇笔记找到应当放在 featureimage 位置的图片，返回 (重命名计划, 警告列表)
+    计划为 {源相对路径: 目标相对路径}
+    """
+    by_hash = {}
+    by_number = {}
+    for relative, info in sorted(hashes.items()):
+        by_hash.setdefault(info['sha256'], []).append(relative)
+        key = _number_key(relative)
+        if key:
+            by_number.setdefault(key, []).append(relative)
+
+    plan = {}
+    warnings = []
+    claimed = {}
+    for note, target in sorted(notes.items()):
+        source = None
+        for mode in modes:
+            if mode == 'hash':
+                source = _match_by_hash(note, target, by_hash, previous)
+            elif mode == 'number':
+                source = _match_by_number(note, target, by_number)
+            if source:
+                break
+        if source is None:
+            if target not in hashes:
+                warnings.append(f"笔记 {note} 的图片不存在且无法匹配: {target}")
+            continue
+        if source in claimed and claimed[source] != target:
+            warnings.append(f"图片 {source} 同时匹配了 {claimed[source]} 和 {target}，跳过 {note}")
+            continue
+        claimed[source] = target
+        if source != target:
+            plan[source] = target
+
+    # 跳过会覆盖无关图片或目标重复的重命名；跳过一项后其源文件留在原处，需要重新检查
+    changed = True
+    while changed:
+        changed = False
+        targets = list(plan.values())
+        for source, target in list(plan.items()):
+            if target in hashes and target not in plan:
+                warnings.append(f"目标文件已存在且不会被移走，跳过: {source} -> {target}")
+            elif targets.count(target) > 1:
+                warnings.append(f"多个图片重命名到同一个目标，跳过: {source} -> {target}")
+            else:
+                continue
+            del plan[source]
+            changed = True
+            break
+    return plan, warnings
+
+
+def _write_index(index_path, notes, hashes):
+    """写出索引：每篇笔记记录当前 featureimage 位置上图片的哈希，供下次按哈希匹配"""
+    index = {'notes': {}, 'hashes': hashes}
+    for note, featureimage in notes.items():
+        if featureimage in hashes:
+            index['notes'][note] = {'featureimage': featureimage, 'sha256': hashes[featureimage]['sha256']}
+    save_index(index_path, index)
+    return index
+
+
+def rename_images(content_dir=DEFAULT_CONTENT_DIR, assets_dir=DEFAULT_ASSETS_DIR, index_path=DEFAULT_INDEX_PATH,
+                  modes=MATCH_MODES, preview=False, confirm=True, build_only=False):
+    """
+    扫描并执行（或预览）重命名，成功后更新索引
+    confirm 时列出重命名计划后询问是否执行；build_only 时不重命名，只按当前文件建立索引
+    """
+    for directory in (content_dir, assets_dir):
+        if not os.path.exists(directory):
+            print(f"目录不存在: {directory}")
+            return
+
+    previous = load_index(index_path)
+    notes, hashes = build_indexes(content_dir, assets_dir, previous)
+    print(f"找到 {len(notes)} 篇带 featureimage 的笔记，{len(hashes)} 张图片")
+    print("=" * 50)
+
+    if build_only:
+        index = _write_index(index_path, notes, hashes)
+        print(f"索引已写入: {index_path}（{len(index['notes'])} 篇笔记，{len(hashes)} 张图片）")
+        return
+    if 'hash' in modes and not os.path.exists(index_path):
+        print(f"提示: 索引文件 {index_path} 不存在，本次无法按哈希匹配，只能按编号匹配；"
+              "运行结束后会建立索引，供下次使用")
+
+    plan, warnings = plan_renames(notes, hashes, previous, modes)
+    for warning in warnings:
+        print(f"警告: {warning}")
+    for source, target in sorted(plan.items()):
+        print(f"重命名: {source} -> {target}")
+
+    if preview:
+        print("=" * 50)
+        print(f"预览完成！需要重命名 {len(plan)} 个文件")
+        return
+
+    if plan and confirm:
+        print("=" * 50)
+        try:
+            answer = input("确认执行重命名操作？(y/N): ")
+        except EOFError:
+            answer = ''
+        if answer.lower() != 'y':
+            print("操作已取消")
+            return
+
+    if plan:
+        try:
+            rename_all({
+                os.path.join(assets_dir, source): os.path.join(assets_dir, target)
+                for source, target in plan.items()
+            })
+        except (OSError, ValueError) as e:
+            print(f"重命名失败，已恢复原文件名: {e}")
+            return
+        # 重命名只改变路径，哈希随文件移动
+        moved = {source: hashes.pop(source) for source in plan}
+        for source, target in plan.items():
+            info = dict(moved[source])
+            stat = os.stat(os.path.join(assets_dir, target))
+            info['mtime_ns'] = stat.st_mtime_ns
+            hashes[target] = info
+
+    _write_index(index_path, notes, hashes)
+
+    print("=" * 50)
+    print(f"重命名完成！成功重命名 {len(plan)} 个文件")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h"]:
+        print("通用图片重命名脚本")
+        print("使用方法:")
+        print("  python rename-images.py [选项]")
+        print("")
+        print("选项:")
+        print("  --preview, -p       仅预览重命名")
+        print(f"  --content <目录>     笔记目录 (默认: {DEFAULT_CONTENT_DIR})")
+        print(f"  --assets <目录>      资源目录，featureimage 相对于该目录 (默认: {DEFAULT_ASSETS_DIR})")
+        print(f"  --index <文件>       记录笔记与图片哈希的索引文件 (默认: {DEFAULT_INDEX_PATH})")
+        print("  --match <列表>       匹配方式及优先顺序，逗号分隔 (默认: hash,number)")
+        print("  --yes, -y           不询问，直接执行重命名")
+        print("  --build-index       不重命名，只按当前的笔记和图片建立索引")
+        print("")
+        print("匹配方式:")
+        print("  hash                按上次运行时笔记对应图片的内容哈希查找图片（需要已有索引，第一次运行时不可用）")
+        print("  number              按笔记文件名开头的编号查找同目录中以该编号开头的图片")
+        print("")
+        print("示例:")
+        print("  python rename-images.py --build-index")
+        print("  python rename-images.py --preview")
+        print("  python rename-images.py --match number --yes")
+        return
+
+    content_dir = DEFAULT_CONTENT_DIR
+    assets_dir = DEFAULT_ASSETS_DIR
+    index_path = DEFAULT_INDEX_PATH
+    modes = MATCH_MODES
+    preview_only = False
+    confirm = True
+    build_only = False
+
+    # 解析命令行参数
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        value = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+        if arg in ["--preview", "-p"]:
+            preview_only = True
+        elif arg in ["--yes", "-y"]:
+            confirm = False
+        elif arg == "--build-index":
+            build_only = True
+        elif arg == "--content" and value is not None:
+            content_dir = value
+            i += 1
+        elif arg == "--assets" and value is not None:
+            assets_dir = value
+            i += 1
+        elif arg == "--index" and value is not None:
+            index_path = value
+            i += 1
+        elif arg == "--match" and value is not None:
+            modes = tuple(mode.strip() for mode in value.split(",") if mode.strip())
+            unknown = [mode for mode in modes if mode not in MATCH_MODES]
+            if unknown:
+                print(f"未知匹配方式: {', '.join(unknown)}")
+                return
+            i += 1
+        i += 1
+
+    rename_images(content_dir, assets_dir, index_path, modes, preview_only, confirm, build_only)
+
+if __name__ == "__main__":
+    main()
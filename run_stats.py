@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批处理脚本共用的运行统计
+记录每个文件各阶段（读取、转换、写入等）的耗时和读写字节数，
+运行结束后由 --stats 写出结构化的 JSON 报告，用于找出异常缓慢的笔记和跟踪处理耗时的变化
+"""
+
+import time
+import json
+import contextlib
+
+from note_io import atomic_write
+
+REPORT_VERSION = 1
+# 报告中列出的最慢文件数量
+DEFAULT_SLOWEST = 10
+
+
+def new_file_record(file_path):
+    """创建单个文件的统计记录，耗时以秒为单位累计"""
+    return {'file': file_path, 'status': None, 'phases': {}, 'bytes_read': 0, 'bytes_written': 0}
+
+
+@contextlib.contextmanager
+def phase(record, name):
+    """累计 with 块内的耗时到 record['phases'][name]；record 为 None 时不计时"""
+    if record is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record['phases'][name] = record['phases'].get(name, 0.0) + time.perf_counter() - started
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _file_entry(record):
+    entry = dict(record)
+    entry['phases'] = {name: _ms(value) for name, value in record['phases'].items()}
+    entry['total_ms'] = _ms(sum(record['phases'].values()))
+    return entry
+
+
+def build_report(script, records, started, slowest=DEFAULT_SLOWEST, **extra):
+    """
+    汇总各文件的记录，返回报告字典:
+    totals 文件数、各状态的文件数、读写字节数、各阶段累计耗时和总耗时 /
+    slowest 耗时最长的 slowest 个文件 / files 每个文件的记录 / extra 中的其他字段（例如各转换步骤的命中次数）
+    耗时以毫秒为单位
+    """
+    files = [_file_entry(record) for record in records]
+    statuses = {}
+    phases = {}
+    for record in records:
+        statuses[record['status']] = statuses.get(record['status'], 0) + 1
+        for name, value in record['phases'].items():
+            phases[name] = phases.get(name, 0.0) + value
+
+    report = {
+        'version': REPORT_VERSION,
+        'script': script,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'totals': {
+            'files': len(records),
+            'statuses': statuses,
+            'bytes_read': sum(record['bytes_read'] for record in records),
+            'bytes_written': sum(record['bytes_written'] for record in records),
+            'phases': {name: _ms(value) for name, value in phases.items()},
+            'elapsed_ms': _ms(time.perf_counter() - started),
+        },
+        'slowest': sorted(files, key=lambda entry: entry['total_ms'], reverse=True)[:slowest],
+    }
+    report.update(extra)
+    report['files'] = files
+    return report
+
+
+def write_report(report_path, report):
+    """写出 JSON 报告"""
+    atomic_write(report_path, lambda f: json.dump(report, f, ensure_ascii=False, indent=1))
+    print(f"统计报告已写入: {report_path}")
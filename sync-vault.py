@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Obsidian 笔记库与 content/ 的增量同步脚本
+不再先把整个笔记库复制到 content/ 再原地转换：状态文件记录每篇笔记的源文件哈希、输出文件哈希和转换规则版本，
+只转换新增或修改过的笔记，删除源笔记已不存在的输出文件；
+输出文件在 content/ 中被直接修改过时报告冲突，不覆盖也不删除，由 --overwrite / --keep-content 决定保留哪一边。
+源文件和输出文件都先比较大小和修改时间，未变化时不读取，同步耗时与变化的笔记数量成正比
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+
+import obsidian_converter as converter
+from note_io import atomic_write, file_sha256, write_bytes
+
+DEFAULT_STATE_PATH = ".vault-sync-state.json"
+DEFAULT_CONTENT_DIR = "content"
+STATE_FORMAT = 1
+NOTE_EXTENSION = ".md"
+
+# 冲突处理方式: 报告并跳过 / 以笔记库为准覆盖 / 以 content 中的修改为准
+CONFLICT_REPORT = 'report'
+CONFLICT_OVERWRITE = 'overwrite'
+CONFLICT_KEEP = 'keep'
+
+
+def scan_vault(vault_dir):
+    """
+    查找笔记库中的所有笔记，返回 {相对路径: os.stat 结果}
+    跳过以 . 开头的目录（.obsidian、.trash 等）和文件
+    """
+    notes = {}
+    for root, dirs, names in os.walk(vault_dir):
+        dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+        for name in names:
+            if name.startswith('.') or not name.lower().endswith(NOTE_EXTENSION):
+                continue
+            path = os.path.join(root, name)
+            notes[os.path.relpath(path, vault_dir).replace(os.sep, '/')] = os.stat(path)
+    return notes
+
+
+def load_state(state_path, vault_dir, content_dir):
+    """
+    读取同步状态，不存在、无法解析或目录不一致时返回空状态
+    状态: {'notes': {相对路径: 记录}}，记录包括源文件和输出文件的大小、修改时间、哈希，以及转换时的规则版本
+    """
+    state = {
+        'format': STATE_FORMAT,
+        'vault': os.path.abspath(vault_dir),
+        'content': os.path.abspath(content_dir),
+        'notes': {},
+    }
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return state
+    except (OSError, ValueError) as e:
+        print(f"读取同步状态 {state_path} 时出错，将重新比较所有笔记: {e}")
+        return state
+
+    if data.get('format') != STATE_FORMAT or data.get('vault') != state['vault'] \
+            or data.get('content') != state['content']:
+        print(f"同步状态 {state_path} 对应其他目录，将重新比较所有笔记")
+        return state
+    state['notes'] = data.get('notes', {})
+    return state
+
+
+def save_state(state_path, state):
+    atomic_write(state_path, lambda f: json.dump(state, f, ensure_ascii=False, indent=1, sort_keys=True))
+
+
+def _same_stat(entry, prefix, stat):
+    return entry[prefix + '_size'] == stat.st_size and entry[prefix + '_mtime_ns'] == stat.st_mtime_ns
+
+
+def _stat_or_none(path):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def output_edited(entry, output_path):
+    """
+    输出文件是否在上次同步之后被直接修改过（大小和修改时间未变时不读取文件）
+    返回 (是否修改过, 当前的 os.stat 结果)；文件已不存在时视为未修改
+    """
+    stat = _stat_or_none(output_path)
+    if stat is None or _same_stat(entry, 'output', stat):
+        return False, stat
+    if file_sha256(output_path) != entry['output_sha256']:
+        return True, stat
+    # 只是修改时间变了（例如被复制或 touch），记录新的修改时间
+    entry['output_size'] = stat.st_size
+    entry['output_mtime_ns'] = stat.st_mtime_ns
+    return False, stat
+
+
+def _new_entry(source_stat, source_sha256, output_stat, output_sha256, version, links=None):
+    entry = {
+        'source_size': source_stat.st_size,
+        'source_mtime_ns': source_stat.st_mtime_ns,
+        'source_sha256': source_sha256,
+        'output_size': output_stat.st_size,
+        'output_mtime_ns': output_stat.st_mtime_ns,
+        'output_sha256': output_sha256,
+        'version': version,
+    }
+    if links:
+        # 转换时各 Wiki 链接目标的解析结果，链接索引变化后据此判断是否需要重新转换
+        entry['links'] = links
+    return entry
+
+
+def sync_note(conv, vault_dir, content_dir, relative, source_stat, entry, conflict_mode, preview):
+    """
+    同步一篇笔记，返回 (状态, 新的记录)
+    状态: converted 已转换 / unchanged 未变化 / conflict 输出被修改过 / kept 保留了 content 中的修改 / error 出错
+    新的记录为 None 时保留原记录
+    转换规则版本不含链接索引摘要：链接索引变化时，只有链接目标的解析结果变化的笔记重新转换
+    """
+    source_path = os.path.join(vault_dir, relative)
+    output_path = os.path.join(content_dir, relative)
+    try:
+        raw = None
+        if entry and _same_stat(entry, 'source', source_stat):
+            source_sha256 = entry['source_sha256']
+        else:
+            with open(source_path, 'rb') as f:
+                raw = f.read()
+            source_sha256 = hashlib.sha256(raw).hexdigest()
+
+        if entry:
+            edited, output_stat = output_edited(entry, output_path)
+        else:
+            edited, output_stat = False, _stat_or_none(output_path)
+        source_changed = (entry is None or entry['source_sha256'] != source_sha256
+                          or entry['version'] != conv.rules_version or conv.links_changed(entry.get('links')))
+
+        if edited and conflict_mode == CONFLICT_KEEP:
+            # 以 content 中的修改为准：记录当前的输出文件，源笔记再次修改前不会覆盖
+            print(f"保留 content 中的修改: {relative}")
+            if preview:
+                return 'kept', None
+            return 'kept', _new_entry(source_stat, source_sha256, output_stat, file_sha256(output_path),
+                                      conv.rules_version)
+        if edited and conflict_mode == CONFLICT_REPORT:
+            print(f"冲突，content 中的文件已被直接修改: {relative}")
+            return 'conflict', None
+        if not source_changed and not edited and output_stat is not None:
+            if entry and not _same_stat(entry, 'source', source_stat):
+                # 内容未变，只更新修改时间
+                return 'unchanged', dict(entry, source_size=source_stat.st_size,
+                                         source_mtime_ns=source_stat.st_mtime_ns)
+            return 'unchanged', None
+
+        if raw is None:
+            with open(source_path, 'rb') as f:
+                raw = f.read()
+        text = converter.decode_note(raw)
+        output = conv.convert_text(text).encode('utf-8')
+        links = conv.link_dependencies(text)
+
+        if entry is None and output_stat is not None and conflict_mode != CONFLICT_OVERWRITE:
+            # 第一次同步时 content 中已有同名文件：内容与转换结果一致时直接记录，否则视为冲突
+            if file_sha256(output_path) != hashlib.sha256(output).hexdigest():
+                if conflict_mode == CONFLICT_KEEP:
+                    print(f"保留 content 中的修改: {relative}")
+                    if preview:
+                        return 'kept', None
+                    return 'kept', _new_entry(source_stat, source_sha256, output_stat,
+                                              file_sha256(output_path), conv.rules_version)
+                print(f"冲突，content 中已有不同内容的文件: {relative}")
+                return 'conflict', None
+
+        if preview:
+            print(f"需要同步: {relative}")
+            return 'converted', None
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        written = write_bytes(output_path, output)
+        print(f"{'已同步' if written else '已记录'}: {relative}")
+        return 'converted' if written else 'unchanged', _new_entry(
+            source_stat, source_sha256, os.stat(output_path), hashlib.sha256(output).hexdigest(), conv.rules_version,
+            links,
+        )
+
+    except Exception as e:
+        print(f"同步笔记 {relative} 时出错: {e}")
+        return 'error', None
+
+
+def _remove_empty_dirs(directory, content_dir):
+    """删除输出文件后，向上删除 content 目录中已空的子目录"""
+    content_dir = os.path.abspath(content_dir)
+    directory = os.path.abspath(directory)
+    while directory != content_dir and directory.startswith(content_dir + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
+
+
+def remove_output(content_dir, relative, entry, conflict_mode, preview):
+    """
+    源笔记已删除时删除对应的输出文件，返回状态:
+    deleted 已删除 / missing 输出文件已不存在 / conflict 输出被修改过，未删除 / kept 保留了输出文件 / error 出错
+    """
+    output_path = os.path.join(content_dir, relative)
+    try:
+        edited, stat = output_edited(entry, output_path)
+        if stat is None:
+            return 'missing'
+        if edited and conflict_mode == CONFLICT_REPORT:
+            print(f"冲突，源笔记已删除但 content 中的文件被修改过: {relative}")
+            return 'conflict'
+        if edited and conflict_mode == CONFLICT_KEEP:
+            print(f"源笔记已删除，保留 content 中修改过的文件: {relative}")
+            return 'kept'
+        if preview:
+            print(f"需要删除: {relative}")
+            return 'deleted'
+        os.remove(output_path)
+        _remove_empty_dirs(os.path.dirname(output_path), content_dir)
+        print(f"已删除: {relative}")
+        return 'deleted'
+    except Exception as e:
+        print(f"删除文件 {relative} 时出错: {e}")
+        return 'error'
+
+
+def link_note_files(vault_dir, content_dir, sources, synced):
+    """
+    建立链接索引使用的笔记 [(文件路径, 相对于站点 content 的路径)]：
+    笔记库中的笔记按同步后在 content 中的位置计入，本次新增的笔记在写入之前就能被其他笔记链接到；
+    站点 content 中不是由同步生成的其他笔记照常计入，上次同步生成的文件（包括源笔记已删除的）不计入
+    找不到站点根目录时返回 None
+    """
+    site_root = converter.find_site_root(content_dir)
+    if site_root is None:
+        return None
+    prefix = os.path.relpath(os.path.abspath(content_dir), os.path.join(site_root, 'content')).replace(os.sep, '/')
+    prefix = '' if prefix == '.' else prefix + '/'
+    generated = {prefix + relative for relative in set(sources) | set(synced)}
+    files = [(file_path, relative) for file_path, relative in converter.site_note_files(site_root)
+             if relative not in generated]
+    files.extend((os.path.join(vault_dir, relative), prefix + relative) for relative in sorted(sources))
+    return files
+
+
+def sync_vault(vault_dir, content_dir=DEFAULT_CONTENT_DIR, state_path=DEFAULT_STATE_PATH,
+               conflict_mode=CONFLICT_REPORT, preview=False, links=False, link_cache=None, mermaid=None,
+               image_sizes=False):
+    """
+    把笔记库同步到 content 目录，返回冲突和出错的数量
+    links 时按 content 所在的站点建立链接索引并转换 Wiki 链接，笔记库中的笔记按同步后的位置计入索引；
+    mermaid 为 enable_mermaid_render 的参数字典；image_sizes 时按站点 assets 中图片的尺寸写入宽高
+    转换规则版本（包括 Mermaid 配置和图片尺寸索引）变化后，所有笔记都会重新转换；
+    链接索引变化后只重新转换链接目标有变化的笔记
+    """
+    started = time.perf_counter()
+    if not os.path.isdir(vault_dir):
+        print(f"目录不存在: {vault_dir}")
+        return 1
+    os.makedirs(content_dir, exist_ok=True)
+
+    state = load_state(state_path, vault_dir, content_dir)
+    notes = state['notes']
+    sources = scan_vault(vault_dir)
+    conv = converter.Converter(
+        links=content_dir if links else None, link_cache=link_cache, mermaid=mermaid,
+        image_sizes=content_dir if image_sizes else None,
+        link_notes=link_note_files(vault_dir, content_dir, sources, notes) if links else None,
+    )
+
+    print(f"{'预览模式 - ' if preview else ''}笔记库中有 {len(sources)} 篇笔记，上次同步记录 {len(notes)} 篇")
+    print("-" * 50)
+
+    counts = {}
+    for relative in sorted(sources):
+        status, new_entry = sync_note(conv, vault_dir, content_dir, relative, sources[relative], notes.get(relative),
+                                      conflict_mode, preview)
+        counts[status] = counts.get(status, 0) + 1
+        if new_entry is not None:
+            notes[relative] = new_entry
+
+    for relative in sorted(set(notes) - set(sources)):
+        status = remove_output(content_dir, relative, notes[relative], conflict_mode, preview)
+        counts[status] = counts.get(status, 0) + 1
+        if status in ('deleted', 'missing', 'kept') and not preview:
+            del notes[relative]
+
+    if not preview:
+        save_state(state_path, state)
+
+    print("-" * 50)
+    action = "需要" if preview else "已"
+    print(f"同步完成！{action}转换 {counts.get('converted', 0)} 篇，未变化 {counts.get('unchanged', 0)} 篇，"
+          f"{action}删除 {counts.get('deleted', 0)} 个，冲突 {counts.get('conflict', 0)} 个，"
+          f"保留 content 中的修改 {counts.get('kept', 0)} 个，出错 {counts.get('error', 0)} 个 "
+          f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+    if counts.get('conflict'):
+        print("冲突的文件未被修改：使用 --overwrite 以笔记库为准，或 --keep-content 保留 content 中的修改")
+    return counts.get('conflict', 0) + counts.get('error', 0)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ["--help", "-h"]:
+        print("Obsidian 笔记库与 content/ 的增量同步脚本")
+        print("使用方法:")
+        print("  python sync-vault.py <笔记库目录> [content目录] [选项]")
+        print("")
+        print("选项:")
+        print(f"  --state <文件>       同步状态文件 (默认: {DEFAULT_STATE_PATH})")
+        print("  --preview, -p       仅预览需要同步和删除的笔记")
+        print("  --overwrite         冲突时以笔记库为准，覆盖或删除 content 中修改过的文件")
+        print("  --keep-content      冲突时保留 content 中的修改，源笔记再次修改前不再覆盖")
+        print("  --links             转换 Wiki 链接（按笔记库和 content 所在的 Hugo 站点建立链接索引）")
+        print("  --link-cache <文件>  链接索引缓存文件")
+        print("  --render-mermaid    将 Mermaid 图表预渲染为内联 SVG")
+        print("  --image-sizes       写入图片宽高（featureimage 和 figure 短代码）")
+        print("")
+        print("示例:")
+        print("  python sync-vault.py ~/Obsidian/Blog content")
+        print("  python sync-vault.py ~/Obsidian/Blog content --preview")
+        print("  python sync-vault.py ~/Obsidian/Blog content --links --overwrite")
+        return
+
+    vault_dir = sys.argv[1]
+    content_dir = DEFAULT_CONTENT_DIR
+    state_path = DEFAULT_STATE_PATH
+    conflict_mode = CONFLICT_REPORT
+    preview_only = False
+    links = False
+    link_cache = None
+    mermaid = None
+    image_sizes = False
+
+    # 解析命令行参数
+    i = 2
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        value = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+        if arg in ["--preview", "-p"]:
+            preview_only = True
+        elif arg == "--overwrite":
+            conflict_mode = CONFLICT_OVERWRITE
+        elif arg == "--keep-content":
+            conflict_mode = CONFLICT_KEEP
+        elif arg == "--links":
+            links = True
+        elif arg == "--render-mermaid":
+            mermaid = {}
+        elif arg == "--image-sizes":
+            image_sizes = True
+        elif arg == "--state" and value is not None:
+            state_path = value
+            i += 1
+        elif arg == "--link-cache" and value is not None:
+            link_cache = value
+            i += 1
+        elif not arg.startswith("-"):
+            content_dir = arg
+        i += 1
+
+    problems = sync_vault(vault_dir, content_dir, state_path, conflict_mode, preview_only, links, link_cache, mermaid,
+                          image_sizes)
+    if problems:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""测试共用设置：脚本都在仓库根目录，把根目录加入模块搜索路径"""
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""obsidian_converter._callout_events 对嵌套、折叠、代码块和空行的处理，以及转换后的 alert 短代码"""
+
+import obsidian_converter
+
+
+def _events(text):
+    """按 convert_callout_segment 的方式拆分 Callout 文本，返回简化后的事件列表"""
+    lines = text.split('\n')
+    info = obsidian_converter.CALLOUT_START_RE.match(lines[0]).groupdict()
+    events = []
+    for kind, value in obsidian_converter._callout_events(info, [line + '\n' for line in lines[1:]]):
+        events.append((kind, value if kind == 'line' else value['type']))
+    return events
+
+
+def test_title_becomes_first_line():
+    assert _events("> [!tip] 提示\n> 内容") == [
+        ('open', 'tip'), ('line', '提示\n'), ('line', '内容\n'), ('close', 'tip'),
+    ]
+
+
+def test_folded_callout_keeps_title_out_of_lines():
+    assert _events("> [!faq]- 问题\n> 答案") == [('open', 'faq'), ('line', '答案\n'), ('close', 'faq')]
+
+
+def test_nested_callouts_open_and_close_by_depth():
+    assert _events("> [!note] 外层\n> > [!tip] 内层\n> > 内容\n> 外层内容") == [
+        ('open', 'note'), ('line', '外层\n'),
+        ('open', 'tip'), ('line', '内层\n'), ('line', '内容\n'), ('close', 'tip'),
+        ('line', '外层内容\n'), ('close', 'note'),
+    ]
+
+
+def test_callout_start_inside_code_block_is_text():
+    assert _events("> [!note]\n> ```\n> > [!tip] 代码\n> ```\n> 之后") == [
+        ('open', 'note'), ('line', '```\n'), ('line', '> [!tip] 代码\n'), ('line', '```\n'), ('line', '之后\n'),
+        ('close', 'note'),
+    ]
+
+
+def test_trailing_blank_lines_are_dropped():
+    assert _events("> [!note]\n> 第一段\n>\n> 第二段\n>\n>") == [
+        ('open', 'note'), ('line', '第一段\n'), ('line', '\n'), ('line', '第二段\n'), ('close', 'note'),
+    ]
+
+
+def test_folded_callout_renders_details():
+    assert obsidian_converter.convert_content("> [!faq]- 问题\n> 答案\n") == (
+        '{{< alert "info" title="问题" >}}\n'
+        '<details class="callout-fold">\n<summary>问题</summary>\n\n答案\n\n</details>\n'
+        '{{< /alert >}}\n'
+    )
+
+
+def test_nested_callouts_render_nested_alerts():
+    assert obsidian_converter.convert_content("> [!note] 外层\n> > [!tip] 内层\n> > 内容\n> 外层内容\n") == (
+        '{{< alert "note" title="外层" >}}\n外层\n'
+        '{{< alert "tip" title="内层" >}}\n内层\n内容\n{{< /alert >}}\n'
+        '外层内容\n{{< /alert >}}\n'
+    )
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""dedupe-public.py 的引用改写和去重（删除改写过引用的重复图片，其余替换为硬链接）"""
+
+import os
+
+import pytest
+
+from note_io import load_script
+
+dedupe = load_script('dedupe-public.py')
+
+RENAMES = {'/img/b.png': '/img/a.png'}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('<img src="/blog/img/b.png?x=1#y">', '<img src="/blog/img/a.png?x=1#y">'),
+    ('<img srcset="/img/b.png 1x, /x/img/b.png 2x">', '<img srcset="/img/a.png 1x, /x/img/b.png 2x">'),
+    ('style="background:url(/img/b.png)"', 'style="background:url(/img/a.png)"'),
+    ('&lt;img src=&#34;https://example.com/blog/img/b.png&#34;&gt;',
+     '&lt;img src=&#34;https://example.com/blog/img/a.png&#34;&gt;'),
+    ('<img src=/img/b.png.webp>', '<img src=/img/b.png.webp>'),
+    ('正文中的 /img/b.png', '正文中的 /img/b.png'),
+])
+def test_rewrite_content(text, expected):
+    assert dedupe.rewrite_content(text, RENAMES, '/blog') == expected
+
+
+def test_dedupe_public(tmp_path):
+    public = tmp_path / 'public'
+    (public / 'img').mkdir(parents=True)
+    data = os.urandom(2048)
+    for name in ('a.png', 'b.png', 'c.png'):
+        (public / 'img' / name).write_bytes(data)
+    script = os.urandom(2048)
+    (public / 'a.js').write_bytes(script)
+    (public / 'b.js').write_bytes(script)
+    (public / 'index.html').write_text('<img src="/img/b.png"><img src="c.png">')
+
+    saved = dedupe.dedupe_public(str(public), base_path='')
+    assert saved == 3 * 2048
+    # 仍被相对路径引用的 c.png 不能删除，改为硬链接
+    assert (public / 'index.html').read_text() == '<img src="/img/a.png"><img src="c.png">'
+    assert sorted(os.listdir(public / 'img')) == ['a.png', 'c.png']
+    assert os.path.samefile(public / 'img' / 'a.png', public / 'img' / 'c.png')
+    assert os.path.samefile(public / 'a.js', public / 'b.js')
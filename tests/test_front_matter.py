@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""front_matter.py 的解析、筛选和编辑"""
+
+import pytest
+
+import front_matter
+
+NOTE = (
+    "---\n"
+    "title: 线性布局\n"
+    "date: 2025-01-02\n"
+    "draft: false\n"
+    "weight: 3\n"
+    "categories:\n"
+    "  - Android\n"
+    "tags: [\"布局\", \"控件\"]\n"
+    "params:\n"
+    "  series: android\n"
+    "---\n"
+    "正文 --- 不变\n"
+)
+
+
+def test_parse_front_matter_values():
+    fmt, fields = front_matter.parse_front_matter(NOTE)
+    assert fmt == 'yaml'
+    assert fields['title'] == '线性布局'
+    assert fields['date'] == '2025-01-02'
+    assert fields['draft'] is False
+    assert fields['weight'] == 3
+    assert fields['categories'] == ['Android']
+    assert fields['tags'] == ['布局', '控件']
+    assert front_matter.get_field(fields, 'params.series') == 'android'
+
+
+def test_parse_toml_and_missing_front_matter():
+    fmt, fields = front_matter.parse_front_matter('+++\ntitle = "a"\ntags = ["x"]\n+++\n正文\n')
+    assert fmt == 'toml'
+    assert fields == {'title': 'a', 'tags': ['x']}
+    assert front_matter.parse_front_matter('正文\n---\n') == (None, {})
+    assert front_matter.parse_front_matter('---\ntitle: 未闭合\n') == (None, {})
+
+
+@pytest.mark.parametrize('condition, expected', [
+    ('categories contains Android', True),
+    ('tags !contains 布局', False),
+    ('date < 2025-06-01', True),
+    ('weight >= 4', False),
+    ('summary missing', True),
+    ('params.series == android', True),
+])
+def test_filters(condition, expected):
+    _, fields = front_matter.parse_front_matter(NOTE)
+    assert front_matter.match_filter(fields, front_matter.parse_filter(condition)) is expected
+
+
+def test_parse_filter_rejects_invalid_condition():
+    with pytest.raises(ValueError):
+        front_matter.parse_filter('categories')
+
+
+def test_edit_only_rewrites_changed_lines():
+    status, content = front_matter.edit_front_matter(NOTE, [
+        ('set', 'draft', True, None),
+        ('append', 'tags', '教程', None),
+        ('set', 'summary', 'a: b', 'title'),
+        ('unset', 'categories', None, None),
+    ])
+    assert status == 'edited'
+    assert content == (
+        "---\n"
+        "title: 线性布局\n"
+        "summary: \"a: b\"\n"
+        "date: 2025-01-02\n"
+        "draft: true\n"
+        "weight: 3\n"
+        "tags: [\"布局\", \"控件\", \"教程\"]\n"
+        "params:\n"
+        "  series: android\n"
+        "---\n"
+        "正文 --- 不变\n"
+    )
+
+
+def test_edit_statuses():
+    assert front_matter.edit_front_matter(NOTE, [('set', 'weight', 3, None)]) == ('unchanged', NOTE)
+    assert front_matter.edit_front_matter(NOTE, [('append', 'tags', '布局', None)]) == ('unchanged', NOTE)
+    filtered = front_matter.edit_front_matter(NOTE, [('set', 'draft', True, None)],
+                                              [front_matter.parse_filter('categories contains iOS')])
+    assert filtered == ('filtered', NOTE)
+    assert front_matter.edit_front_matter('正文\n', [('set', 'a', 1, None)]) == ('no_front_matter', '正文\n')
+
+
+def test_edit_bytes_keeps_crlf_and_body():
+    raw = b"---\r\ntitle: a\r\n---\r\nbody \xe6\xad\xa3\xe6\x96\x87\r\n"
+    status, content = front_matter.edit_front_matter(raw, [('set', 'draft', False, None)])
+    assert status == 'edited'
+    assert content == b"---\r\ntitle: a\r\ndraft: false\r\n---\r\nbody \xe6\xad\xa3\xe6\x96\x87\r\n"
+
+
+def test_edit_rejects_unknown_operation():
+    with pytest.raises(ValueError):
+        front_matter.edit_front_matter(NOTE, [('rename', 'title', 'x', None)])
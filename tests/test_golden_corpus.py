@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+用 golden-corpus.py --save-golden 保存的黄金文件（tests/golden.json）检查转换结果
+重新生成: python golden-corpus.py --save-golden tests/golden.json
+"""
+
+import os
+
+import pytest
+
+from conftest import REPO_ROOT
+from note_io import load_script
+
+golden_corpus = load_script('golden-corpus.py')
+converter = golden_corpus.load_converter()
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden.json')
+
+# 单遍转换引擎有意与逐步转换函数不同的用例：代码块和多反引号行内代码中的 $、转义的 \$、
+# 折叠和嵌套的 Callout、代码块中的 Callout、CRLF 换行、正文中的 ---
+CALLOUT_DIFFERENCES = {
+    'Computer Science/Data Structure/_index.md',
+    'Computer Science/_index.md',
+    'android/12 - Menu菜单组件.md',
+    'edge/callout+in-callout',
+    'edge/callout-no-title+in-callout',
+    'edge/callout-fold',
+    'edge/callout-fold+front-matter',
+    'edge/callout-fold+in-callout',
+    'edge/callout-nested',
+    'edge/callout-nested+front-matter',
+    'edge/callout-nested+in-callout',
+    'edge/callout-in-code',
+    'edge/callout-in-code+front-matter',
+    'edge/quote-then-callout+in-callout',
+    'edge/crlf',
+    'edge/crlf+front-matter',
+    'edge/crlf+in-callout',
+    'edge/empty+front-matter',
+}
+LATEX_DIFFERENCES = {
+    'android/11 - Activity 活动组件.md',
+    'android/13 - AlertDialog 消息提示.md',
+    'android/17 - SimpleAdapter 列表单一元素.md',
+    'android/18 - BaseAdapter 基础单一元素.md',
+    'android/19 - ViewHolder 视图保持器.md',
+    'edge/dollar-in-fence+front-matter',
+    'edge/dollar-in-fence+in-callout',
+    'edge/dollar-in-tilde-fence',
+    'edge/dollar-in-tilde-fence+front-matter',
+    'edge/escaped-dollar',
+    'edge/escaped-dollar+front-matter',
+    'edge/escaped-dollar+in-callout',
+    'edge/multi-backtick-code',
+    'edge/multi-backtick-code+front-matter',
+    'edge/multi-backtick-code+in-callout',
+    'edge/triple-backtick-inline+front-matter',
+}
+KNOWN_DIFFERENCES = {
+    'convert_mermaid_syntax': set(),
+    'convert_callouts': CALLOUT_DIFFERENCES,
+    'convert_latex_to_katex': LATEX_DIFFERENCES,
+    'convert_yaml_lists_to_json': {'edge/hr-in-body'},
+    'chain': (CALLOUT_DIFFERENCES | LATEX_DIFFERENCES | {
+        'edge/hr-in-body',
+        'edge/hr-in-body+in-callout',
+        'edge/dollar-in-tilde-fence+in-callout',
+        'edge/mermaid+in-callout',
+    }) - {'edge/dollar-in-fence+in-callout'},
+}
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    """(用例 {名称: 内容}, 黄金文件中的参考输出)；输入已变化的真实笔记不参与对比"""
+    cases = golden_corpus.load_content_cases(os.path.join(REPO_ROOT, 'content')) + golden_corpus.generate_edge_cases()
+    return dict(cases), golden_corpus.load_golden(GOLDEN_PATH, cases)
+
+
+def _differences(functions, name, corpus):
+    texts, expected = corpus
+    return {case for case, output in expected[name].items() if functions[name](texts[case]) != output}
+
+
+@pytest.mark.parametrize('name', sorted(golden_corpus.REFERENCE_FUNCTIONS))
+def test_reference_functions_match_golden(name, corpus):
+    """逐步转换函数的输出与黄金文件一致"""
+    assert _differences(golden_corpus.reference_functions(golden_corpus.load_reference()), name, corpus) == set()
+
+
+@pytest.mark.parametrize('name', sorted(golden_corpus.REFERENCE_FUNCTIONS))
+def test_engine_matches_golden(name, corpus):
+    """单遍转换引擎只在已知的用例上与黄金文件不同"""
+    _, expected = corpus
+    known = KNOWN_DIFFERENCES[name] & set(expected[name])
+    assert _differences(golden_corpus.engine_functions(converter), name, corpus) == known
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""image_size.py 的文件头解析（合成的 PNG / WebP / JPEG 文件头）和尺寸写入"""
+
+import struct
+
+import pytest
+
+import image_size
+
+
+def _png(width, height):
+    return image_size.PNG_SIGNATURE + struct.pack('>I', 13) + b'IHDR' + struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+
+
+def _webp(chunk, payload):
+    data = chunk + struct.pack('<I', len(payload)) + payload
+    return b'RIFF' + struct.pack('<I', len(data) + 4) + b'WEBP' + data
+
+
+def _webp_lossy(width, height):
+    return _webp(b'VP8 ', b'\x00' * 3 + b'\x9d\x01\x2a' + struct.pack('<HH', width, height) + b'\x00' * 8)
+
+
+def _webp_lossless(width, height):
+    bits = (width - 1) | ((height - 1) << 14)
+    return _webp(b'VP8L', b'\x2f' + bits.to_bytes(4, 'little') + b'\x00' * 8)
+
+
+def _webp_extended(width, height):
+    return _webp(b'VP8X', b'\x00' * 4 + (width - 1).to_bytes(3, 'little') + (height - 1).to_bytes(3, 'little'))
+
+
+def _segment(marker, data):
+    return b'\xff' + bytes([marker]) + struct.pack('>H', len(data) + 2) + data
+
+
+def _exif(orientation, endian='<'):
+    order = b'II' if endian == '<' else b'MM'
+    entry = struct.pack(endian + 'HHIHH', image_size.EXIF_ORIENTATION_TAG, 3, 1, orientation, 0)
+    tiff = order + struct.pack(endian + 'HI', 42, 8) + struct.pack(endian + 'H', 1) + entry + b'\x00' * 4
+    return b'Exif\x00\x00' + tiff
+
+
+def _jpeg(width, height, orientation=None, endian='<'):
+    data = b'\xff\xd8' + _segment(0xE0, b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00')
+    if orientation is not None:
+        data += _segment(0xE1, _exif(orientation, endian))
+    data += _segment(0xDB, b'\x00' * 65)
+    data += _segment(0xC0, b'\x08' + struct.pack('>HH', height, width) + b'\x03' + b'\x00' * 9)
+    return data + _segment(0xDA, b'\x00' * 10) + b'\xff\xd9'
+
+
+@pytest.mark.parametrize('name, data, expected', [
+    ('a.png', _png(640, 480), (640, 480)),
+    ('lossy.webp', _webp_lossy(800, 600), (800, 600)),
+    ('lossless.webp', _webp_lossless(1024, 768), (1024, 768)),
+    ('extended.webp', _webp_extended(4000, 3000), (4000, 3000)),
+    ('plain.jpg', _jpeg(1200, 900), (1200, 900)),
+    ('upright.jpg', _jpeg(1200, 900, orientation=1), (1200, 900)),
+    ('rotated.jpg', _jpeg(1200, 900, orientation=6), (900, 1200)),
+    ('rotated-big-endian.jpg', _jpeg(1200, 900, orientation=8, endian='>'), (900, 1200)),
+    ('flipped.jpg', _jpeg(1200, 900, orientation=3), (1200, 900)),
+    ('truncated.jpg', _jpeg(1200, 900)[:40], None),
+    ('unknown.png', b'not an image at all' * 3, None),
+])
+def test_read_image_size(tmp_path, name, data, expected):
+    path = tmp_path / name
+    path.write_bytes(data)
+    assert image_size.read_image_size(str(path)) == expected
+
+
+def test_build_index_uses_cache(tmp_path):
+    assets = tmp_path / 'assets' / 'images'
+    assets.mkdir(parents=True)
+    (assets / 'a.png').write_bytes(_png(10, 20))
+    (assets / 'b.jpg').write_bytes(_jpeg(30, 40, orientation=6))
+    (assets / 'notes.txt').write_text('x')
+    index_path = str(tmp_path / 'data' / 'image_sizes.json')
+
+    stats = {}
+    index = image_size.build_index(str(tmp_path / 'assets'), index_path, stats)
+    assert sorted(index['images']) == ['images/a.png', 'images/b.jpg']
+    assert image_size.lookup_size(index, 'images/b.jpg') == (40, 30)
+    assert stats['read'] == 2
+
+    stats = {}
+    again = image_size.build_index(str(tmp_path / 'assets'), index_path, stats)
+    assert (stats['cached'], stats['read']) == (2, 0)
+    assert again['digest'] == index['digest']
+
+
+def test_add_sizes():
+    index = {'images': {'images/a.png': {'width': 800, 'height': 600}}}
+    status, content = image_size.add_size_to_front_matter('---\nfeatureimage: images/a.png\n---\n', index)
+    assert status == 'edited'
+    assert content == '---\nfeatureimage: images/a.png\nfeatureimageWidth: 800\nfeatureimageHeight: 600\n---\n'
+
+    text = '{{< figure src="images/a.png" >}} {{< figure src="images/a.png" width="400" >}} {{< figure src="x.png" >}}'
+    assert image_size.add_size_to_shortcodes(text, index) == (
+        '{{< figure src="images/a.png" width="800" height="600" >}} '
+        '{{< figure src="images/a.png" width="400" height="300" >}} {{< figure src="x.png" >}}'
+    )
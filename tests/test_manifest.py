@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""converter_manifest.py 的增量转换清单：未变化的文件跳过，版本变化或文件删除后记录失效"""
+
+import os
+
+import obsidian_converter
+from converter_manifest import load_manifest, save_manifest
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    note = tmp_path / 'a.md'
+    note.write_text("> [!tip] 提示\n> 内容\n")
+    manifest_path = str(tmp_path / '.manifest.json')
+
+    manifest = load_manifest(manifest_path, 'v1')
+    assert obsidian_converter.convert_file(str(note), manifest) == 'converted'
+    assert obsidian_converter.convert_file(str(note), manifest) == 'skipped'
+    save_manifest(manifest)
+
+    manifest = load_manifest(manifest_path, 'v1')
+    assert list(manifest['files']) == ['a.md']
+    # 只有修改时间变化时按内容哈希跳过
+    os.utime(note, ns=(1, 1))
+    assert obsidian_converter.convert_file(str(note), manifest) == 'skipped'
+    assert manifest['files']['a.md']['mtime_ns'] == 1
+
+
+def test_version_change_and_deleted_files_invalidate(tmp_path):
+    note = tmp_path / 'a.md'
+    note.write_text("正文\n")
+    manifest_path = str(tmp_path / '.manifest.json')
+    manifest = load_manifest(manifest_path, 'v1')
+    assert obsidian_converter.convert_file(str(note), manifest) == 'unchanged'
+    save_manifest(manifest)
+
+    assert load_manifest(manifest_path, 'v2')['files'] == {}
+
+    note.unlink()
+    manifest = load_manifest(manifest_path, 'v1')
+    save_manifest(manifest)
+    assert load_manifest(manifest_path, 'v1')['files'] == {}
+
+
+def test_unreadable_manifest_is_empty(tmp_path):
+    manifest_path = tmp_path / '.manifest.json'
+    manifest_path.write_text('{')
+    assert load_manifest(str(manifest_path), 'v1')['files'] == {}
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+note_io.py 的原子写入：内容不变时不写入，新文件按 umask 设置权限，已有文件保留权限，写入失败时不留下临时文件；
+两阶段重命名（包括出错时的回滚）
+"""
+
+import os
+
+import pytest
+
+import note_io
+
+
+def _files(directory):
+    return {name: (directory / name).read_text() for name in sorted(os.listdir(directory))}
+
+
+def test_write_text_skips_unchanged(tmp_path):
+    path = str(tmp_path / 'a.md')
+    assert note_io.write_text(path, '内容') is True
+    os.utime(path, ns=(1, 1))
+    assert note_io.write_text(path, '内容') is False
+    assert os.stat(path).st_mtime_ns == 1
+    assert note_io.write_text(path, '新内容') is True
+    assert _files(tmp_path) == {'a.md': '新内容'}
+
+
+def test_atomic_write_uses_umask_for_new_files(tmp_path):
+    old_mask = os.umask(0o022)
+    try:
+        path = str(tmp_path / 'new.md')
+        note_io.write_text(path, 'x')
+        assert os.stat(path).st_mode & 0o777 == 0o644
+        os.chmod(path, 0o600)
+        note_io.write_text(path, 'y')
+        assert os.stat(path).st_mode & 0o777 == 0o600
+    finally:
+        os.umask(old_mask)
+
+
+def test_failed_write_keeps_original(tmp_path):
+    path = tmp_path / 'a.md'
+    path.write_bytes(b'old')
+
+    def fail(f):
+        f.write(b'partial')
+        raise OSError('模拟失败')
+
+    with pytest.raises(OSError):
+        note_io.atomic_write(str(path), fail, mode='wb')
+    assert _files(tmp_path) == {'a.md': 'old'}
+    assert note_io.write_bytes(str(path), b'old') is False
+
+
+def test_rename_all_swaps_and_cycles(tmp_path):
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).write_text(name)
+    note_io.rename_all({str(tmp_path / 'a'): str(tmp_path / 'b'), str(tmp_path / 'b'): str(tmp_path / 'a')})
+    assert _files(tmp_path) == {'a': 'b', 'b': 'a', 'c': 'c'}
+    note_io.rename_all({str(tmp_path / 'a'): str(tmp_path / 'b'), str(tmp_path / 'b'): str(tmp_path / 'c'),
+                        str(tmp_path / 'c'): str(tmp_path / 'sub' / 'a')})
+    assert _files(tmp_path / 'sub') == {'a': 'c'}
+    assert (tmp_path / 'b').read_text() == 'b'
+    assert (tmp_path / 'c').read_text() == 'a'
+
+
+def test_rename_all_refuses_conflicts(tmp_path):
+    (tmp_path / 'a').write_text('a')
+    (tmp_path / 'b').write_text('b')
+    (tmp_path / 'other').write_text('other')
+    with pytest.raises(FileExistsError):
+        note_io.rename_all({str(tmp_path / 'a'): str(tmp_path / 'other')})
+    with pytest.raises(ValueError):
+        note_io.rename_all({str(tmp_path / 'a'): str(tmp_path / 'x'), str(tmp_path / 'b'): str(tmp_path / 'x')})
+    assert _files(tmp_path) == {'a': 'a', 'b': 'b', 'other': 'other'}
+
+
+@pytest.mark.parametrize('fail_at', [2, 5])
+def test_rename_all_rolls_back(tmp_path, monkeypatch, fail_at):
+    """第 fail_at 次 os.rename 失败时（2 为移到临时名称的阶段，5 为已有文件移到目标之后）所有文件恢复原位"""
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).write_text(name)
+    real_rename = os.rename
+    calls = []
+
+    def flaky_rename(source, target):
+        calls.append(source)
+        if len(calls) == fail_at:
+            raise OSError('模拟失败')
+        real_rename(source, target)
+
+    monkeypatch.setattr(os, 'rename', flaky_rename)
+    with pytest.raises(OSError):
+        note_io.rename_all({str(tmp_path / 'a'): str(tmp_path / 'b'), str(tmp_path / 'b'): str(tmp_path / 'c'),
+                            str(tmp_path / 'c'): str(tmp_path / 'a')})
+    assert _files(tmp_path) == {'a': 'a', 'b': 'b', 'c': 'c'}
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""note_io.py 的 --jobs 解析和按顺序产出结果的进程池"""
+
+import os
+
+import pytest
+
+import note_io
+
+
+def test_parse_jobs():
+    assert note_io.parse_jobs('3') == 3
+    assert note_io.parse_jobs('0') == (os.cpu_count() or 1)
+    with pytest.raises(ValueError, match='--jobs'):
+        note_io.parse_jobs('abc')
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_results_keep_input_order(jobs):
+    items = ['a' * 3, 'b', 'c' * 10, 'd' * 5]
+    results = note_io.iter_ordered_results(items, len, jobs=jobs, size=len)
+    assert list(results) == [3, 1, 10, 5]
+
+
+def test_serial_used_without_pool():
+    calls = []
+
+    def serial(item):
+        calls.append(item)
+        return item.upper()
+
+    assert list(note_io.iter_ordered_results(['a', 'b'], len, jobs=1, serial=serial)) == ['A', 'B']
+    assert calls == ['a', 'b']
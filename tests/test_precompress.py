@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""precompress-public.py 的增量压缩：未变化的文件不重复压缩，原文件删除后清理遗留的压缩文件"""
+
+import gzip
+import os
+
+import pytest
+
+from note_io import load_script
+
+precompress = load_script('precompress-public.py')
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_precompress_is_incremental(tmp_path, capsys, jobs):
+    public = tmp_path / 'public'
+    (public / 'css').mkdir(parents=True)
+    page = ('<p>重复的内容</p>\n' * 100).encode('utf-8')
+    (public / 'index.html').write_bytes(page)
+    (public / 'css' / 'main.css').write_text('body { color: red; }\n' * 50)
+    (public / 'small.js').write_text('x')
+    (public / 'image.png').write_bytes(os.urandom(4096))
+    state_path = str(tmp_path / 'state.json')
+
+    assert precompress.precompress_public(str(public), state_path, jobs=jobs) == 0
+    assert gzip.decompress((public / 'index.html.gz').read_bytes()) == page
+    assert (public / 'css' / 'main.css.gz').exists()
+    assert not (public / 'small.js.gz').exists()
+    assert not (public / 'image.png.gz').exists()
+
+    capsys.readouterr()
+    os.utime(public / 'index.html', ns=(1, 1))
+    assert precompress.precompress_public(str(public), state_path, jobs=jobs) == 0
+    assert '需要压缩 0 个' in capsys.readouterr().out
+
+    # 压缩文件被删除后重新生成
+    (public / 'index.html.gz').unlink()
+    precompress.precompress_public(str(public), state_path, jobs=jobs)
+    assert (public / 'index.html.gz').exists()
+
+
+def test_stale_outputs_are_removed(tmp_path):
+    public = tmp_path / 'public'
+    public.mkdir()
+    (public / 'a.html').write_text('<p>a</p>\n' * 100)
+    state_path = str(tmp_path / 'state.json')
+    precompress.precompress_public(str(public), state_path)
+    assert (public / 'a.html.gz').exists()
+
+    (public / 'a.html').unlink()
+    (public / 'b.html').write_text('<p>b</p>\n' * 100)
+    precompress.precompress_public(str(public), state_path)
+    assert sorted(name for name in os.listdir(public) if not name.endswith('.br')) == ['b.html', 'b.html.gz']
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""rename-images.py 的重命名计划：按上次索引中的哈希或按编号匹配图片，跳过冲突"""
+
+from note_io import load_script
+
+rename_images = load_script('rename-images.py')
+
+
+def test_match_by_hash_follows_renamed_note():
+    hashes = {'images/old.png': {'size': 1, 'mtime_ns': 1, 'sha256': 'h1'}}
+    previous = {'notes': {'a.md': {'featureimage': 'images/old.png', 'sha256': 'h1'}}, 'hashes': {}}
+    plan, warnings = rename_images.plan_renames({'a.md': 'images/new.png'}, hashes, previous)
+    assert plan == {'images/old.png': 'images/new.png'}
+    assert warnings == []
+
+
+def test_match_by_number_and_swap():
+    hashes = {
+        'images/01-b.png': {'size': 1, 'mtime_ns': 1, 'sha256': 'h1'},
+        'images/02-a.png': {'size': 1, 'mtime_ns': 1, 'sha256': 'h2'},
+    }
+    notes = {'01 - 线性布局.md': 'images/02-a.png', '02 - 相对布局.md': 'images/01-b.png'}
+    plan, warnings = rename_images.plan_renames(notes, hashes, {'notes': {}, 'hashes': {}}, ('number',))
+    assert plan == {'images/01-b.png': 'images/02-a.png', 'images/02-a.png': 'images/01-b.png'}
+    assert warnings == []
+
+
+def test_conflicts_are_skipped():
+    hashes = {
+        'images/01-a.png': {'size': 1, 'mtime_ns': 1, 'sha256': 'h1'},
+        'images/other.png': {'size': 1, 'mtime_ns': 1, 'sha256': 'h2'},
+    }
+    notes = {'01 - a.md': 'images/other.png', 'b.md': 'images/missing.png'}
+    plan, warnings = rename_images.plan_renames(notes, hashes, {'notes': {}, 'hashes': {}})
+    assert plan == {}
+    assert len(warnings) == 2
+
+
+def test_rename_images_builds_index_then_renames(tmp_path, monkeypatch):
+    content = tmp_path / 'content'
+    images = tmp_path / 'assets' / 'images'
+    content.mkdir()
+    images.mkdir(parents=True)
+    note = content / 'a.md'
+    note.write_text('---\nfeatureimage: images/old.png\n---\n')
+    (images / 'old.png').write_bytes(b'png')
+    index_path = str(tmp_path / 'index.json')
+    args = (str(content), str(tmp_path / 'assets'), index_path)
+
+    rename_images.rename_images(*args, build_only=True)
+    note.write_text('---\nfeatureimage: images/new.png\n---\n')
+    monkeypatch.setattr('builtins.input', lambda prompt: 'n')
+    rename_images.rename_images(*args)
+    assert sorted(p.name for p in images.iterdir()) == ['old.png']
+
+    monkeypatch.setattr('builtins.input', lambda prompt: 'y')
+    rename_images.rename_images(*args)
+    assert sorted(p.name for p in images.iterdir()) == ['new.png']
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""build-search-index.py 的分词、页面路径和按分片查询，以及从站点配置读取 baseURL 路径"""
+
+from note_io import load_script, site_base_path
+
+search_index = load_script('build-search-index.py')
+
+
+def test_tokenize_words_and_cjk_bigrams():
+    assert list(search_index.tokenize('Android 线性布局 a 2 的')) == ['android', '线性', '性布', '布局', '2', '的']
+    assert list(search_index.tokenize('布局', unigrams=True)) == ['布局', '布', '局']
+
+
+def test_page_url():
+    assert search_index.page_url('android/01 - Linear Layout.md', {}) == '/android/01---linear-layout/'
+    assert search_index.page_url('android/_index.md', {}) == '/android/'
+    assert search_index.page_url('android/a.md', {'slug': 'intro'}) == '/android/intro/'
+    assert search_index.page_url('android/a.md', {'url': '/about'}) == '/about/'
+
+
+def test_build_and_search(tmp_path):
+    content = tmp_path / 'content'
+    content.mkdir()
+    (content / 'a.md').write_text('---\ntitle: 线性布局\ntags: ["布局"]\n---\nLinearLayout 的用法\n')
+    (content / 'b.md').write_text('---\ntitle: 相对布局\n---\n```\n线性\n```\n正文\n')
+    (content / 'c.md').write_text('---\ntitle: 草稿\ndraft: true\n---\n线性\n')
+    output = str(tmp_path / 'search')
+    search_index.build_search_index(str(content), output, str(tmp_path / 'state.json'), base_path='/blog')
+
+    # 文档表中每项为 [路径, 标题, 摘要]，路径带 baseURL 前缀
+    results = search_index.search(output, '布局')
+    assert [doc[0] for doc, _ in results] == ['/blog/a/', '/blog/b/']
+    assert [doc[1] for doc, _ in results] == ['线性布局', '相对布局']
+    assert [doc[1] for doc, _ in search_index.search(output, '线性')] == ['线性布局']
+    assert search_index.search(output, '不存在') == []
+
+
+def test_site_base_path(tmp_path):
+    assert site_base_path(str(tmp_path)) == ''
+    (tmp_path / 'hugo.toml').write_text('baseURL = "https://example.github.io/blog/"\n')
+    assert site_base_path(str(tmp_path)) == '/blog'
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""obsidian_converter.tokenize 的片段切分和 convert_content 对代码的保护"""
+
+import pytest
+
+import obsidian_converter
+
+NOTE = (
+    "---\ntitle: a\n---\n"
+    "文字 $a$ 和 `$b$`\n"
+    "```\n$c$\n```\n"
+    "> [!tip] 提示\n> 内容\n"
+    "\n\\$ $$\nx\n$$\n"
+)
+
+
+def _kinds(text, **kwargs):
+    return [(segment.kind, segment.text) for segment in obsidian_converter.tokenize(text, **kwargs)]
+
+
+def test_segments_in_order():
+    assert _kinds(NOTE) == [
+        ('front_matter', "---\ntitle: a\n---\n"),
+        ('text', "文字 "),
+        ('math_inline', "$a$"),
+        ('text', " 和 "),
+        ('inline_code', "`$b$`"),
+        ('text', "\n"),
+        ('fence', "```\n$c$\n```\n"),
+        ('callout', "> [!tip] 提示\n> 内容\n"),
+        ('text', "\n\\$ "),
+        ('math_block', "$$\nx\n$$"),
+        ('text', "\n"),
+    ]
+
+
+@pytest.mark.parametrize('text', [
+    NOTE,
+    "````\n```\n$x$\n```\n````\n后文 $y$",
+    "~~~\n$未闭合的代码块",
+    "$$ 未闭合 $a$\n`` 未闭合反引号 $b$",
+    "> [!note]\n> > [!tip] 嵌套\n> > 内容\n",
+    "",
+])
+def test_segments_join_to_original(text):
+    assert ''.join(part for _, part in _kinds(text)) == text
+
+
+def test_disabled_structures_stay_text():
+    assert _kinds(NOTE, front_matter=False, callouts=False, math=False, body=False) == [('text', NOTE)]
+    kinds = [kind for kind, _ in _kinds(NOTE, callouts=False, math=False)]
+    assert kinds == ['front_matter', 'text', 'fence', 'text']
+
+
+def test_code_is_not_converted():
+    content = obsidian_converter.convert_content(NOTE)
+    assert "文字 \\(a\\) 和 `$b$`\n```\n$c$\n```\n" in content
+    assert "\\$ $$\nx\n$$\n" in content
+    assert content.startswith("---\ntitle: a\n---\n\n{{< katex >}}\n\n")